@@ -0,0 +1,104 @@
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+# Add project root to the Python path
+project_root = Path(__file__).resolve().parents[1]
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from src.preprocessing.experience_extractor import ExperienceExtractor
+
+_MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+_FILLER = (
+    "Built data pipelines in Python and SQL, deployed models with Docker and Kubernetes, "
+    "and mentored junior engineers while partnering with product teams. "
+)
+
+
+class LegacyExperienceExtractor:
+    """The extractor before date-range support, kept for comparison (uncompiled findall per call)."""
+
+    def extract_years(self, text: str) -> float:
+        matches = re.findall(r"(\d+)\+?\s*years?\s*of\s*experience", text.lower())
+        years = [float(m) for m in matches if float(m) < 50]
+        return max(years) if years else 0.0
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Microbenchmark the experience extractor")
+    parser.add_argument("--resumes", type=int, default=2000, help="Synthetic resumes to generate")
+    parser.add_argument("--texts", type=Path, help="Directory of .txt resumes to use instead")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def synthetic_resume(rng: random.Random) -> str:
+    """A resume with 1-5 roles in reverse chronological order, some overlapping."""
+    lines = ["Jane Doe | Data Engineer | jane@example.com"]
+    if rng.random() < 0.2:
+        lines.append(f"Summary: {rng.randint(2, 15)}+ years of experience in analytics.")
+    year = 2026
+    for role in range(rng.randint(1, 5)):
+        end = "Present" if role == 0 else f"{rng.choice(_MONTHS)} {year}"
+        start_year = year - rng.randint(1, 4)
+        style = rng.randrange(3)
+        if style == 0:
+            start = f"{rng.choice(_MONTHS)} {start_year}"
+        elif style == 1:
+            start = f"{rng.randint(1, 12):02d}/{start_year}"
+        else:
+            start, end = str(start_year), ("Present" if role == 0 else str(year))
+        lines.append(f"Engineer, Company {role} ({start} – {end})")
+        lines.append(_FILLER * rng.randint(2, 6))
+        year = start_year + rng.choice((0, 0, 1))  # occasional overlap
+    lines.append("Education: BSc Computer Science")
+    return "\n".join(lines)
+
+
+def load_texts(args: argparse.Namespace) -> List[str]:
+    if args.texts:
+        return [path.read_text(encoding="utf-8", errors="ignore") for path in sorted(args.texts.glob("*.txt"))]
+    rng = random.Random(args.seed)
+    return [synthetic_resume(rng) for _ in range(args.resumes)]
+
+
+def time_extractor(extract: Callable[[str], float], texts: List[str], repeat: int) -> tuple[float, List[float]]:
+    results = [extract(text) for text in texts]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            extract(text)
+    return (time.perf_counter() - start) / repeat, results
+
+
+def main() -> None:
+    args = parse_args()
+    texts = load_texts(args)
+    print(f"Corpus: {len(texts)} resumes, {sum(map(len, texts)) / 1e6:.2f}M chars")
+
+    extractor = ExperienceExtractor()
+    candidates = (
+        ("legacy", LegacyExperienceExtractor().extract_years),
+        ("current", extractor.extract_years),
+    )
+    print(f"{'extractor':<10} {'us/resume':>10} {'nonzero':>8} {'mean years':>11}")
+    for name, extract in candidates:
+        seconds, results = time_extractor(extract, texts, args.repeat)
+        nonzero = sum(1 for years in results if years > 0)
+        print(
+            f"{name:<10} {seconds / len(texts) * 1e6:>10.1f} {nonzero / len(texts):>8.1%} "
+            f"{sum(results) / len(results):>11.2f}"
+        )
+    start = time.perf_counter()
+    extractor.extract_years_batch(texts)
+    print(f"batch API: {(time.perf_counter() - start) / len(texts) * 1e6:.1f} us/resume")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import argparse
+import io
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+# Add project root to the Python path
+project_root = Path(__file__).resolve().parents[1]
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from src.ocr.pdf_parser import PDF_ENGINES, ENGINES, PDFParser, looks_garbled
+
+_SECTIONS = [
+    "Built batch and streaming data pipelines in Python, SQL and Spark on AWS.",
+    "Deployed machine learning models with Docker, Kubernetes and MLflow.",
+    "Led a team of four engineers; introduced code review and CI with GitHub Actions.",
+    "Designed dbt models and Airflow DAGs feeding Snowflake and Tableau dashboards.",
+    "Reduced query latency by 40% by partitioning PostgreSQL tables and adding indexes.",
+]
+_MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare PDF text engines on resume PDFs")
+    parser.add_argument("--pdfs", type=Path, help="Directory of sample resume PDFs (default: synthetic)")
+    parser.add_argument("--resumes", type=int, default=50, help="Synthetic resumes to generate")
+    parser.add_argument("--pages", type=int, default=2, help="Pages per synthetic resume")
+    parser.add_argument("--stop-after-pages", type=int, help="Stop policy passed to PDFParser")
+    parser.add_argument("--stop-after-chars", type=int, help="Stop policy passed to PDFParser")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def _escape(line: str) -> bytes:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)").encode("latin-1")
+
+
+def synthetic_resume_pdf(rng: random.Random, pages: int) -> bytes:
+    """A born-digital resume: Helvetica text, ~45 lines per page."""
+    page_lines = []
+    year = 2026
+    for page in range(pages):
+        lines = ["Jane Doe - Senior Data Engineer - jane@example.com"] if page == 0 else []
+        while len(lines) < 45:
+            start = year - rng.randint(1, 4)
+            lines.append(f"Data Engineer, Company {len(lines)} ({rng.choice(_MONTHS)} {start} - {year})")
+            lines.extend(rng.choice(_SECTIONS) for _ in range(rng.randint(3, 6)))
+            year = start
+        page_lines.append(lines[:45])
+
+    count = len(page_lines)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % (4 + 2 * i) for i in range(count))
+        + b"] /Count %d >>" % count,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i, lines in enumerate(page_lines):
+        stream = b"BT /F1 10 Tf 14 TL 50 760 Td " + b" ".join(b"(" + _escape(line) + b") ' " for line in lines) + b"ET"
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (5 + 2 * i)
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def load_documents(args: argparse.Namespace) -> List[bytes]:
+    if args.pdfs:
+        return [path.read_bytes() for path in sorted(args.pdfs.glob("*.pdf"))]
+    rng = random.Random(args.seed)
+    return [synthetic_resume_pdf(rng, args.pages) for _ in range(args.resumes)]
+
+
+def time_engine(extract: Callable[[bytes], str], documents: List[bytes], repeat: int) -> tuple[float, List[str]]:
+    texts = []
+    for document in documents:
+        try:
+            texts.append(extract(document))
+        except Exception:
+            texts.append("")
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for document in documents:
+            try:
+                extract(document)
+            except Exception:
+                pass
+    return (time.perf_counter() - start) / repeat, texts
+
+
+def main() -> None:
+    args = parse_args()
+    documents = load_documents(args)
+    if not documents:
+        raise SystemExit("No PDFs to benchmark")
+    print(f"Corpus: {len(documents)} PDFs, {sum(map(len, documents)) / 1e6:.2f} MB")
+
+    engines = [name for name in PDF_ENGINES if name == "auto" or ENGINES[name].available()]
+    print(f"{'engine':<11} {'ms/pdf':>8} {'speed-up':>9} {'empty':>6} {'chars':>7}")
+    baseline = None
+    results = {}
+    for name in reversed(engines):  # pdfplumber first: it is the baseline
+        engine = PDFParser(
+            engine=name, stop_after_pages=args.stop_after_pages, stop_after_chars=args.stop_after_chars
+        )
+        seconds, texts = time_engine(engine.extract_text, documents, args.repeat)
+        results[name] = texts
+        baseline = baseline or seconds
+        empty = sum(1 for text in texts if not text.strip())
+        print(
+            f"{name:<11} {seconds / len(documents) * 1e3:>8.1f} {baseline / seconds:>8.1f}x "
+            f"{empty / len(documents):>6.0%} {sum(map(len, texts)) / len(texts):>7.0f}"
+        )
+    if "pypdf" in results:
+        fallbacks = 0
+        for document, text in zip(documents, results["pypdf"]):
+            try:
+                page_count = len(ENGINES["pypdf"]().extract_pages(io.BytesIO(document)))
+            except Exception:
+                page_count = 1
+            fallbacks += looks_garbled(text, page_count)
+        print(f"auto fell back to pdfplumber for {fallbacks / len(documents):.0%} of documents")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Sequence, Set
+
+# Add project root to the Python path
+project_root = Path(__file__).resolve().parents[1]
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from src.preprocessing.skill_extractor import DEFAULT_SKILLS
+from src.preprocessing.skill_matcher import SkillMatcher
+
+
+class LegacyRegexMatcher:
+    """The alternation regex SkillExtractor used before the token trie, kept for comparison."""
+
+    def __init__(self, skills: Sequence[str]) -> None:
+        escaped = sorted(skills, key=len, reverse=True)
+        self._pattern = re.compile(
+            r"(?<!\w)(" + "|".join(re.escape(skill).replace(r"\ ", r"[\s_\-/]+") for skill in escaped) + r")(?!\w)",
+            re.IGNORECASE,
+        )
+
+    def find_all(self, text: str) -> List[str]:
+        text = re.sub(r"[^a-z0-9\s\+\#\-/]", " ", text.lower())
+        text = re.sub(r"\s+", " ", text).strip()
+        return [match.lower().strip() for match in self._pattern.findall(text)]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare the token-trie skill matcher with the legacy regex")
+    parser.add_argument(
+        "--jobs", type=Path, default=project_root / "data" / "processed" / "adzuna_data_jobs.json",
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Passes over the corpus per matcher")
+    parser.add_argument(
+        "--synthetic-skills", type=int, default=0,
+        help="Add this many made-up skills to show how each matcher scales with vocabulary size",
+    )
+    return parser.parse_args()
+
+
+def load_texts(path: Path) -> List[str]:
+    jobs = json.loads(path.read_text(encoding="utf-8"))
+    if isinstance(jobs, dict):
+        jobs = jobs.get("jobs", [])
+    return [job.get("job_description") or job.get("description") or "" for job in jobs]
+
+
+def time_matcher(find_all: Callable[[str], List[str]], texts: List[str], repeat: int) -> tuple[float, List[Set[str]]]:
+    results = [set(find_all(text)) for text in texts]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            find_all(text)
+    return (time.perf_counter() - start) / repeat, results
+
+
+def main() -> None:
+    args = parse_args()
+    texts = load_texts(args.jobs)
+    skills = list(dict.fromkeys(skill.lower() for skill in DEFAULT_SKILLS))
+    skills += [f"synthetic skill {i}" for i in range(args.synthetic_skills)]
+    total_chars = sum(len(text) for text in texts)
+    print(f"Corpus: {len(texts)} texts, {total_chars / 1e6:.2f}M chars; vocabulary: {len(skills)} skills")
+
+    legacy_s, legacy = time_matcher(LegacyRegexMatcher(skills).find_all, texts, args.repeat)
+    trie_s, trie = time_matcher(SkillMatcher(skills).find_all, texts, args.repeat)
+    print(f"{'matcher':<8} {'seconds':>9} {'MB/s':>8}")
+    for name, seconds in (("regex", legacy_s), ("trie", trie_s)):
+        print(f"{name:<8} {seconds:>9.3f} {total_chars / 1e6 / seconds:>8.2f}")
+    print(f"speedup: {legacy_s / trie_s:.1f}x")
+
+    # Differences are expected where the regex could not match (e.g. "node.js", whose
+    # dot its normalizer stripped) or reported a non-canonical form like "spring-boot"
+    only_trie = sum((len(t - r) for r, t in zip(legacy, trie)), 0)
+    only_regex = sum((len(r - t) for r, t in zip(legacy, trie)), 0)
+    differing = sum(1 for r, t in zip(legacy, trie) if r != t)
+    print(f"texts with different skill sets: {differing}; skills only from trie: {only_trie}, only from regex: {only_regex}")
+    examples = {}
+    for r, t in zip(legacy, trie):
+        for skill in (t - r):
+            examples.setdefault("trie", set()).add(skill)
+        for skill in (r - t):
+            examples.setdefault("regex", set()).add(skill)
+    for name, found in examples.items():
+        print(f"  only {name}: {', '.join(sorted(found)[:15])}")
+
+
+if __name__ == "__main__":
+    main()
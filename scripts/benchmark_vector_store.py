@@ -0,0 +1,95 @@
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to the Python path
+project_root = Path(__file__).resolve().parents[1]
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from src.storage.vector_store import VectorStore
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare VectorStore index modes: recall, latency and memory")
+    parser.add_argument("--modes", nargs="+", default=["flat", "hnsw", "ivf", "sq8", "ivfpq"])
+    parser.add_argument("--count", type=int, default=100_000, help="Synthetic corpus size")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument(
+        "--jobs", type=Path, default=None,
+        help="Embed descriptions from a job JSON file instead of using synthetic vectors",
+    )
+    return parser.parse_args()
+
+
+def load_vectors(args: argparse.Namespace) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(0)
+    if args.jobs is not None:
+        from src.embeddings.text_embedder import TextEmbedder
+
+        jobs = json.loads(args.jobs.read_text(encoding="utf-8"))
+        texts = [job.get("job_description") or job.get("description") or "" for job in jobs]
+        corpus = TextEmbedder().encode(texts)
+    else:
+        # Clustered data behaves more like real embeddings than uniform noise
+        centers = rng.standard_normal((max(1, args.count // 100), args.dim)).astype(np.float32)
+        corpus = centers[rng.integers(0, len(centers), args.count)]
+        corpus += 0.3 * rng.standard_normal(corpus.shape).astype(np.float32)
+    corpus /= np.linalg.norm(corpus, axis=1, keepdims=True)
+    picks = rng.integers(0, len(corpus), args.queries)
+    queries = corpus[picks] + 0.05 * rng.standard_normal((args.queries, corpus.shape[1])).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    return corpus.astype(np.float32), queries.astype(np.float32)
+
+
+def run_mode(mode: str, corpus: np.ndarray, queries: np.ndarray, k: int) -> tuple[dict, list]:
+    store = VectorStore(index_mode=mode)
+    payloads = [str(i) for i in range(len(corpus))]
+
+    start = time.perf_counter()
+    store.add_items(corpus.copy(), payloads)
+    build_s = time.perf_counter() - start
+
+    latencies = []
+    results = []
+    for query in queries:
+        start = time.perf_counter()
+        hits = store.search(query[None, :], k=k)[0]
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append({hit.idx for hit in hits})
+
+    status = store.get_status()
+    return {
+        "mode": mode,
+        "build_s": build_s,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "bytes_per_vector": status["bytes_per_vector"],
+        "rescore": status["rescore"],
+    }, results
+
+
+def main() -> None:
+    args = parse_args()
+    corpus, queries = load_vectors(args)
+    print(f"Corpus: {corpus.shape[0]} x {corpus.shape[1]}, queries: {len(queries)}, k={args.top_k}")
+
+    _, truth = run_mode("flat", corpus, queries, args.top_k)
+    print(f"{'mode':<8} {'build s':>9} {'p50 ms':>8} {'p99 ms':>8} {'recall':>7} {'B/vec':>6} rescore")
+    for mode in args.modes:
+        stats, results = run_mode(mode, corpus, queries, args.top_k)
+        recall = np.mean([len(found & exact) / len(exact) for found, exact in zip(results, truth) if exact])
+        print(
+            f"{mode:<8} {stats['build_s']:>9.2f} {stats['p50_ms']:>8.2f} {stats['p99_ms']:>8.2f} "
+            f"{recall:>7.3f} {stats['bytes_per_vector'] or '-':>6} {stats['rescore']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
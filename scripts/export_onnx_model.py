@@ -0,0 +1,86 @@
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to the Python path
+project_root = Path(__file__).resolve().parents[1]
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from src.embeddings.onnx_encoder import OnnxEncoder, export_onnx
+from src.embeddings.text_embedder import DEFAULT_MODEL_NAME
+
+SAMPLE_TEXTS = [
+    "Senior data engineer building Spark and Airflow pipelines on AWS",
+    "Machine learning engineer with PyTorch, MLOps and model deployment experience",
+    "Frontend developer: React, TypeScript, CSS, accessibility",
+    "Data analyst skilled in SQL, Tableau and Excel reporting",
+    "Site reliability engineer running Kubernetes, Terraform and Prometheus",
+]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Export the embedding model to ONNX (fp32 + int8) and compare it with PyTorch"
+    )
+    parser.add_argument("--model", default=DEFAULT_MODEL_NAME)
+    parser.add_argument("--output", type=Path, default=Path("models/onnx"))
+    parser.add_argument("--skip-export", action="store_true", help="Only run the parity and speed checks")
+    parser.add_argument("--no-quantize", action="store_true")
+    parser.add_argument(
+        "--jobs", type=Path, default=None,
+        help="Use descriptions from a job JSON file as the evaluation texts",
+    )
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--min-cosine", type=float, default=0.99, help="Fail if any text falls below this")
+    return parser.parse_args()
+
+
+def load_texts(args: argparse.Namespace) -> list[str]:
+    if args.jobs is None:
+        return SAMPLE_TEXTS * 40
+    jobs = json.loads(args.jobs.read_text(encoding="utf-8"))
+    if isinstance(jobs, dict):
+        jobs = jobs.get("jobs", [])
+    return [job.get("job_description") or job.get("description") or "" for job in jobs]
+
+
+def throughput(model, texts: list[str], batch_size: int) -> tuple[np.ndarray, float]:
+    model.encode(texts[:batch_size], batch_size=batch_size, normalize_embeddings=True)  # warm up
+    start = time.perf_counter()
+    embeddings = model.encode(texts, batch_size=batch_size, normalize_embeddings=True, convert_to_numpy=True)
+    return np.asarray(embeddings, dtype=np.float32), len(texts) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    args = parse_args()
+    if not args.skip_export:
+        export_onnx(args.model, args.output, quantize=not args.no_quantize)
+
+    from sentence_transformers import SentenceTransformer
+
+    texts = load_texts(args)
+    reference, torch_rate = throughput(SentenceTransformer(args.model, device="cpu"), texts, args.batch_size)
+    print(f"{'backend':<10} {'texts/s':>9} {'speedup':>8} {'min cos':>8} {'mean cos':>9}")
+    print(f"{'torch':<10} {torch_rate:>9.1f} {1.0:>8.2f} {'-':>8} {'-':>9}")
+
+    failed = False
+    for quantized in (False, True):
+        if quantized and args.no_quantize:
+            continue
+        embeddings, rate = throughput(OnnxEncoder(args.output, quantized=quantized), texts, args.batch_size)
+        cosines = (embeddings * reference).sum(axis=1)
+        name = "onnx-int8" if quantized else "onnx"
+        print(f"{name:<10} {rate:>9.1f} {rate / torch_rate:>8.2f} {cosines.min():>8.4f} {cosines.mean():>9.4f}")
+        failed |= bool(cosines.min() < args.min_cosine)
+
+    if failed:
+        sys.exit(f"Parity check failed: cosine similarity below {args.min_cosine}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+import argparse
+import sys
+from pathlib import Path
+
+# Add project root to the Python path
+project_root = Path(__file__).resolve().parents[1]
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from src.embeddings.model_registry import pin_model
+from src.embeddings.text_embedder import DEFAULT_MODEL_NAME
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Save the embedding model to a local directory for offline loading (EMBEDDING_MODEL_DIR)"
+    )
+    parser.add_argument("--model", default=DEFAULT_MODEL_NAME)
+    parser.add_argument("--output", type=Path, default=Path("models") / DEFAULT_MODEL_NAME)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    directory = pin_model(args.model, args.output)
+    print(f"Pinned {args.model} to {directory}; set EMBEDDING_MODEL_DIR={directory}")
+
+
+if __name__ == "__main__":
+    main()
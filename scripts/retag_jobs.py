@@ -0,0 +1,107 @@
+import argparse
+import dataclasses
+import json
+import sys
+import time
+from collections import deque
+from pathlib import Path
+from typing import Deque, Iterator
+
+# Add project root to the Python path
+project_root = Path(__file__).resolve().parents[1]
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from src.data_ingestion.schemas import AdzunaJob
+from src.data_ingestion.tag_generator import DataJobTagGenerator
+from src.preprocessing.batch import BatchPreprocessor
+from src.preprocessing.skill_extractor import SkillExtractor
+from src.preprocessing.text_cleaner import TextCleaner
+
+_JOB_FIELDS = [f.name for f in dataclasses.fields(AdzunaJob)]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Re-extract skills, tags and experience for stored job postings (e.g. after a taxonomy change)"
+    )
+    parser.add_argument(
+        "--input", type=Path, default=project_root / "data" / "processed" / "adzuna_data_jobs.json",
+        help="JSON list of jobs, or JSON Lines (.jsonl) to stream very large corpora",
+    )
+    parser.add_argument("--output", type=Path, help="Defaults to <input>.retagged.<ext>")
+    parser.add_argument("--workers", type=int, default=4, help="Preprocessing processes (0 = in-process)")
+    parser.add_argument("--chunk-size", type=int, default=512, help="Jobs sent to a worker per task")
+    return parser.parse_args()
+
+
+def read_entries(path: Path) -> Iterator[dict]:
+    if path.suffix == ".jsonl":
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        return
+    entries = json.loads(path.read_text(encoding="utf-8"))
+    yield from entries.get("jobs", []) if isinstance(entries, dict) else entries
+
+
+def to_job(entry: dict) -> AdzunaJob:
+    values = {name: entry.get(name) for name in _JOB_FIELDS if name in entry}
+    values.setdefault("job_id", "")
+    for name in ("job_title", "job_description"):
+        values[name] = values.get(name) or ""
+    for name in ("company", "location", "category", "job_type", "experience_level", "posted_date", "job_url"):
+        values.setdefault(name, None)
+    return AdzunaJob(**values)
+
+
+def main() -> None:
+    args = parse_args()
+    output = args.output or args.input.with_suffix(".retagged" + args.input.suffix)
+    tagger = DataJobTagGenerator(SkillExtractor(), TextCleaner())
+    taxonomy = tagger.skill_extractor.taxonomy
+    print(f"Taxonomy version {taxonomy.version}: {len(taxonomy)} skills; workers={args.workers}")
+
+    # Stored entries wait here until their job comes back tagged; extra keys
+    # (e.g. fetched_at) are carried through untouched
+    originals: Deque[dict] = deque()
+
+    def jobs() -> Iterator[AdzunaJob]:
+        for entry in read_entries(args.input):
+            originals.append(entry)
+            yield to_job(entry)
+
+    start = time.perf_counter()
+    count = changed = 0
+    jsonl = output.suffix == ".jsonl"
+    tmp = output.with_name(output.name + ".tmp")
+    with BatchPreprocessor(tagger.preprocessor, workers=args.workers, chunk_size=args.chunk_size) as batch, \
+            open(tmp, "w", encoding="utf-8") as f:
+        if not jsonl:
+            f.write("[\n")
+        for job in tagger.tag_jobs(jobs(), batch):
+            entry = originals.popleft()
+            changed += sorted(entry.get("skills") or []) != job.skills
+            record = entry | {
+                "skills": job.skills,
+                "tags": job.tags,
+                "role_type": job.role_type,
+                "min_years_experience": job.min_years_experience,
+            }
+            if jsonl:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            else:
+                f.write((",\n" if count else "") + json.dumps(record, ensure_ascii=False))
+            count += 1
+        if not jsonl:
+            f.write("\n]\n")
+    tmp.replace(output)
+    seconds = time.perf_counter() - start
+    print(f"Re-tagged {count} jobs in {seconds:.2f}s ({count / max(seconds, 1e-9):.0f} jobs/s); "
+          f"skills changed for {changed}")
+    print(f"Wrote {output}")
+
+
+if __name__ == "__main__":
+    main()
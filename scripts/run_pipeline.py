@@ -11,6 +11,10 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("resume", type=Path, help="Path to resume text file")
     parser.add_argument("jobs", type=Path, help="Path to JSON job postings (list of dicts)")
     parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="Embedding processes for indexing (each loads its own model copy)",
+    )
     return parser.parse_args()
 
 
@@ -21,7 +25,7 @@ def main() -> None:
     jobs = [JobPosting(**entry) for entry in job_payload["jobs"]]
 
     recommender = ResumeRecommender(embedding_generator=TextEmbedder())
-    recommender.index_jobs(jobs)
+    recommender.index_jobs(jobs, workers=args.workers)
     recommendations = recommender.recommend_for_resume_text(resume_text, top_k=args.top_k)
 
     for rank, rec in enumerate(recommendations, start=1):
@@ -4,4 +4,5 @@ setup(
     name="resume_matcher",
     version="0.1",
     packages=find_packages(),
+    package_data={"src.preprocessing": ["skill_taxonomy.json"]},
 )
@@ -0,0 +1,79 @@
+import os
+from pathlib import Path
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+# Persisted FAISS index (written after /jobs/index, loaded at startup)
+INDEX_DIR = Path(os.getenv("INDEX_DIR", "data/embeddings"))
+INDEX_MMAP = _env_flag("INDEX_MMAP", True)
+# /jobs/upsert and /jobs/remove save at most this often (0 = after every call);
+# POST /jobs/index/save and shutdown write pending changes immediately
+INDEX_SAVE_DELAY_S = float(os.getenv("INDEX_SAVE_DELAY_S", "30"))
+
+# Vector index engine: "auto", "flat", "hnsw", "ivf", or compressed "sq8" / "ivfpq"
+INDEX_MODE = os.getenv("INDEX_MODE", "auto")
+INDEX_NLIST = int(os.getenv("INDEX_NLIST", "0")) or None
+INDEX_NPROBE = int(os.getenv("INDEX_NPROBE", "16"))
+INDEX_HNSW_M = int(os.getenv("INDEX_HNSW_M", "32"))
+INDEX_EF_SEARCH = int(os.getenv("INDEX_EF_SEARCH", "128"))
+INDEX_PQ_M = int(os.getenv("INDEX_PQ_M", "48"))
+# Exact re-scoring from the float16 copy; unset means "on for compressed modes"
+INDEX_RESCORE = _env_flag("INDEX_RESCORE", True) if os.getenv("INDEX_RESCORE") else None
+
+# /recommend/batch: worker processes for resume preprocessing (0 = in-process)
+RECOMMEND_WORKERS = int(os.getenv("RECOMMEND_WORKERS", "0"))
+RECOMMEND_BATCH_MAX = int(os.getenv("RECOMMEND_BATCH_MAX", "256"))
+
+# Embedding inference: "torch" (sentence-transformers) or "onnx" (onnxruntime,
+# model exported with scripts/export_onnx_model.py)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+EMBEDDING_ONNX_DIR = Path(os.getenv("EMBEDDING_ONNX_DIR", "models/onnx"))
+EMBEDDING_ONNX_QUANTIZED = _env_flag("EMBEDDING_ONNX_QUANTIZED", True)
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+# Pinned local copy of the torch model (scripts/pin_model.py) for offline starts
+EMBEDDING_MODEL_DIR = Path(os.environ["EMBEDDING_MODEL_DIR"]) if os.getenv("EMBEDDING_MODEL_DIR") else None
+# Load the model and run one encode at startup instead of on the first request
+EMBEDDING_WARMUP = _env_flag("EMBEDDING_WARMUP", True)
+# Micro-batching of concurrent API encode calls: flush at this many texts or after this wait
+EMBEDDING_MICROBATCH = _env_flag("EMBEDDING_MICROBATCH", True)
+EMBEDDING_MAX_BATCH = int(os.getenv("EMBEDDING_MAX_BATCH", "32"))
+EMBEDDING_MAX_WAIT_MS = float(os.getenv("EMBEDDING_MAX_WAIT_MS", "5"))
+
+# Content-addressed embedding cache so re-indexing only embeds changed text
+EMBEDDING_CACHE = _env_flag("EMBEDDING_CACHE", True)
+EMBEDDING_CACHE_DIR = Path(os.getenv("EMBEDDING_CACHE_DIR", "data/embeddings/cache"))
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "200000"))
+
+# /recommend/file: uploads above either limit are rejected with 413 before parsing
+PDF_MAX_BYTES = int(os.getenv("PDF_MAX_BYTES", str(10 * 1024 * 1024)))
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "20"))
+# "auto" (pypdf text layer, pdfplumber when that looks garbled), "pypdf" or "pdfplumber"
+PDF_ENGINE = os.getenv("PDF_ENGINE", "auto")
+# Stop reading a resume after this many pages / characters (0 = no limit); the
+# embedder truncates long inputs anyway, so later pages are rarely worth parsing
+PDF_STOP_AFTER_PAGES = int(os.getenv("PDF_STOP_AFTER_PAGES", "0")) or None
+PDF_STOP_AFTER_CHARS = int(os.getenv("PDF_STOP_AFTER_CHARS", "20000")) or None
+# PDF extraction runs off the event loop in this many worker processes (one per
+# core by default), each document capped at PDF_TIMEOUT_SECONDS (504 past it);
+# workers are replaced after PDF_MAX_TASKS_PER_CHILD documents to bound memory
+# growth. PDF_WORKERS=0 parses in a thread instead: no true timeout, one core.
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(os.cpu_count() or 1)))
+PDF_TIMEOUT_SECONDS = float(os.getenv("PDF_TIMEOUT_SECONDS", "30")) or None
+PDF_MAX_TASKS_PER_CHILD = int(os.getenv("PDF_MAX_TASKS_PER_CHILD", "100")) or None
+# /recommend/files: resumes per bulk upload
+PDF_BULK_MAX = int(os.getenv("PDF_BULK_MAX", "50"))
+
+# Parsed-resume cache keyed by the SHA-256 of uploaded files: an in-memory LRU,
+# backed by the candidate documents in Mongo when RESUME_CACHE_PERSIST is on
+RESUME_CACHE = _env_flag("RESUME_CACHE", True)
+RESUME_CACHE_MAX_ENTRIES = int(os.getenv("RESUME_CACHE_MAX_ENTRIES", "1024"))
+RESUME_CACHE_PERSIST = _env_flag("RESUME_CACHE_PERSIST", True)
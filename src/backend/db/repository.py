@@ -36,6 +36,12 @@ def add_jobs(job_dicts: List[dict]) -> int:
     return inserted
 
 
+def remove_jobs(job_ids: List[str]) -> int:
+    collection = get_jobs_collection()
+    result = collection.delete_many({"job_id": {"$in": [str(job_id) for job_id in job_ids]}})
+    return result.deleted_count
+
+
 def get_all_jobs() -> List[dict]:
     collection = get_jobs_collection()
     return list(collection.find({}, {"_id": 0}))
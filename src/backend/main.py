@@ -5,7 +5,8 @@ import psutil
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from .routes import router, recommender
+from .routes import router, recommender, embedding_scheduler, index_saver, resume_cache
+from ..embeddings.model_registry import model_registry
 # from .db import init_db
 
 # Initialize database tables
@@ -31,6 +32,12 @@ app.add_middleware(
 app.include_router(router)
 
 
+@app.on_event("shutdown")
+def save_pending_index() -> None:
+    """Write index updates still waiting for their batched save"""
+    index_saver.flush()
+
+
 
 @app.get("/health")
 async def health() -> dict:
@@ -50,7 +57,7 @@ async def status() -> dict:
     embedding_store_status = "Available" if vector_store_status["is_initialized"] else "Not Initialized"
     
     # Get last sync time
-    last_sync = recommender._last_index_time
+    last_sync = recommender.last_index_time
     last_sync_str = None
     if last_sync:
         last_sync_str = last_sync.isoformat().replace("+00:00", "Z")
@@ -65,7 +72,7 @@ async def status() -> dict:
     response_time_ms = int((time.time() - response_start) * 1000)
     
     # Get recommender status
-    indexed_jobs = len(recommender._job_postings)
+    indexed_jobs = recommender.job_count
     recommender_status = "Ready" if indexed_jobs > 0 else "No Jobs Indexed"
     
     return {
@@ -81,8 +88,18 @@ async def status() -> dict:
             "vector_count": vector_count,
             "last_sync": last_sync_str,
             "index_type": vector_store_status.get("index_type"),
-            "backend": vector_store_status.get("backend")
+            "index_mode": vector_store_status.get("index_mode"),
+            "nprobe": vector_store_status.get("nprobe"),
+            "ef_search": vector_store_status.get("ef_search"),
+            "bytes_per_vector": vector_store_status.get("bytes_per_vector"),
+            "backend": vector_store_status.get("backend"),
+            "memory_mapped": vector_store_status.get("memory_mapped")
         },
+        "embedding_models": model_registry.get_status(),
+        "embedding_cache": recommender.embedding_generator.cache_stats(),
+        "embedding_scheduler": embedding_scheduler.get_stats() if embedding_scheduler else None,
+        "resume_cache": resume_cache.stats() if resume_cache is not None else None,
+        "index_saver": index_saver.get_stats(),
         "system_metrics": {
             "cpu_usage_percent": round(cpu_percent, 1),
             "memory_usage_percent": round(memory_percent, 1),
@@ -4,40 +4,128 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import List, Any
 import logging
-import tempfile
 
-from fastapi import APIRouter, File, HTTPException, UploadFile, Depends
+import numpy as np
+from fastapi import APIRouter, File, HTTPException, UploadFile, Depends, Query
+from fastapi.concurrency import run_in_threadpool
 
+from . import config
 from .db.mongo_client import get_candidates_collection
-from .schemas import IndexJobsRequest, RecommendationRequest, CandidateResponse, JobPosting
-from .services.indexer import index_jobs_from_payload
-from ..recommender.recommender import ResumeRecommender, JobPosting as RecommenderJob
+from .schemas import (
+    BatchRecommendationRequest,
+    IndexJobsRequest,
+    JobFilterRequest,
+    RecommendationRequest,
+    RemoveJobsRequest,
+    CandidateResponse,
+    JobPosting,
+)
+from .services.indexer import index_jobs_from_payload, remove_jobs_by_ids
+from ..recommender.recommender import Recommendation, ResumeRecommender, JobPosting as RecommenderJob
+from ..recommender.filters import JobFilter
+from ..preprocessing.pipeline import RESUME_FIELDS
 from ..utils.logging_utils import setup_logging
-from ..ocr.pdf_parser import PDFParser
-from ..preprocessing.experience_extractor import ExperienceExtractor
+from ..ocr.pdf_parser import PDFParser, PDFTimeoutError, PDFTooLargeError
+from .services.index_saver import IndexSaver
+from .services.resume_cache import ParsedResume, ParsedResumeCache
+from ..storage.vector_store import MANIFEST_FILENAME, VectorStore
+from ..embeddings.batch_scheduler import EmbeddingScheduler
+from ..embeddings.embedding_cache import EmbeddingCache
+from ..embeddings.text_embedder import DEFAULT_MODEL_NAME, TextEmbedder, embedding_namespace
 
 # Setup logging
 logger = logging.getLogger(__name__)
 setup_logging()
 
 router = APIRouter()
-recommender = ResumeRecommender()
-experience_extractor = ExperienceExtractor()
+embedding_model = embedding_namespace(DEFAULT_MODEL_NAME, config.EMBEDDING_BACKEND, config.EMBEDDING_ONNX_QUANTIZED)
+embedding_cache = (
+    EmbeddingCache(
+        config.EMBEDDING_CACHE_DIR,
+        embedding_model,
+        max_entries=config.EMBEDDING_CACHE_MAX_ENTRIES,
+    )
+    if config.EMBEDDING_CACHE
+    else None
+)
+embedder = TextEmbedder(
+    cache=embedding_cache,
+    backend=config.EMBEDDING_BACKEND,
+    onnx_dir=config.EMBEDDING_ONNX_DIR,
+    quantized=config.EMBEDDING_ONNX_QUANTIZED,
+    batch_size=config.EMBEDDING_BATCH_SIZE,
+    model_dir=config.EMBEDDING_MODEL_DIR,
+)
+if config.EMBEDDING_WARMUP:
+    logger.info("Embedding model ready in %.2fs", embedder.warmup())
+# Concurrent requests share model batches instead of running batch-of-one passes
+embedding_scheduler = (
+    EmbeddingScheduler(
+        embedder,
+        max_batch_size=config.EMBEDDING_MAX_BATCH,
+        max_wait_ms=config.EMBEDDING_MAX_WAIT_MS,
+    )
+    if config.EMBEDDING_MICROBATCH
+    else None
+)
+recommender = ResumeRecommender(
+    embedding_generator=embedding_scheduler or embedder,
+    vector_store=VectorStore(
+        index_mode=config.INDEX_MODE,
+        nlist=config.INDEX_NLIST,
+        nprobe=config.INDEX_NPROBE,
+        hnsw_m=config.INDEX_HNSW_M,
+        ef_search=config.INDEX_EF_SEARCH,
+        pq_m=config.INDEX_PQ_M,
+        rescore=config.INDEX_RESCORE,
+    ),
+    preprocess_workers=config.RECOMMEND_WORKERS,
+)
+pdf_parser = PDFParser(
+    engine=config.PDF_ENGINE,
+    max_bytes=config.PDF_MAX_BYTES,
+    max_pages=config.PDF_MAX_PAGES,
+    stop_after_pages=config.PDF_STOP_AFTER_PAGES,
+    stop_after_chars=config.PDF_STOP_AFTER_CHARS,
+    workers=config.PDF_WORKERS,
+    timeout=config.PDF_TIMEOUT_SECONDS,
+    max_tasks_per_child=config.PDF_MAX_TASKS_PER_CHILD,
+)
+# Repeat uploads of the same file reuse the stored candidate, text, skills and embedding
+resume_cache = (
+    ParsedResumeCache(
+        max_entries=config.RESUME_CACHE_MAX_ENTRIES,
+        collection=get_candidates_collection if config.RESUME_CACHE_PERSIST else None,
+        embedding_model=embedding_model,
+        taxonomy_version=recommender.preprocessor.skill_extractor.taxonomy.version,
+    )
+    if config.RESUME_CACHE
+    else None
+)
 
-# Track last index time for status endpoint
-recommender._last_index_time: datetime | None = None
+# Warm start from the persisted index so restarts don't re-embed the corpus
+if (config.INDEX_DIR / MANIFEST_FILENAME).exists():
+    try:
+        recommender.load_index(config.INDEX_DIR, mmap=config.INDEX_MMAP)
+    except (OSError, ValueError) as exc:
+        logger.warning("Could not load persisted index from %s: %s", config.INDEX_DIR, exc)
 
-@router.post("/jobs/index")
-async def index_jobs(payload: IndexJobsRequest) -> dict:
-    if not payload.jobs:
-        raise HTTPException(status_code=400, detail="No jobs provided")
-    
-    # Index in FAISS/Recommender
+
+def _save_index() -> None:
+    # Removing every job leaves nothing to save
+    if recommender.vector_store.get_status()["is_initialized"]:
+        recommender.save_index(config.INDEX_DIR)
+
+
+# Incremental updates are saved in batches; a full save per call would be O(corpus)
+index_saver = IndexSaver(_save_index, delay_s=config.INDEX_SAVE_DELAY_S)
+
+def _to_recommender_jobs(jobs: List[JobPosting]) -> List[RecommenderJob]:
     # Map Pydantic JobPosting to RecommenderJob
     job_objects = []
     seen_ids = set()
 
-    for job in payload.jobs:
+    for job in jobs:
         if job.job_id in seen_ids:
             continue
         seen_ids.add(job.job_id)
@@ -59,20 +147,90 @@ async def index_jobs(payload: IndexJobsRequest) -> dict:
             min_years_experience=job.min_years_experience
         )
         job_objects.append(rec_job)
-        
-        # 2. Persist to DB (MongoDB)
-        # Note: We rely on the services/indexer.py which delegates to repository.py
-        
+    return job_objects
+
+
+def _to_job_filter(filters: JobFilterRequest | None) -> JobFilter | None:
+    if filters is None:
+        return None
+    job_filter = JobFilter(**filters.model_dump())
+    return None if job_filter.is_empty() else job_filter
+
+
+def _serialize_recommendation(rec: Recommendation) -> dict:
+    return {
+        "job_id": rec.job.job_id,
+        "title": rec.job.title,
+        "company": rec.job.company,
+        "location": rec.job.location,
+        "score": rec.score,
+        "matched_skills": rec.matched_skills,
+        "min_years_experience": rec.job.min_years_experience,
+        "skills": rec.job.skills,
+        "job_type": rec.job.job_type,
+        "experience_level": rec.job.experience_level,
+        "role_type": rec.job.role_type,
+        "url": rec.job.url
+    }
+
+
+@router.post("/jobs/index")
+async def index_jobs(payload: IndexJobsRequest) -> dict:
+    if not payload.jobs:
+        raise HTTPException(status_code=400, detail="No jobs provided")
     
-    # Mongo Logic via Helper
-    index_jobs_from_payload(payload.model_dump())
+    # Index in FAISS/Recommender
+    job_objects = _to_recommender_jobs(payload.jobs)
+        
+    # Persist to DB (MongoDB)
+    # Note: We rely on the services/indexer.py which delegates to repository.py
+    await run_in_threadpool(index_jobs_from_payload, payload.model_dump())
     
-    recommender.index_jobs(job_objects)
-    recommender._last_index_time = datetime.now(timezone.utc)
+    # Off the event loop: embedding and the index lock would stall every other request
+    await run_in_threadpool(recommender.index_jobs, job_objects)
+    # A rebuild rewrites everything anyway, so save it (and any pending updates) now
+    index_saver.mark_dirty()
+    await run_in_threadpool(index_saver.flush)
     
     return {"indexed": len(job_objects), "persisted": True}
 
 
+# Endpoint: Add or replace jobs without rebuilding the index
+@router.post("/jobs/upsert")
+async def upsert_jobs(payload: IndexJobsRequest) -> dict:
+    if not payload.jobs:
+        raise HTTPException(status_code=400, detail="No jobs provided")
+
+    job_objects = _to_recommender_jobs(payload.jobs)
+    await run_in_threadpool(index_jobs_from_payload, payload.model_dump())
+
+    upserted = await run_in_threadpool(recommender.add_jobs, job_objects)
+    index_saver.mark_dirty()
+
+    return {"upserted": upserted, "indexed_total": len(recommender.vector_store)}
+
+
+# Endpoint: Remove jobs from the index and the DB
+@router.post("/jobs/remove")
+async def remove_jobs(payload: RemoveJobsRequest) -> dict:
+    if not payload.job_ids:
+        raise HTTPException(status_code=400, detail="No job ids provided")
+
+    deleted = await run_in_threadpool(remove_jobs_by_ids, payload.job_ids)
+    removed = await run_in_threadpool(recommender.remove_jobs, payload.job_ids)
+    if removed:
+        index_saver.mark_dirty()
+
+    return {"removed": removed, "deleted": deleted, "indexed_total": len(recommender.vector_store)}
+
+
+# Endpoint: Write pending /jobs/upsert and /jobs/remove changes to INDEX_DIR now
+@router.post("/jobs/index/save")
+async def save_index() -> dict:
+    saved = await run_in_threadpool(index_saver.flush)
+    return {"saved": saved, "indexed_total": len(recommender.vector_store)}
+
+
 
 
 # Endpoint: Persist Jobs to DB
@@ -91,8 +249,9 @@ async def recommend_from_text(
     
     candidate_id = "mongo_id" # Placeholder
     try:
-        # 1. Extract Years of Experience
-        years_exp = experience_extractor.extract_years(payload.resume_text)
+        # 1. Preprocess once: cleaned text, skills and years of experience
+        resume = await run_in_threadpool(recommender.preprocessor.process, payload.resume_text, RESUME_FIELDS)
+        years_exp = resume.years_experience
         
         # 2. Save Candidate to DB
         # MongoDB Implementation
@@ -102,15 +261,18 @@ async def recommend_from_text(
             "total_years_experience": years_exp,
             "upload_date": datetime.now(timezone.utc)
         }
-        result = candidates_col.insert_one(candidate_doc)
+        result = await run_in_threadpool(candidates_col.insert_one, candidate_doc)
         candidate_id = str(result.inserted_id)
 
         # 3. Get Recommendations
-        recs = recommender.recommend_for_resume_text(
-            payload.resume_text, 
+        # Off the event loop so concurrent requests can meet in the embedding scheduler
+        recs = (await run_in_threadpool(
+            recommender.recommend_preprocessed,
+            [resume],
             top_k=payload.top_k, 
-            resume_years_experience=years_exp
-        )
+            resume_years_experience=[years_exp],
+            filters=_to_job_filter(payload.filters)
+        ))[0]
         
     except RuntimeError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
@@ -118,98 +280,258 @@ async def recommend_from_text(
     return {
         "candidate_id": candidate_id,
         "detected_years_experience": years_exp,
-        "recommendations": [
+        "recommendations": [_serialize_recommendation(rec) for rec in recs]
+    }
+
+# Endpoint: Recommend for many resumes in one embedding call and one vector search
+@router.post("/recommend/batch")
+async def recommend_batch(payload: BatchRecommendationRequest) -> dict:
+    if payload.top_k <= 0:
+        raise HTTPException(status_code=400, detail="top_k must be positive")
+    if not payload.resume_texts:
+        raise HTTPException(status_code=400, detail="No resumes provided")
+    if len(payload.resume_texts) > config.RECOMMEND_BATCH_MAX:
+        raise HTTPException(
+            status_code=413, detail=f"At most {config.RECOMMEND_BATCH_MAX} resumes per batch"
+        )
+
+    resumes = await run_in_threadpool(recommender.preprocess, payload.resume_texts, RESUME_FIELDS)
+    years = [resume.years_experience for resume in resumes]
+    try:
+        batch_recs = await run_in_threadpool(
+            recommender.recommend_preprocessed,
+            resumes,
+            top_k=payload.top_k,
+            resume_years_experience=years,
+            filters=_to_job_filter(payload.filters)
+        )
+    except RuntimeError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    # One bulk insert for the whole batch
+    upload_date = datetime.now(timezone.utc)
+    candidates_col = get_candidates_collection()
+    result = await run_in_threadpool(candidates_col.insert_many, [
+        {"raw_text": text, "total_years_experience": years_exp, "upload_date": upload_date}
+        for text, years_exp in zip(payload.resume_texts, years)
+    ])
+
+    return {
+        "results": [
             {
-                "job_id": rec.job.job_id,
-                "title": rec.job.title,
-                "company": rec.job.company,
-                "location": rec.job.location,
-                "score": rec.score,
-                "matched_skills": rec.matched_skills,
-                "min_years_experience": rec.job.min_years_experience,
-                "skills": rec.job.skills,
-                "job_type": rec.job.job_type,
-                "experience_level": rec.job.experience_level,
-                "role_type": rec.job.role_type,
-                "url": rec.job.url
+                "candidate_id": str(candidate_id),
+                "detected_years_experience": years_exp,
+                "recommendations": [_serialize_recommendation(rec) for rec in recs]
             }
-            for rec in recs
+            for candidate_id, years_exp, recs in zip(result.inserted_ids, years, batch_recs)
         ]
     }
 
+async def _read_pdf(upload: UploadFile) -> bytes:
+    """The upload's bytes; oversized files are rejected by declared size before reading."""
+    if Path(upload.filename or "resume").suffix.lower() != ".pdf":
+        raise ValueError("Only PDF resumes supported")
+    if upload.size is not None and upload.size > config.PDF_MAX_BYTES:
+        raise PDFTooLargeError(f"PDF larger than {config.PDF_MAX_BYTES} bytes")
+    data = await upload.read(config.PDF_MAX_BYTES + 1)
+    if len(data) > config.PDF_MAX_BYTES:
+        raise PDFTooLargeError(f"PDF larger than {config.PDF_MAX_BYTES} bytes")
+    return data
+
+
+async def _resolve_resumes(files: List[tuple[str | None, bytes]]) -> List[ParsedResume | Exception]:
+    """Parse, preprocess, embed and store each ``(filename, data)``, reusing cached work.
+
+    Files are keyed by the SHA-256 of their bytes: a known file comes back with
+    its existing candidate_id and embedding, so only unseen files are parsed
+    and inserted. A file that fails to parse yields its exception.
+    """
+    digests = [ParsedResumeCache.key(data) for _, data in files]
+    data_by_digest = {digest: data for digest, (_, data) in zip(digests, files)}
+    name_by_digest = {}
+    for digest, (name, _) in zip(digests, files):
+        name_by_digest.setdefault(digest, name)
+    entries: dict[str, ParsedResume | Exception | None] = (
+        await run_in_threadpool(resume_cache.get_many, list(data_by_digest))
+        if resume_cache is not None
+        else dict.fromkeys(data_by_digest)
+    )
+
+    new = [digest for digest, entry in entries.items() if entry is None]
+    texts = await pdf_parser.extract_many([data_by_digest[digest] for digest in new]) if new else []
+    for digest, text in zip(new, texts):
+        entries[digest] = (
+            text if isinstance(text, Exception) else ParsedResume(digest, "", text, resume=None, embedding=None)
+        )
+    parsed = [entry for entry in entries.values() if isinstance(entry, ParsedResume)]
+
+    # Fill in whatever is missing: everything for new files, or what a
+    # taxonomy / embedding model change invalidated for cached ones
+    refreshed = [
+        entry for entry in parsed if entry.candidate_id and (entry.resume is None or entry.embedding is None)
+    ]
+    stale = [entry for entry in parsed if entry.resume is None]
+    if stale:
+        texts = [entry.text for entry in stale]
+        for entry, resume in zip(stale, await run_in_threadpool(recommender.preprocess, texts, RESUME_FIELDS)):
+            entry.resume = resume
+    unembedded = [entry for entry in parsed if entry.embedding is None]
+    if unembedded:
+        embeddings = await run_in_threadpool(recommender.embed, [entry.resume for entry in unembedded])
+        for entry, embedding in zip(unembedded, embeddings):
+            entry.embedding = embedding
+
+    inserts = [entry for entry in parsed if not entry.candidate_id]
+    if inserts:
+        upload_date = datetime.now(timezone.utc)
+        documents = [
+            {
+                "name": name_by_digest[entry.digest],
+                "raw_text": entry.text,
+                "total_years_experience": entry.resume.years_experience,
+                "upload_date": upload_date,
+            }
+            for entry in inserts
+        ]
+        if resume_cache is not None:
+            # Upserted on the digest: concurrent uploads of one file share a candidate
+            await run_in_threadpool(resume_cache.store, inserts, documents, get_candidates_collection())
+        else:
+            result = await run_in_threadpool(get_candidates_collection().insert_many, documents)
+            for entry, candidate_id in zip(inserts, result.inserted_ids):
+                entry.candidate_id = str(candidate_id)
+    if resume_cache is not None:
+        if refreshed:
+            # Store the recomputed fields so the next restart or eviction doesn't redo them
+            await run_in_threadpool(resume_cache.persist, refreshed)
+        for entry in parsed:
+            resume_cache.put(entry)
+    return [entries[digest] for digest in digests]
+
+
+def _upload_filter(
+    location: str | None, job_type: str | None, experience_level: str | None, role_type: str | None, tags: List[str]
+) -> JobFilter | None:
+    return _to_job_filter(
+        JobFilterRequest(
+            location=location,
+            job_type=job_type,
+            experience_level=experience_level,
+            role_type=role_type,
+            tags=tags,
+        )
+    )
+
+
 #  Recommend from PDF Resume File
 @router.post("/recommend/file")
 async def recommend_from_file(
     upload: UploadFile = File(...), 
-    top_k: int = 5
+    top_k: int = 5,
+    location: str | None = None,
+    job_type: str | None = None,
+    experience_level: str | None = None,
+    role_type: str | None = None,
+    tags: List[str] = Query(default=[])
 ) -> dict:
     if top_k <= 0:
         raise HTTPException(status_code=400, detail="top_k must be positive")
 
+    try:
+        data = await _read_pdf(upload)
+        # A repeat upload of the same file skips parsing, embedding and the insert
+        resume = (await _resolve_resumes([(upload.filename, data)]))[0]
+        if isinstance(resume, Exception):
+            raise resume
+    except PDFTooLargeError as exc:
+        raise HTTPException(status_code=413, detail=str(exc)) from exc
+    except PDFTimeoutError as exc:
+        raise HTTPException(status_code=504, detail=str(exc)) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    finally:
+        await upload.close()
 
-    suffix = Path(upload.filename or "resume").suffix.lower()
-    if suffix != ".pdf":
-        raise HTTPException(status_code=400, detail="Only PDF resumes supported")
-
+    years_exp = resume.resume.years_experience
+    recs = (await run_in_threadpool(
+        recommender.recommend_preprocessed,
+        [resume.resume],
+        top_k=top_k,
+        resume_years_experience=[years_exp],
+        filters=_upload_filter(location, job_type, experience_level, role_type, tags),
+        embeddings=resume.embedding[None, :]
+    ))[0]
 
-    contents = await upload.read()
-    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-        tmp.write(contents)
-        tmp_path = Path(tmp.name)
+    return {
+        "candidate_id": resume.candidate_id,
+        "detected_years_experience": years_exp,
+        "recommendations": [_serialize_recommendation(rec) for rec in recs]
+    }
 
+#  Recommend for a bulk upload of PDF resumes (e.g. a recruiter's folder)
+@router.post("/recommend/files")
+async def recommend_from_files(
+    uploads: List[UploadFile] = File(...),
+    top_k: int = 5,
+    location: str | None = None,
+    job_type: str | None = None,
+    experience_level: str | None = None,
+    role_type: str | None = None,
+    tags: List[str] = Query(default=[])
+) -> dict:
+    if top_k <= 0:
+        raise HTTPException(status_code=400, detail="top_k must be positive")
+    if len(uploads) > config.PDF_BULK_MAX:
+        raise HTTPException(status_code=413, detail=f"At most {config.PDF_BULK_MAX} files per upload")
 
-    candidate_id = "mongo_id"
+    errors: dict[int, str] = {}
+    files: dict[int, tuple[str | None, bytes]] = {}
     try:
-        # Extract Text
-        parser = PDFParser()
-        resume_text = parser.extract_text(tmp_path)
-        
-        # Extract Experience
-        years_exp = experience_extractor.extract_years(resume_text)
-
-        #  Save to DB
-        candidates_col = get_candidates_collection()
-        candidate_doc = {
-            "name": upload.filename,
-            "raw_text": resume_text,
-            "total_years_experience": years_exp,
-            "upload_date": datetime.now(timezone.utc)
-        }
-        result = candidates_col.insert_one(candidate_doc)
-        candidate_id = str(result.inserted_id)
-        
-        # 4. Recommend
-        recs = recommender.recommend_for_resume_text(
-            resume_text, 
-            top_k=top_k,
-            resume_years_experience=years_exp
-        )
-        
+        for i, upload in enumerate(uploads):
+            try:
+                files[i] = (upload.filename, await _read_pdf(upload))
+            except ValueError as exc:
+                errors[i] = str(exc)
     finally:
-        try:
-            tmp_path.unlink()
-        except OSError:
-            logger.warning("Failed to clean up temp file %s", tmp_path)
+        for upload in uploads:
+            await upload.close()
 
+    # All documents parse concurrently across the PDF workers; one bad file
+    # is reported in its slot instead of failing the whole upload
+    resumes: dict[int, ParsedResume] = {}
+    for i, result in zip(files, await _resolve_resumes(list(files.values()))):
+        if isinstance(result, (PDFTooLargeError, PDFTimeoutError)):
+            errors[i] = str(result)
+        elif isinstance(result, Exception):
+            logger.warning("Failed to parse %s: %s", uploads[i].filename, result)
+            errors[i] = "Could not parse PDF"
+        else:
+            resumes[i] = result
 
-    return {
-        "candidate_id": candidate_id,
-        "detected_years_experience": years_exp,
-        "recommendations": [
-            {
-                "job_id": rec.job.job_id,
-                "title": rec.job.title,
-                "company": rec.job.company,
-                "location": rec.job.location,
-                "score": rec.score,
-                "matched_skills": rec.matched_skills,
-                "min_years_experience": rec.job.min_years_experience,
-                "skills": rec.job.skills,
-                "job_type": rec.job.job_type,
-                "experience_level": rec.job.experience_level,
-                "role_type": rec.job.role_type,
-                "url": rec.job.url
+    results: List[dict] = [
+        {"filename": upload.filename, "error": errors.get(i)} for i, upload in enumerate(uploads)
+    ]
+    if resumes:
+        parsed = list(resumes.values())
+        years = [entry.resume.years_experience for entry in parsed]
+        try:
+            batch_recs = await run_in_threadpool(
+                recommender.recommend_preprocessed,
+                [entry.resume for entry in parsed],
+                top_k=top_k,
+                resume_years_experience=years,
+                filters=_upload_filter(location, job_type, experience_level, role_type, tags),
+                embeddings=np.stack([entry.embedding for entry in parsed])
+            )
+        except RuntimeError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+        for i, entry, years_exp, recs in zip(resumes, parsed, years, batch_recs):
+            results[i] = {
+                "filename": uploads[i].filename,
+                "candidate_id": entry.candidate_id,
+                "detected_years_experience": years_exp,
+                "recommendations": [_serialize_recommendation(rec) for rec in recs]
             }
-            for rec in recs
-        ]
-    }
+
+    return {"results": results}
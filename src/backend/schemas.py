@@ -27,9 +27,25 @@ class JobPosting(JobPostingBase):
 class IndexJobsRequest(BaseModel):
     jobs: List[JobPostingCreate]
 
+class RemoveJobsRequest(BaseModel):
+    job_ids: List[str]
+
+class JobFilterRequest(BaseModel):
+    location: Optional[str] = None
+    job_type: Optional[str] = None
+    experience_level: Optional[str] = None
+    role_type: Optional[str] = None
+    tags: List[str] = []
+
 class RecommendationRequest(BaseModel):
     resume_text: str
     top_k: int = 5
+    filters: Optional[JobFilterRequest] = None
+
+class BatchRecommendationRequest(BaseModel):
+    resume_texts: List[str]
+    top_k: int = 5
+    filters: Optional[JobFilterRequest] = None
 
 class CandidateCreate(BaseModel):
     name: Optional[str] = None
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Callable
+
+from ...utils.logging_utils import setup_logging
+
+logger = logging.getLogger(__name__)
+setup_logging()
+
+
+class IndexSaver:
+    """Batches index saves after incremental updates.
+
+    A full save rewrites the FAISS index and every job record, so upserts and
+    removals only call :meth:`mark_dirty`: the first change starts a timer and
+    one save ``delay_s`` later covers every change made in between. With
+    ``delay_s <= 0`` each change saves immediately. :meth:`flush` saves now
+    (e.g. from an endpoint or at shutdown) if anything is pending.
+    """
+
+    def __init__(self, save: Callable[[], object], delay_s: float = 30.0) -> None:
+        self._save = save
+        self.delay_s = delay_s
+        self._lock = threading.Lock()
+        # Serializes saves so a timer save and a flush never write the same files at once
+        self._save_lock = threading.Lock()
+        self._timer: threading.Timer | None = None
+        self._dirty = False
+        self.saves = 0
+
+    def mark_dirty(self) -> None:
+        if self.delay_s <= 0:
+            with self._lock:
+                self._dirty = True
+            self.flush()
+            return
+        with self._lock:
+            self._dirty = True
+            if self._timer is None:
+                self._timer = threading.Timer(self.delay_s, self._run)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> bool:
+        """Save now if there are unsaved changes; returns whether a save ran."""
+        with self._save_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._dirty:
+                    return False
+                # Cleared before saving: changes made during the save mark it dirty again
+                self._dirty = False
+            try:
+                self._save()
+            except Exception:
+                with self._lock:
+                    self._dirty = True
+                raise
+            self.saves += 1
+            return True
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {"dirty": self._dirty, "saves": self.saves, "delay_s": self.delay_s}
+
+    def _run(self) -> None:
+        with self._lock:
+            if self._timer is threading.current_thread():
+                self._timer = None
+        try:
+            self.flush()
+        except Exception as exc:
+            logger.warning("Deferred index save failed: %s", exc)
@@ -1,6 +1,6 @@
-from src.backend.db.repository import add_jobs
+from src.backend.db.repository import add_jobs, remove_jobs
 from src.recommender.recommender import JobPosting
-from typing import Any
+from typing import Any, List
 
 def index_jobs_from_payload(payload: dict) -> int:
     """Transform incoming payload into DB rows and persist."""
@@ -13,3 +13,10 @@ def index_jobs_from_payload(payload: dict) -> int:
         
     count = add_jobs(jobs_data)
     return count
+
+
+def remove_jobs_by_ids(job_ids: List[str]) -> int:
+    """Delete persisted jobs by id."""
+    if not job_ids:
+        return 0
+    return remove_jobs(job_ids)
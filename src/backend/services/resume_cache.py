@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from ...preprocessing.pipeline import PreprocessedText
+from ...utils.logging_utils import setup_logging
+
+logger = logging.getLogger(__name__)
+setup_logging()
+
+# Field on candidate documents holding the hex SHA-256 of the uploaded file
+DIGEST_FIELD = "content_sha256"
+_DUPLICATE_KEY = 11000
+
+
+@dataclass
+class ParsedResume:
+    """What one uploaded file produced, so a repeat upload can skip straight to search.
+
+    ``resume`` is None when it was derived under another skill taxonomy and
+    ``embedding`` is None when it came from another embedding model; the
+    caller recomputes only the missing part (the PDF is never re-parsed).
+    """
+    digest: str
+    candidate_id: str
+    text: str
+    resume: Optional[PreprocessedText]
+    embedding: Optional[np.ndarray]
+
+
+class ParsedResumeCache:
+    """Content-addressed cache of parsed resume uploads (SHA-256 of the file bytes).
+
+    Entries live in an in-memory LRU of ``max_entries``. With a
+    ``collection`` (a callable returning the Mongo ``candidates`` collection),
+    misses fall through to the candidate document stored for the same digest,
+    and :meth:`document_fields` gives the fields to store on new candidates.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        collection: Callable[[], Any] | None = None,
+        embedding_model: str = "",
+        taxonomy_version: int = 0,
+    ) -> None:
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        self.max_entries = max_entries
+        self.embedding_model = embedding_model
+        self.taxonomy_version = taxonomy_version
+        self._collection = collection
+        self._index_ready = False
+        self._entries: OrderedDict[str, ParsedResume] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, digest: str) -> ParsedResume | None:
+        return self.get_many([digest])[digest]
+
+    def get_many(self, digests: Iterable[str]) -> Dict[str, ParsedResume | None]:
+        """Look digests up in memory, then in one Mongo query for the rest."""
+        found: Dict[str, ParsedResume | None] = {}
+        with self._lock:
+            for digest in digests:
+                entry = self._entries.get(digest)
+                if entry is not None:
+                    self._entries.move_to_end(digest)
+                found[digest] = entry
+        missing = [digest for digest, entry in found.items() if entry is None]
+        if missing and self._collection is not None:
+            for entry in self._load(missing):
+                found[entry.digest] = entry
+                self.put(entry)
+        with self._lock:
+            hits = sum(1 for entry in found.values() if entry is not None)
+            self.hits += hits
+            self.misses += len(found) - hits
+        return found
+
+    def put(self, entry: ParsedResume) -> None:
+        with self._lock:
+            self._entries[entry.digest] = entry
+            self._entries.move_to_end(entry.digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def document_fields(self, entry: ParsedResume) -> dict:
+        """Fields to store on the candidate document so other processes and restarts can reuse it."""
+        fields: Dict[str, Any] = {DIGEST_FIELD: entry.digest}
+        if entry.resume is not None:
+            fields["parsed"] = {
+                "taxonomy_version": self.taxonomy_version,
+                "cleaned": entry.resume.cleaned,
+                "skill_ids": sorted(entry.resume.skill_ids),
+                "skills": entry.resume.skills,
+                "years_experience": entry.resume.years_experience,
+                "environment": entry.resume.environment,
+            }
+        if entry.embedding is not None:
+            fields["embedding"] = {
+                "model": self.embedding_model,
+                "vector": np.asarray(entry.embedding, dtype=np.float32).tobytes(),
+            }
+        return fields
+
+    def store(self, entries: List[ParsedResume], documents: List[dict], collection: Any) -> None:
+        """Store one candidate per digest and set each entry's ``candidate_id``.
+
+        Upserts on the digest, so two concurrent uploads of the same file end up
+        on the same candidate instead of inserting it twice; the first one's
+        ``documents`` fields win.
+        """
+        if not entries:
+            return
+        self._ensure_index(collection)
+        requests = []
+        for entry, document in zip(entries, documents):
+            fields = {**document, **self.document_fields(entry)}
+            fields.pop(DIGEST_FIELD)  # set from the filter on insert
+            requests.append(UpdateOne({DIGEST_FIELD: entry.digest}, {"$setOnInsert": fields}, upsert=True))
+        try:
+            collection.bulk_write(requests, ordered=False)
+        except BulkWriteError as exc:
+            # A concurrent upload inserted the digest first; its candidate is adopted below
+            if any(error.get("code") != _DUPLICATE_KEY for error in exc.details.get("writeErrors", [])):
+                raise
+        stored: Dict[str, Any] = {}
+        digests = [entry.digest for entry in entries]
+        for document in collection.find({DIGEST_FIELD: {"$in": digests}}, {"_id": 1, DIGEST_FIELD: 1}):
+            stored.setdefault(document[DIGEST_FIELD], document["_id"])
+        for entry in entries:
+            entry.candidate_id = str(stored[entry.digest])
+
+    def persist(self, entries: Iterable[ParsedResume]) -> None:
+        """Write recomputed parsed/embedding fields back onto the stored candidates with the same digest."""
+        if self._collection is None:
+            return
+        try:
+            collection = self._collection()
+            for entry in entries:
+                collection.update_many({DIGEST_FIELD: entry.digest}, {"$set": self.document_fields(entry)})
+        except Exception as exc:
+            logger.warning("Parsed-resume update failed: %s", exc)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    def _load(self, digests: List[str]) -> List[ParsedResume]:
+        try:
+            collection = self._collection()
+            self._ensure_index(collection)
+            documents = list(collection.find(
+                {DIGEST_FIELD: {"$in": digests}},
+                {DIGEST_FIELD: 1, "raw_text": 1, "parsed": 1, "embedding": 1},
+            ))
+        except Exception as exc:
+            # The cache is an optimization: a Mongo hiccup means re-parsing, not a failed upload
+            logger.warning("Parsed-resume lookup failed: %s", exc)
+            return []
+        entries: Dict[str, ParsedResume] = {}
+        for document in documents:
+            # Several candidates can share a digest if they were stored before the cache; keep the first
+            digest = document[DIGEST_FIELD]
+            if digest not in entries:
+                entries[digest] = self._from_document(document)
+        return list(entries.values())
+
+    def _ensure_index(self, collection: Any) -> None:
+        if self._index_ready:
+            return
+        try:
+            # Unique per digest; older candidates without one are left out of the index
+            collection.create_index(
+                DIGEST_FIELD, unique=True, partialFilterExpression={DIGEST_FIELD: {"$type": "string"}}
+            )
+        except Exception as exc:
+            # e.g. duplicates stored before the index existed: lookups still work, only the
+            # insert race is no longer caught by the database
+            logger.warning("Could not create unique index on %s: %s", DIGEST_FIELD, exc)
+        self._index_ready = True
+
+    def _from_document(self, document: dict) -> ParsedResume:
+        parsed = document.get("parsed") or {}
+        resume = None
+        if parsed and parsed.get("taxonomy_version") == self.taxonomy_version:
+            resume = PreprocessedText(
+                cleaned=parsed["cleaned"],
+                skill_ids=set(parsed["skill_ids"]),
+                skills=list(parsed["skills"]),
+                years_experience=parsed["years_experience"],
+                environment=list(parsed.get("environment") or []),
+            )
+        stored = document.get("embedding") or {}
+        embedding = None
+        if stored.get("model") == self.embedding_model and stored.get("vector"):
+            embedding = np.frombuffer(stored["vector"], dtype=np.float32)
+        return ParsedResume(
+            digest=document[DIGEST_FIELD],
+            candidate_id=str(document["_id"]),
+            text=document.get("raw_text") or "",
+            resume=resume,
+            embedding=embedding,
+        )
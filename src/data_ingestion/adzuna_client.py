@@ -6,15 +6,16 @@ from typing import List, Optional
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+from src.preprocessing.batch import BatchPreprocessor
 from src.preprocessing.skill_extractor import SkillExtractor
 from src.preprocessing.text_cleaner import TextCleaner
 from src.data_ingestion.schemas import AdzunaJob
 from src.data_ingestion.tag_generator import DataJobTagGenerator
-from src.data_ingestion.config import APP_ID, APP_KEY, BASE_URL, DATA_PROFESSIONAL_SKILLS
+from src.data_ingestion.config import APP_ID, APP_KEY, BASE_URL
 
 
 class AdzunaClient:
-    def __init__(self, stopwords: Optional[List[str]] = None):
+    def __init__(self, stopwords: Optional[List[str]] = None, workers: int = 0):
         # Safe request session
         self.session = requests.Session()
         # # Use a real browser User-Agent to avoid 403 Forbidden
@@ -34,8 +35,11 @@ class AdzunaClient:
         self.session.mount("https://", adapter)
 
         self.text_cleaner = TextCleaner(stopwords)
-        self.skill_extractor = SkillExtractor(DATA_PROFESSIONAL_SKILLS)
+        # Matches against the shared skill taxonomy
+        self.skill_extractor = SkillExtractor()
         self.tagger = DataJobTagGenerator(self.skill_extractor, self.text_cleaner)
+        # Tagging runs once per fetch, after the network I/O, optionally across processes
+        self.batch_preprocessor = BatchPreprocessor(self.tagger.preprocessor, workers=workers)
 
 
     def fetch_full_description(self, url: str) -> str:
@@ -85,15 +89,10 @@ class AdzunaClient:
             for entry in results:
                 job = self._map_to_job(entry)
                 if job:
-                    # Extract skills & tags & experience
-                    skills, tags, role_type, min_years = self.tagger.generate_tags(job)
-                    job.skills = skills
-                    job.tags = tags
-                    job.role_type = role_type
-                    job.min_years_experience = min_years
                     jobs.append(job)
 
-        return jobs
+        # Extract skills & tags & experience for the whole fetch in one batch
+        return list(self.tagger.tag_jobs(jobs, self.batch_preprocessor))
 
     #map api response to job desc 
     def _map_to_job(self, entry: dict) -> Optional[AdzunaJob]:
@@ -12,10 +12,11 @@ def fetch_all_data_jobs(
     output_path: str = "data/processed/adzuna_data_jobs.json",
     location: str = "Canada",
     stopwords: Optional[List[str]] = None,
+    workers: int = 0,
 ):
     
     
-    client = AdzunaClient(stopwords)
+    client = AdzunaClient(stopwords, workers=workers)
     all_jobs: List[AdzunaJob] = []
 
     for role in DATA_ROLE_QUERIES:
@@ -23,6 +24,7 @@ def fetch_all_data_jobs(
         jobs = client.fetch_jobs(role, pages=pages_per_role, location=location)
         all_jobs.extend(jobs)
         print(f"  Collected {len(jobs)} jobs for {role}")
+    client.batch_preprocessor.close()
 
     # Save to JSON
     Path(output_path).parent.mkdir(parents=True, exist_ok=True)
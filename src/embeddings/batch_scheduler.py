@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+from typing import Iterable, Iterator, List, Tuple
+
+import numpy as np
+
+from ..utils.logging_utils import setup_logging
+from .text_embedder import TextEmbedder
+
+logger = logging.getLogger(__name__)
+setup_logging()
+
+# Recent queue waits kept for the percentile in get_stats()
+_WAIT_SAMPLES = 1024
+
+
+class EmbeddingScheduler:
+    """Coalesces concurrent ``encode`` calls into shared model batches.
+
+    Callers block on a future while a single worker thread drains the queue:
+    a batch is flushed once it holds ``max_batch_size`` texts or
+    ``max_wait_ms`` after its first request arrived, whichever comes first.
+    Exposes the same ``encode`` / ``model_name`` / ``cache_stats`` surface as
+    :class:`TextEmbedder`, so it can be handed to the recommender in its place.
+    """
+
+    def __init__(self, embedder: TextEmbedder, max_batch_size: int = 32, max_wait_ms: float = 5.0) -> None:
+        if max_batch_size <= 0:
+            raise ValueError("max_batch_size must be positive")
+        self.embedder = embedder
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._queue: queue.Queue[Tuple[List[str], Future, float, bool] | None] = queue.Queue()
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._requests = 0
+        self._texts = 0
+        self._batch_sizes: Counter[int] = Counter()
+        self._waits_ms: deque[float] = deque(maxlen=_WAIT_SAMPLES)
+        self._worker = threading.Thread(target=self._run, name="embedding-scheduler", daemon=True)
+        self._worker.start()
+
+    @property
+    def model_name(self) -> str:
+        return self.embedder.model_name
+
+    def cache_stats(self) -> dict | None:
+        return self.embedder.cache_stats()
+
+    def iter_encode(self, texts: Iterable[str], workers: int = 1, chunk_size: int = 1024) -> Iterator[np.ndarray]:
+        # Bulk indexing bypasses the queue; micro-batching only helps small concurrent calls
+        return self.embedder.iter_encode(texts, workers=workers, chunk_size=chunk_size)
+
+    def submit(self, texts: Iterable[str], use_cache: bool = True) -> Future:
+        future: Future = Future()
+        texts = list(texts)
+        if not texts:
+            future.set_result(self.embedder.encode([]))
+            return future
+        if not self._worker.is_alive():
+            raise RuntimeError("Embedding scheduler is closed")
+        self._queue.put((texts, future, time.perf_counter(), bool(use_cache)))
+        return future
+
+    def encode(self, texts: Iterable[str], use_cache: bool = True) -> np.ndarray:
+        return self.submit(texts, use_cache=use_cache).result()
+
+    def close(self) -> None:
+        if self._worker.is_alive():
+            self._queue.put(None)
+            self._worker.join()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            waits = np.fromiter(self._waits_ms, dtype=np.float64)
+            return {
+                "queue_depth": self._queue.qsize(),
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait_ms,
+                "batches": self._batches,
+                "requests": self._requests,
+                "texts": self._texts,
+                "mean_batch_size": round(self._texts / self._batches, 2) if self._batches else None,
+                # Keys are power-of-two upper bounds: "4" counts batches of 3-4 texts
+                "batch_size_histogram": {str(size): count for size, count in sorted(self._batch_sizes.items())},
+                "mean_wait_ms": round(float(waits.mean()), 3) if waits.size else None,
+                "p95_wait_ms": round(float(np.percentile(waits, 95)), 3) if waits.size else None,
+            }
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            size = len(item[0])
+            deadline = item[2] + self.max_wait_ms / 1000
+            stop = False
+            while size < self.max_batch_size:
+                timeout = deadline - time.perf_counter()
+                try:
+                    item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+                size += len(item[0])
+            self._flush(batch)
+            if stop:
+                return
+
+    def _flush(self, batch: List[Tuple[List[str], Future, float, bool]]) -> None:
+        started = time.perf_counter()
+        texts = [text for request_texts, _, _, _ in batch for text in request_texts]
+        with self._lock:
+            self._batches += 1
+            self._requests += len(batch)
+            self._texts += len(texts)
+            self._batch_sizes[1 << (len(texts) - 1).bit_length()] += 1
+            self._waits_ms.extend((started - enqueued) * 1000 for _, _, enqueued, _ in batch)
+        # Cached (job) and uncached (query) requests share the wait but not the encode call
+        for use_cache in (True, False):
+            group = [item for item in batch if item[3] is use_cache]
+            if group:
+                self._encode_group(group, use_cache)
+
+    def _encode_group(self, batch: List[Tuple[List[str], Future, float, bool]], use_cache: bool) -> None:
+        texts = [text for request_texts, _, _, _ in batch for text in request_texts]
+        try:
+            embeddings = self.embedder.encode(texts, use_cache=use_cache)
+        except Exception as exc:  # hand the failure to every caller in the batch
+            logger.error("Embedding batch of %d texts failed: %s", len(texts), exc)
+            for _, future, _, _ in batch:
+                future.set_exception(exc)
+            return
+        start = 0
+        for request_texts, future, _, _ in batch:
+            future.set_result(embeddings[start:start + len(request_texts)])
+            start += len(request_texts)
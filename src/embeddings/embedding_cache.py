@@ -0,0 +1,320 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from ..utils.logging_utils import setup_logging
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, keep one process per cache directory
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+setup_logging()
+
+VECTORS_FILENAME = "vectors.f32"
+KEYS_FILENAME = "keys.bin"
+META_FILENAME = "meta.json"
+LOCK_FILENAME = ".lock"
+GENERATION_PREFIX = "gen-"
+KEY_BYTES = 16
+_FORMAT_VERSION = 2
+
+
+class EmbeddingCache:
+    """Content-addressed on-disk cache of embeddings for one model.
+
+    Each entry is keyed by a blake2b digest of the (cleaned) text and stored
+    as one row of an append-only float32 matrix (``vectors.f32``, read via
+    ``np.memmap``) with the digests alongside in ``keys.bin``. The digest to
+    row index is rebuilt from ``keys.bin`` on open. When the cache grows past
+    ``max_entries`` it is compacted down to the most recently used entries.
+
+    Both files live in a generation directory (``gen-<n>/``) named by
+    ``meta.json``. Compaction writes the survivors to the next generation and
+    switches to it by atomically replacing ``meta.json``, so a crash leaves
+    either the old or the new generation whole. Several processes can share
+    a directory: writes hold an ``fcntl.flock`` on ``.lock`` and every
+    lookup or append first catches up with what other processes appended.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        model_name: str,
+        max_entries: int = 200_000,
+        compact_ratio: float = 0.8,
+    ) -> None:
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        self.model_name = model_name
+        self.directory = Path(directory) / model_name.replace("/", "__")
+        self.max_entries = max_entries
+        # Compaction keeps this fraction of max_entries so it doesn't run on every put
+        self._keep = max(1, int(max_entries * compact_ratio))
+        self._lock = threading.Lock()
+        self._dimension: int | None = None
+        # digest -> row, least recently used first
+        self._rows: OrderedDict[bytes, int] = OrderedDict()
+        self._row_count = 0
+        self._generation = 0
+        self._matrix: np.ndarray | None = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._open()
+
+    @staticmethod
+    def key(text: str) -> bytes:
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=KEY_BYTES).digest()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def get_many(self, keys: Sequence[bytes]) -> Tuple[np.ndarray | None, np.ndarray]:
+        """Return ``(vectors, hit_mask)``; rows of ``vectors`` are only valid where ``hit_mask`` is set."""
+        hit_mask = np.zeros(len(keys), dtype=bool)
+        with self._lock, self._file_lock(exclusive=False):
+            self._sync()
+            if self._dimension is None or not self._rows:
+                self.misses += len(keys)
+                return None, hit_mask
+            positions: List[int] = []
+            rows: List[int] = []
+            for position, key in enumerate(keys):
+                row = self._rows.get(key)
+                if row is not None:
+                    self._rows.move_to_end(key)
+                    positions.append(position)
+                    rows.append(row)
+            vectors = np.zeros((len(keys), self._dimension), dtype=np.float32)
+            if rows:
+                vectors[positions] = self._mapped()[rows]
+                hit_mask[positions] = True
+            self.hits += len(rows)
+            self.misses += len(keys) - len(rows)
+        return vectors, hit_mask
+
+    def put_many(self, keys: Sequence[bytes], vectors: np.ndarray) -> None:
+        """Append new entries; keys already cached are skipped."""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or len(keys) != vectors.shape[0]:
+            raise ValueError("Key and vector count mismatch")
+        if not len(keys):
+            return
+        with self._lock, self._file_lock(exclusive=True):
+            # Under the exclusive lock the files hold exactly _row_count rows after
+            # catching up and trimming, so the new rows start there in every process
+            self._sync()
+            self._trim()
+            if self._dimension is None:
+                self._dimension = int(vectors.shape[1])
+                self._generation = max(self._generation, 1)
+                self._write_meta()
+            elif vectors.shape[1] != self._dimension:
+                raise ValueError(f"Expected {self._dimension}-dim vectors, got {vectors.shape[1]}")
+
+            fresh: Dict[bytes, int] = {}
+            for position, key in enumerate(keys):
+                if key not in self._rows:
+                    fresh[key] = position
+            if not fresh:
+                return
+            # Vectors first: a crash between the two writes leaves rows without keys,
+            # which _sync() ignores and the next writer trims, never keys pointing at missing rows
+            generation_dir = self._generation_dir(self._generation)
+            generation_dir.mkdir(exist_ok=True)
+            with open(generation_dir / VECTORS_FILENAME, "ab") as f:
+                f.write(vectors[list(fresh.values())].tobytes())
+            with open(generation_dir / KEYS_FILENAME, "ab") as f:
+                f.write(b"".join(fresh))
+            for key in fresh:
+                self._rows[key] = self._row_count
+                self._row_count += 1
+            self._matrix = None
+            if len(self._rows) > self.max_entries:
+                self._compact()
+
+    def clear(self) -> None:
+        with self._lock, self._file_lock(exclusive=True):
+            self._sync()
+            self._clear()
+
+    def get_stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "path": str(self.directory),
+            "model_name": self.model_name,
+            "entries": len(self._rows),
+            "max_entries": self.max_entries,
+            "dimension": self._dimension,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "size_bytes": self._row_count * (self._dimension or 0) * 4,
+        }
+
+    def _open(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._lock, self._file_lock(exclusive=True):
+            meta = self._read_meta()
+            if meta is None:
+                return
+            if meta.get("format_version") != _FORMAT_VERSION or meta.get("model_name") != self.model_name:
+                logger.warning("Discarding incompatible embedding cache at %s", self.directory)
+                self._generation = int(meta.get("generation") or 0)
+                self._clear()
+                return
+            self._sync()
+            self._trim()
+            # Generations left behind by a compaction that crashed before or after the switch
+            self._remove_stale()
+        logger.info("Opened embedding cache with %d entries at %s", self._row_count, self.directory)
+
+    @contextmanager
+    def _file_lock(self, exclusive: bool) -> Iterator[None]:
+        """Hold an flock on ``.lock``; opened per call so forked children never share it."""
+        if fcntl is None:
+            yield
+            return
+        with open(self.directory / LOCK_FILENAME, "a+b") as f:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _generation_dir(self, generation: int) -> Path:
+        return self.directory / f"{GENERATION_PREFIX}{generation}"
+
+    def _read_meta(self) -> dict | None:
+        try:
+            with open(self.directory / META_FILENAME, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _sync(self) -> None:
+        """Catch up with rows other processes appended and with their compactions or clears."""
+        meta = self._read_meta()
+        generation = int(meta.get("generation") or 0) if meta else 0
+        if generation != self._generation:
+            # Compacted or cleared elsewhere: our row numbers point into a generation that is gone
+            self._rows.clear()
+            self._row_count = 0
+            self._matrix = None
+            self._generation = generation
+        if meta and meta.get("dimension") is not None:
+            self._dimension = int(meta["dimension"])
+        if not generation or self._dimension is None:
+            return
+        generation_dir = self._generation_dir(generation)
+        keys_path = generation_dir / KEYS_FILENAME
+        vectors_path = generation_dir / VECTORS_FILENAME
+        if not keys_path.exists() or keys_path.stat().st_size < (self._row_count + 1) * KEY_BYTES:
+            return
+        with open(keys_path, "rb") as f:
+            f.seek(self._row_count * KEY_BYTES)
+            tail = f.read()
+        # Only rows whose vector is on disk too; a longer file is a crashed writer's torn tail
+        vector_rows = vectors_path.stat().st_size // (4 * self._dimension) if vectors_path.exists() else 0
+        rows = min(self._row_count + len(tail) // KEY_BYTES, vector_rows)
+        for offset, row in enumerate(range(self._row_count, rows)):
+            self._rows[tail[offset * KEY_BYTES:(offset + 1) * KEY_BYTES]] = row
+        if rows != self._row_count:
+            self._row_count = rows
+            self._matrix = None
+
+    def _trim(self) -> None:
+        """Drop a torn tail left by an interrupted append; needs the exclusive lock."""
+        if not self._generation or self._dimension is None:
+            return
+        generation_dir = self._generation_dir(self._generation)
+        for name, row_bytes in ((KEYS_FILENAME, KEY_BYTES), (VECTORS_FILENAME, 4 * self._dimension)):
+            path = generation_dir / name
+            if path.exists() and path.stat().st_size != self._row_count * row_bytes:
+                with open(path, "r+b") as f:
+                    f.truncate(self._row_count * row_bytes)
+
+    def _remove_stale(self) -> None:
+        """Delete other generations and files from older layouts; needs the exclusive lock."""
+        current = self._generation_dir(self._generation).name
+        for path in self.directory.iterdir():
+            if path.name.startswith(GENERATION_PREFIX) and path.name != current:
+                shutil.rmtree(path, ignore_errors=True)
+            elif path.name in (VECTORS_FILENAME, KEYS_FILENAME) or path.name.endswith(".tmp"):
+                path.unlink(missing_ok=True)
+
+    def _clear(self) -> None:
+        # A fresh (empty) generation rather than deleting meta.json, so generation
+        # numbers only grow and other processes notice the clear
+        self._generation += 1
+        self._write_meta()
+        self._remove_stale()
+        self._rows.clear()
+        self._row_count = 0
+        self._matrix = None
+
+    def _mapped(self) -> np.ndarray:
+        if self._matrix is None:
+            self._matrix = np.memmap(
+                self._generation_dir(self._generation) / VECTORS_FILENAME,
+                dtype=np.float32,
+                mode="r",
+                shape=(self._row_count, self._dimension),
+            )
+        return self._matrix
+
+    def _compact(self) -> None:
+        # Rewrite the most recently used entries, oldest first, so file order keeps
+        # approximating recency across restarts
+        survivors = list(self._rows.items())[-self._keep:]
+        matrix = self._mapped()
+        rows = [row for _, row in survivors]
+        generation = self._generation + 1
+        generation_dir = self._generation_dir(generation)
+        shutil.rmtree(generation_dir, ignore_errors=True)
+        generation_dir.mkdir()
+        with open(generation_dir / VECTORS_FILENAME, "wb") as f:
+            f.write(np.ascontiguousarray(matrix[rows]).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        with open(generation_dir / KEYS_FILENAME, "wb") as f:
+            f.write(b"".join(key for key, _ in survivors))
+            f.flush()
+            os.fsync(f.fileno())
+        self._matrix = None
+        del matrix
+        # The switch: until meta.json is replaced, readers and restarts still see the old generation
+        self._generation = generation
+        self._write_meta()
+        self._remove_stale()
+
+        self.evictions += len(self._rows) - len(survivors)
+        self._rows = OrderedDict((key, row) for row, (key, _) in enumerate(survivors))
+        self._row_count = len(survivors)
+        logger.info("Compacted embedding cache to %d entries", self._row_count)
+
+    def _write_meta(self) -> None:
+        meta = {
+            "format_version": _FORMAT_VERSION,
+            "model_name": self.model_name,
+            "dimension": self._dimension,
+            "generation": self._generation,
+        }
+        tmp_path = self.directory / (META_FILENAME + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp_path, self.directory / META_FILENAME)
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Hashable, List
+
+import psutil
+
+from ..utils.logging_utils import setup_logging
+
+logger = logging.getLogger(__name__)
+setup_logging()
+
+
+@dataclass
+class LoadedModel:
+    """A model held by the registry plus what it cost to load."""
+    name: str
+    # Hub id, pinned directory or ONNX export the weights came from
+    source: str
+    model: object
+    load_seconds: float
+    # Growth of the process RSS while loading; approximate when loads overlap other work
+    memory_bytes: int
+    loaded_at: datetime
+    warmup_seconds: float | None = None
+
+
+class ModelRegistry:
+    """Loads each embedding model once per process and shares it.
+
+    Models are keyed by everything that changes the loaded weights (backend,
+    source, quantization); :class:`TextEmbedder` instances with the same key
+    share one model object, loaded on first use.
+    """
+
+    def __init__(self) -> None:
+        self._models: Dict[Hashable, LoadedModel] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, name: str, source: str, loader: Callable[[], object]) -> LoadedModel:
+        entry = self._models.get(key)
+        if entry is not None:
+            return entry
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is None:
+                process = psutil.Process()
+                rss_before = process.memory_info().rss
+                start = time.perf_counter()
+                model = loader()
+                entry = LoadedModel(
+                    name=name,
+                    source=source,
+                    model=model,
+                    load_seconds=time.perf_counter() - start,
+                    memory_bytes=max(0, process.memory_info().rss - rss_before),
+                    loaded_at=datetime.now(timezone.utc),
+                )
+                self._models[key] = entry
+                logger.info("Loaded model %s in %.2fs", name, entry.load_seconds)
+        return entry
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._models
+
+    def clear(self) -> None:
+        with self._lock:
+            self._models.clear()
+
+    def get_status(self) -> List[dict]:
+        return [
+            {
+                "name": entry.name,
+                "source": entry.source,
+                "load_seconds": round(entry.load_seconds, 3),
+                "memory_mb": round(entry.memory_bytes / 2**20, 1),
+                "loaded_at": entry.loaded_at.isoformat().replace("+00:00", "Z"),
+                "warmed_up": entry.warmup_seconds is not None,
+                "warmup_seconds": round(entry.warmup_seconds, 3) if entry.warmup_seconds is not None else None,
+            }
+            for entry in list(self._models.values())
+        ]
+
+
+model_registry = ModelRegistry()
+
+
+def pin_model(model_name: str, directory: str | Path) -> Path:
+    """Download ``model_name`` once and save it to ``directory`` for offline loading."""
+    from sentence_transformers import SentenceTransformer
+
+    directory = Path(directory)
+    SentenceTransformer(model_name, device="cpu").save(str(directory))
+    logger.info("Pinned %s to %s", model_name, directory)
+    return directory
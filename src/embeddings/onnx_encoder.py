@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import json
+import logging
+from pathlib import Path
+from typing import List, Sequence
+
+import numpy as np
+
+from ..utils.logging_utils import setup_logging
+
+try:
+    import onnxruntime as ort
+except ImportError:  # optional: only needed for the "onnx" backend
+    ort = None
+
+logger = logging.getLogger(__name__)
+setup_logging()
+
+MODEL_FILENAME = "model.onnx"
+QUANTIZED_MODEL_FILENAME = "model_int8.onnx"
+TOKENIZER_FILENAME = "tokenizer.json"
+CONFIG_FILENAME = "onnx_config.json"
+
+
+class OnnxEncoder:
+    """Sentence-BERT inference through onnxruntime with mean pooling.
+
+    Loads a model written by :func:`export_onnx` and mirrors the subset of
+    ``SentenceTransformer.encode`` that :class:`TextEmbedder` relies on, so
+    either can sit behind ``TextEmbedder.model``.
+    """
+
+    def __init__(
+        self,
+        model_dir: str | Path,
+        quantized: bool = False,
+        intra_op_threads: int | None = None,
+    ) -> None:
+        if ort is None:
+            raise ImportError(
+                "onnxruntime is not installed. "
+                "Install it using: pip install onnxruntime"
+            )
+        from tokenizers import Tokenizer
+
+        model_dir = Path(model_dir)
+        with open(model_dir / CONFIG_FILENAME, encoding="utf-8") as f:
+            config = json.load(f)
+        self.model_name: str = config["model_name"]
+        self.max_seq_length: int = config["max_seq_length"]
+        self._dimension: int = config["dimension"]
+
+        model_path = model_dir / (QUANTIZED_MODEL_FILENAME if quantized else MODEL_FILENAME)
+        if not model_path.exists():
+            raise FileNotFoundError(f"ONNX model not found: {model_path}")
+
+        self._tokenizer = Tokenizer.from_file(str(model_dir / TOKENIZER_FILENAME))
+        self._tokenizer.enable_truncation(max_length=self.max_seq_length)
+        # Pad to the longest text in each batch, not to max_seq_length
+        self._tokenizer.enable_padding(pad_id=config["pad_token_id"], pad_token=config["pad_token"])
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+        self._session = ort.InferenceSession(str(model_path), options, providers=["CPUExecutionProvider"])
+        self._input_names = {node.name for node in self._session.get_inputs()}
+        logger.info("Loaded ONNX model %s from %s", self.model_name, model_path)
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self._dimension
+
+    def encode(
+        self,
+        sentences: Sequence[str],
+        batch_size: int = 32,
+        convert_to_numpy: bool = True,
+        normalize_embeddings: bool = False,
+        show_progress_bar: bool = False,
+    ) -> np.ndarray:
+        sentences = list(sentences)
+        # Longest first so batches hold similar lengths and padding stays small,
+        # as SentenceTransformer.encode does internally
+        order = sorted(range(len(sentences)), key=lambda i: len(sentences[i]), reverse=True)
+        batches: List[np.ndarray] = []
+        for start in range(0, len(order), batch_size):
+            batches.append(self._encode_batch([sentences[i] for i in order[start:start + batch_size]]))
+        if not batches:
+            return np.zeros((0, self._dimension), dtype=np.float32)
+        embeddings = np.empty((len(sentences), self._dimension), dtype=np.float32)
+        embeddings[order] = np.concatenate(batches)
+        if normalize_embeddings:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings /= np.maximum(norms, 1e-12)
+        return embeddings
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self._tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            feeds["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+        hidden = self._session.run(None, feeds)[0]
+
+        # Mean pooling over real tokens, as in the model's sentence-transformers config
+        mask = attention_mask[:, :, None].astype(np.float32)
+        summed = (hidden * mask).sum(axis=1)
+        counts = np.clip(mask.sum(axis=1), 1e-9, None)
+        return (summed / counts).astype(np.float32)
+
+
+def export_onnx(
+    model_name: str,
+    output_dir: str | Path,
+    quantize: bool = True,
+    opset_version: int = 17,
+) -> Path:
+    """Export a Sentence-BERT model's transformer to ONNX (and int8 dynamic quantization).
+
+    Needs the full torch stack; this is a build-time step, the exported
+    directory is all that :class:`OnnxEncoder` needs at serving time.
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    st_model = SentenceTransformer(model_name, device="cpu")
+    transformer = st_model[0].auto_model.eval()
+    tokenizer = st_model.tokenizer
+
+    class _HiddenStates(torch.nn.Module):
+        def __init__(self, model: torch.nn.Module) -> None:
+            super().__init__()
+            self.model = model
+
+        def forward(self, input_ids, attention_mask, token_type_ids):
+            return self.model(
+                input_ids=input_ids, attention_mask=attention_mask, token_type_ids=token_type_ids
+            ).last_hidden_state
+
+    sample = tokenizer(["example sentence"], return_tensors="pt")
+    token_type_ids = sample.get("token_type_ids", torch.zeros_like(sample["input_ids"]))
+    inputs = (sample["input_ids"], sample["attention_mask"], token_type_ids)
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in ("input_ids", "attention_mask", "token_type_ids")}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+    model_path = output_dir / MODEL_FILENAME
+    with torch.no_grad():
+        torch.onnx.export(
+            _HiddenStates(transformer),
+            inputs,
+            str(model_path),
+            input_names=["input_ids", "attention_mask", "token_type_ids"],
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset_version,
+            dynamo=False,
+        )
+
+    tokenizer.backend_tokenizer.save(str(output_dir / TOKENIZER_FILENAME))
+    config = {
+        "model_name": model_name,
+        "max_seq_length": st_model.max_seq_length,
+        "dimension": getattr(st_model, "get_embedding_dimension", st_model.get_sentence_embedding_dimension)(),
+        "pad_token": tokenizer.pad_token,
+        "pad_token_id": tokenizer.pad_token_id,
+    }
+    with open(output_dir / CONFIG_FILENAME, "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+    logger.info("Exported %s to %s", model_name, model_path)
+
+    if quantize:
+        quantize_onnx(output_dir)
+    return output_dir
+
+
+def quantize_onnx(model_dir: str | Path) -> Path:
+    """Write an int8 dynamically quantized copy of ``model.onnx`` next to it."""
+    if ort is None:
+        raise ImportError(
+            "onnxruntime is not installed. "
+            "Install it using: pip install onnxruntime"
+        )
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    model_dir = Path(model_dir)
+    quantized_path = model_dir / QUANTIZED_MODEL_FILENAME
+    quantize_dynamic(str(model_dir / MODEL_FILENAME), str(quantized_path), weight_type=QuantType.QInt8)
+    logger.info("Wrote int8 model to %s", quantized_path)
+    return quantized_path
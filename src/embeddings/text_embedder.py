@@ -1,45 +1,275 @@
 from __future__ import annotations
-from typing import Iterable, List
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Tuple
 import logging
+import multiprocessing
+import os
+import time
 import numpy as np
-from sentence_transformers import SentenceTransformer 
 from ..utils.logging_utils import setup_logging
+from .embedding_cache import EmbeddingCache
+from .model_registry import LoadedModel, model_registry
+from .onnx_encoder import OnnxEncoder
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
 
 logger = logging.getLogger(__name__)
 setup_logging()
 
+DEFAULT_MODEL_NAME = "multi-qa-MiniLM-L6-cos-v1"
+EMBEDDING_BACKENDS = ("torch", "onnx")
+# Generous upper bound on characters per WordPiece token (English averages ~4):
+# anything past max_seq_length * this would be truncated by the tokenizer anyway
+MAX_CHARS_PER_TOKEN = 8
+
+
+def embedding_namespace(model_name: str, backend: str = "torch", quantized: bool = False) -> str:
+    """Identity of the vectors a backend produces, used to key the embedding cache."""
+    if backend == "onnx":
+        return f"{model_name}-onnx-int8" if quantized else f"{model_name}-onnx"
+    return model_name
+
 
 class TextEmbedder:
     """Generates text embeddings using a Sentence-BERT model."""
 
-    def __init__(self) -> None:
-        """Initialize with the default Sentence-BERT model."""
-        self._model_name = "multi-qa-MiniLM-L6-cos-v1"
-        self._model = self._load_model()
+    def __init__(
+        self,
+        cache: EmbeddingCache | None = None,
+        backend: str = "torch",
+        onnx_dir: str | Path | None = None,
+        quantized: bool = False,
+        batch_size: int = 32,
+        intra_op_threads: int | None = None,
+        model_dir: str | Path | None = None,
+    ) -> None:
+        """Initialize with the default Sentence-BERT model and an optional embedding cache.
+
+        The model itself is loaded on first use and shared, through the
+        process-wide registry, with every embedder of the same configuration.
+        ``model_dir`` points at a pinned local copy (see ``pin_model``) so the
+        torch backend loads without network access.
+
+        ``backend="onnx"`` runs the model exported by ``scripts/export_onnx_model.py``
+        from ``onnx_dir`` through onnxruntime (``quantized`` picks the int8 copy,
+        ``intra_op_threads`` caps its thread pool) instead of loading PyTorch.
+        Texts are embedded ``batch_size`` at a time, sorted by length so each
+        batch pads to similar lengths.
+        """
+        if backend not in EMBEDDING_BACKENDS:
+            raise ValueError(f"Unknown embedding backend {backend!r}; expected one of {EMBEDDING_BACKENDS}")
+        if backend == "onnx" and onnx_dir is None:
+            raise ValueError("onnx_dir is required for the onnx backend")
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive")
+        self._model_name = DEFAULT_MODEL_NAME
+        self.batch_size = batch_size
+        self.backend = backend
+        self._onnx_dir = onnx_dir
+        self._quantized = quantized
+        self._intra_op_threads = intra_op_threads
+        self._model_dir = model_dir
+        namespace = embedding_namespace(self._model_name, backend, quantized)
+        if cache is not None and cache.model_name != namespace:
+            raise ValueError(f"Cache belongs to {cache.model_name!r}, not {namespace!r}")
+        self.cache = cache
+
+    @property
+    def model_name(self) -> str:
+        return self._model_name
+
+    @property
+    def model(self) -> SentenceTransformer | OnnxEncoder:
+        return self._registry_entry().model
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._registry_key in model_registry
+
+    def warmup(self) -> float:
+        """Load the model and run one encode so the first request pays neither cost."""
+        entry = self._registry_entry()
+        start = time.perf_counter()
+        self._encode(["warmup: python data engineer with sql experience"])
+        entry.warmup_seconds = time.perf_counter() - start
+        return entry.load_seconds + entry.warmup_seconds
 
-    def _load_model(self) -> SentenceTransformer:
+    def _registry_entry(self) -> LoadedModel:
+        key = self._registry_key
+        return model_registry.get(key, self._registry_name, str(key[1]), self._load_model)
+
+    @property
+    def _registry_key(self) -> tuple:
+        onnx_dir = str(self._onnx_dir) if self._onnx_dir is not None else None
+        model_dir = str(self._model_dir) if self._model_dir is not None else None
+        if self.backend == "onnx":
+            return ("onnx", onnx_dir, self._quantized, self._intra_op_threads)
+        return ("torch", model_dir or self._model_name)
+
+    @property
+    def _registry_name(self) -> str:
+        return embedding_namespace(self._model_name, self.backend, self._quantized)
+
+    def _load_model(self) -> SentenceTransformer | OnnxEncoder:
         """Load and return the Sentence-BERT model."""
-        if SentenceTransformer is None:
+        if self.backend == "onnx":
+            model = OnnxEncoder(
+                self._onnx_dir, quantized=self._quantized, intra_op_threads=self._intra_op_threads
+            )
+            if model.model_name.rstrip("/").split("/")[-1] != self._model_name:
+                raise ValueError(f"ONNX model in {self._onnx_dir} was exported from {model.model_name!r}")
+            return model
+
+        # Imported lazily: torch is heavy and not needed for the onnx backend
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as exc:
             raise ImportError(
                 "sentence-transformers is not installed. "
                 "Install it using: pip install sentence-transformers"
-            )
+            ) from exc
 
         try:
-            model = SentenceTransformer(self._model_name)
-            logger.info("Loaded SentenceTransformer model: %s", self._model_name)
+            if self._model_dir is not None:
+                model = SentenceTransformer(str(self._model_dir), local_files_only=True)
+            else:
+                model = SentenceTransformer(self._model_name)
+            logger.info("Loaded SentenceTransformer model: %s", self._model_dir or self._model_name)
             return model
         except Exception as exc:
             logger.error("Error loading model %s: %s", self._model_name, exc)
             raise
 
-    def encode(self, texts: Iterable[str]) -> np.ndarray:
-        """Convert input texts into normalized float32 embeddings."""
+    def encode(self, texts: Iterable[str], use_cache: bool = True) -> np.ndarray:
+        """Convert input texts into normalized float32 embeddings, embedding only cache misses.
+
+        Pass ``use_cache=False`` for one-off texts (resumes, queries): they would
+        only take disk writes and the file lock, and push job vectors out of the cache.
+        """
         texts_list: List[str] = list(texts)
-        embeddings = self._model.encode(
+        if self.cache is None or not use_cache or not texts_list:
+            return self._encode(texts_list)
+
+        embeddings, missing = self._lookup(texts_list)
+        if not missing:
+            return embeddings
+        fresh = self._encode([texts_list[positions[0]] for positions in missing.values()])
+        return self._fill(embeddings, missing, fresh, len(texts_list))
+
+    def iter_encode(self, texts: Iterable[str], workers: int = 1, chunk_size: int = 1024) -> Iterator[np.ndarray]:
+        """Yield embeddings for consecutive ``chunk_size`` slices of ``texts``, in order.
+
+        With ``workers > 1`` the (uncached) chunks are embedded by a pool of
+        worker processes, each holding its own copy of the model and an even
+        share of the CPU threads.
+        """
+        texts_list: List[str] = list(texts)
+        chunks = [texts_list[start:start + chunk_size] for start in range(0, len(texts_list), chunk_size)]
+        if workers <= 1:
+            for chunk in chunks:
+                yield self.encode(chunk)
+            return
+
+        threads = max(1, (os.cpu_count() or workers) // workers)
+        options = {
+            "backend": self.backend,
+            "onnx_dir": self._onnx_dir,
+            "quantized": self._quantized,
+            "batch_size": self.batch_size,
+            "intra_op_threads": threads,
+            "model_dir": self._model_dir,
+        }
+        # spawn, not fork: forking a process that already runs torch/tokenizer threads can deadlock
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_encode_worker,
+            initargs=(options,),
+        ) as pool:
+            pending: deque = deque()
+            for chunk in chunks:
+                embeddings, missing = self._lookup(chunk)
+                miss_texts = [chunk[positions[0]] for positions in missing.values()]
+                future = pool.submit(_encode_in_worker, miss_texts) if missing else None
+                pending.append((embeddings, missing, future, len(chunk)))
+                # Bounded read-ahead keeps every worker busy without buffering the corpus
+                if len(pending) > 2 * workers:
+                    yield self._collect(*pending.popleft())
+            while pending:
+                yield self._collect(*pending.popleft())
+
+    def _lookup(self, texts_list: List[str]) -> Tuple[np.ndarray | None, Dict[object, List[int]]]:
+        """Cached rows plus the distinct texts still to embed (key -> positions)."""
+        if self.cache is None:
+            return None, {position: [position] for position in range(len(texts_list))}
+        keys = [EmbeddingCache.key(text) for text in texts_list]
+        embeddings, hits = self.cache.get_many(keys)
+        # Each distinct missing text is embedded once, then fanned out to its positions
+        missing: Dict[object, List[int]] = {}
+        for position in np.flatnonzero(~hits).tolist():
+            missing.setdefault(keys[position], []).append(position)
+        return embeddings, missing
+
+    def _fill(
+        self,
+        embeddings: np.ndarray | None,
+        missing: Dict[object, List[int]],
+        fresh: np.ndarray,
+        count: int,
+    ) -> np.ndarray:
+        if self.cache is not None:
+            self.cache.put_many(list(missing), fresh)
+        if embeddings is None:
+            embeddings = np.empty((count, fresh.shape[1]), dtype=np.float32)
+        for vector, positions in zip(fresh, missing.values()):
+            embeddings[positions] = vector
+        return embeddings
+
+    def _collect(self, embeddings, missing, future, count: int) -> np.ndarray:
+        if future is None:
+            return embeddings
+        fresh = future.result()
+        if self.cache is None:
+            return fresh
+        return self._fill(embeddings, missing, fresh, count)
+
+    def cache_stats(self) -> dict | None:
+        return self.cache.get_stats() if self.cache is not None else None
+
+    def _encode(self, texts_list: List[str]) -> np.ndarray:
+        model = self.model
+        max_seq_length = getattr(model, "max_seq_length", None)
+        if max_seq_length:
+            # Cut at the character level so huge descriptions aren't fully tokenized
+            # only to be truncated to max_seq_length tokens
+            max_chars = max_seq_length * MAX_CHARS_PER_TOKEN
+            texts_list = [text[:max_chars] for text in texts_list]
+
+        # Both backends sort by length internally, so batches pad to similar lengths
+        embeddings = model.encode(
             texts_list,
+            batch_size=self.batch_size,
             convert_to_numpy=True,
             normalize_embeddings=True,
             show_progress_bar=False,
         )
-        return embeddings.astype(np.float32)
+        return np.asarray(embeddings, dtype=np.float32)
+
+
+_worker_embedder: TextEmbedder | None = None
+
+
+def _init_encode_worker(options: dict) -> None:
+    global _worker_embedder
+    if options["backend"] == "torch":
+        import torch
+
+        torch.set_num_threads(options["intra_op_threads"])
+    _worker_embedder = TextEmbedder(**options)
+
+
+def _encode_in_worker(texts: List[str]) -> np.ndarray:
+    return _worker_embedder._encode(texts)
@@ -1,36 +1,432 @@
-﻿from pathlib import Path
-from typing import Iterable, Optional, Union
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Sequence, Union
+import asyncio
 import logging
-import pdfplumber 
+import multiprocessing
+import os
+import re
+import signal
+import threading
 from ..utils.logging_utils import setup_logging
 
+try:
+    import pdfplumber
+except ImportError:  # pragma: no cover - optional engine
+    pdfplumber = None
+
+# pypdf is the maintained successor of PyPDF2 with the same reader API
+try:
+    from pypdf import PdfReader
+except ImportError:
+    try:
+        from PyPDF2 import PdfReader
+    except ImportError:  # pragma: no cover - optional engine
+        PdfReader = None
+
 logger = logging.getLogger(__name__)
 setup_logging()
 
+# A path on disk, the raw bytes of an upload, or a readable binary stream
+PDFSource = Union[str, Path, bytes, bytearray, memoryview, BinaryIO]
+
+
+class PDFTooLargeError(ValueError):
+    """The document exceeds the parser's byte or page limit."""
+
+
+class PDFTimeoutError(TimeoutError):
+    """Extraction did not finish within the parser's per-document timeout."""
+
+
+# Engine names accepted by PDFParser; "auto" tries the fast text layer first
+PDF_ENGINES = ("auto", "pypdf", "pdfplumber")
+
+# Fast-engine output is rejected (and pdfplumber used) when it has fewer than
+# this many characters per page - scans and image-only pages have no text layer -
+# or when too much of it is unmapped glyphs, symbols, or words run together
+MIN_CHARS_PER_PAGE = 40
+MAX_GARBLED_RATIO = 0.1
+MIN_SPACE_RATIO = 0.05
+MIN_LETTER_RATIO = 0.5
+# "(cid:12)" placeholders, U+FFFD, control and private-use characters
+_GARBLED_PATTERN = re.compile(r"\(cid:[0-9]+\)|[\ufffd\x00-\x08\x0b\x0c\x0e-\x1f\ue000-\uf8ff]")
+
+
+class PDFEngine(ABC):
+    """Turns a PDF (path or seekable stream) into one text string per page.
+
+    ``iter_pages`` extracts lazily, so a caller that stops early never pays
+    for the remaining pages.
+    """
+
+    name = ""
+
+    @staticmethod
+    def available() -> bool:
+        return True
+
+    @abstractmethod
+    def iter_pages(self, document: Union[Path, BinaryIO], max_pages: Optional[int] = None) -> Iterator[str]:
+        """Yield the text of each page, raising PDFTooLargeError past ``max_pages``."""
+
+    def extract_pages(self, document: Union[Path, BinaryIO], max_pages: Optional[int] = None) -> List[str]:
+        return list(self.iter_pages(document, max_pages))
+
+
+class PyPDFEngine(PDFEngine):
+    """Reads the PDF text layer directly: no layout analysis, several times faster."""
+
+    name = "pypdf"
+
+    @staticmethod
+    def available() -> bool:
+        return PdfReader is not None
+
+    def iter_pages(self, document: Union[Path, BinaryIO], max_pages: Optional[int] = None) -> Iterator[str]:
+        reader = PdfReader(str(document) if isinstance(document, Path) else document)
+        _check_pages(len(reader.pages), max_pages)
+        for page in reader.pages:
+            yield page.extract_text() or ""
+
+
+class PdfplumberEngine(PDFEngine):
+    """Full layout analysis via pdfminer; slower, but copes with unusual fonts and layouts."""
+
+    name = "pdfplumber"
+
+    @staticmethod
+    def available() -> bool:
+        return pdfplumber is not None
+
+    def iter_pages(self, document: Union[Path, BinaryIO], max_pages: Optional[int] = None) -> Iterator[str]:
+        # pdfplumber reads streams in place and leaves closing them to the caller
+        with pdfplumber.open(str(document) if isinstance(document, Path) else document) as pdf:
+            _check_pages(len(pdf.pages), max_pages)
+            for page in pdf.pages:
+                text = page.extract_text() or ""
+                # Drop the page's parsed layout objects before moving on
+                page.close()
+                yield text
+
+
+ENGINES = {engine.name: engine for engine in (PyPDFEngine, PdfplumberEngine)}
+
+
+def looks_garbled(text: str, page_count: int) -> bool:
+    """Heuristic check that a text-layer extraction is unusable for matching."""
+    if len(text) < MIN_CHARS_PER_PAGE * max(page_count, 1):
+        return True
+    visible = len(text) - text.count("\n")
+    if len(_GARBLED_PATTERN.findall(text)) > MAX_GARBLED_RATIO * visible:
+        return True
+    spaces = text.count(" ")
+    if sum(1 for ch in text if ch.isalpha()) < MIN_LETTER_RATIO * (visible - spaces):
+        return True
+    return spaces < MIN_SPACE_RATIO * visible
+
 
 class PDFParser:
-    
-    def __init__(self, use_pdfplumber: bool = True) -> None:
-        
-        self.use_pdfplumber = use_pdfplumber and pdfplumber is not None
-        
-        if self.use_pdfplumber:
-            logger.info("Using pdfplumber  for OCR")
-        else: 
-            raise ImportError("Either pdfplumber is required for PDF parsing")
-
-    def extract_text(self, path: Union[str, Path]) -> str:
-        path = Path(path)
-        if not path.exists():
-            raise FileNotFoundError(path)
-
-        if self.use_pdfplumber and pdfplumber is not None:
-            return self._extract_with_pdfplumber(path)
-       
-        return self._extract_with_pypdf2(path)
-
-    def _extract_with_pdfplumber(self, path: Path) -> str:
-        with pdfplumber.open(str(path)) as pdf:
-            text_chunks: Iterable[str] = (page.extract_text() or "" for page in pdf.pages)
-            return "\n".join(chunk.strip() for chunk in text_chunks if chunk)
+    """Extracts resume text from PDFs.
+
+    ``engine="auto"`` reads the text layer with pypdf and falls back to
+    pdfplumber when that output is empty or :func:`looks_garbled`; either
+    engine can also be forced by name.
+
+    ``extract_text`` parses in the calling thread. The async API
+    (``extract_text_async`` / ``extract_many``) never blocks the event loop:
+    with ``workers > 0`` documents go to a process pool that is replaced after
+    about ``max_tasks_per_child`` documents per worker, otherwise they run in a
+    thread. Either way each document is bounded by ``timeout`` seconds.
+    """
+
+    def __init__(
+        self,
+        use_pdfplumber: bool = True,
+        engine: str = "auto",
+        max_bytes: Optional[int] = None,
+        max_pages: Optional[int] = None,
+        workers: int = 0,
+        timeout: Optional[float] = None,
+        max_tasks_per_child: Optional[int] = None,
+        stop_after_pages: Optional[int] = None,
+        stop_after_chars: Optional[int] = None,
+    ) -> None:
+        """``max_bytes`` / ``max_pages`` reject oversized documents before any text is extracted.
+
+        ``stop_after_pages`` / ``stop_after_chars`` instead truncate: reading
+        stops once that many pages or characters have been extracted, and the
+        remaining pages are never parsed.
+
+        ``use_pdfplumber=False`` is the older spelling of ``engine="pypdf"``.
+        """
+        if engine not in PDF_ENGINES:
+            raise ValueError(f"Unknown PDF engine {engine!r}; expected one of {PDF_ENGINES}")
+        if not use_pdfplumber and engine == "auto":
+            engine = "pypdf"
+        names = ("pypdf", "pdfplumber") if engine == "auto" else (engine,)
+        self.engines: List[PDFEngine] = [ENGINES[name]() for name in names if ENGINES[name].available()]
+        if not self.engines:
+            raise ImportError(f"PDF engine {engine!r} needs pypdf/PyPDF2 or pdfplumber to be installed")
+        self.engine = engine
+        self.max_bytes = max_bytes
+        self.max_pages = max_pages
+        self.workers = workers
+        self.timeout = timeout
+        self.max_tasks_per_child = max_tasks_per_child
+        self.stop_after_pages = stop_after_pages
+        self.stop_after_chars = stop_after_chars
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_tasks = 0
+        self._pool_lock = threading.Lock()
+        logger.info("PDF engines: %s", ", ".join(e.name for e in self.engines))
+        if timeout is not None and workers <= 0:
+            logger.warning(
+                "PDF timeout of %gs is not enforced with workers=0: a timed-out parse keeps "
+                "running in its thread; use workers > 0 to bound CPU per document", timeout
+            )
+
+    def extract_text(self, source: PDFSource) -> str:
+        """Extract text from a file path, PDF bytes, or a seekable binary stream (e.g. an upload)."""
+        return _join_pages(self.iter_pages(source))
+
+    def iter_pages(
+        self,
+        source: PDFSource,
+        stop_after_pages: Optional[int] = None,
+        stop_after_chars: Optional[int] = None,
+    ) -> Iterator[str]:
+        """Yield page texts as they are extracted, honouring the stop policy.
+
+        The limits default to the parser's ``stop_after_pages`` /
+        ``stop_after_chars``; the page that crosses the character limit is
+        still yielded whole. Size and page-count limits are checked before
+        the first page is produced.
+        """
+        stop_after_pages = stop_after_pages or self.stop_after_pages
+        stop_after_chars = stop_after_chars or self.stop_after_chars
+        document = self._open(source)
+        start = None if isinstance(document, Path) else document.tell()
+        *fast, last = self.engines
+        for engine in fast:
+            # Fast output is cheap, so the stopped prefix is checked as a whole
+            # before anything is yielded
+            try:
+                pages = list(_stop_early(
+                    engine.iter_pages(document, self.max_pages), stop_after_pages, stop_after_chars
+                ))
+            except (PDFTooLargeError, PDFTimeoutError):
+                raise
+            except Exception as exc:
+                # Some files trip the fast reader but are fine for pdfminer
+                logger.debug("%s failed (%s); falling back", engine.name, exc)
+            else:
+                if not looks_garbled(_join_pages(pages), len(pages)):
+                    yield from pages
+                    return
+                logger.debug("%s output looks garbled; falling back", engine.name)
+            if start is not None:
+                document.seek(start)
+        yield from _stop_early(last.iter_pages(document, self.max_pages), stop_after_pages, stop_after_chars)
+
+    def _open(self, source: PDFSource) -> Union[Path, BinaryIO]:
+        if isinstance(source, (str, Path)):
+            path = Path(source)
+            if not path.exists():
+                raise FileNotFoundError(path)
+            self._check_size(path.stat().st_size)
+            return path
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            self._check_size(len(source))
+            return BytesIO(source)
+        size = _stream_size(source)
+        if size is None:
+            # Non-seekable (e.g. a socket): buffer it, reading at most one byte past the limit
+            data = source.read(-1 if self.max_bytes is None else self.max_bytes + 1)
+            self._check_size(len(data))
+            return BytesIO(data)
+        self._check_size(size)
+        return source
+
+    def extract_text_from_bytes(self, data: bytes) -> str:
+        return self.extract_text(data)
+
+    async def extract_text_async(self, source: PDFSource) -> str:
+        """Extract text off the event loop; raises :class:`PDFTimeoutError` past ``timeout``."""
+        if self.workers <= 0:
+            # A thread cannot be interrupted: a timed-out parse finishes in the background
+            return await self._with_timeout(asyncio.to_thread(self.extract_text, source))
+
+        # Paths travel to the worker as-is; streams are read here so only bytes cross
+        # the process boundary, and oversized documents are never sent at all
+        document = self._to_payload(source)
+        loop = asyncio.get_running_loop()
+        try:
+            future = loop.run_in_executor(self._get_pool(), _extract_in_worker, document, self.timeout)
+            # The worker enforces the timeout itself; this is a backstop with some slack
+            return await self._with_timeout(future, slack=1.0)
+        except BrokenProcessPool as exc:
+            # A worker died mid-parse (e.g. a crash in a malformed file); start fresh next time
+            self._reset_pool()
+            raise RuntimeError("PDF worker process died while parsing") from exc
+
+    async def extract_many(self, sources: Sequence[PDFSource]) -> List[Union[str, BaseException]]:
+        """Extract several documents concurrently, in input order.
+
+        A failed document yields its exception in place of the text, so one bad
+        file does not sink the batch.
+        """
+        return list(await asyncio.gather(
+            *(self.extract_text_async(source) for source in sources), return_exceptions=True
+        ))
+
+    def close(self) -> None:
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
+
+    def __getstate__(self) -> dict:
+        # Workers get the limits and engine choice, not the pool
+        state = self.__dict__.copy()
+        state["_pool"] = None
+        del state["_pool_lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._pool_lock = threading.Lock()
+
+    async def _with_timeout(self, awaitable, slack: float = 0.0) -> str:
+        if self.timeout is None:
+            return await awaitable
+        try:
+            return await asyncio.wait_for(awaitable, self.timeout + slack)
+        except asyncio.TimeoutError as exc:
+            raise PDFTimeoutError(f"PDF parsing exceeded {self.timeout:g}s") from exc
+
+    def _to_payload(self, source: PDFSource) -> Union[str, bytes]:
+        if isinstance(source, (str, Path)):
+            path = Path(source)
+            if not path.exists():
+                raise FileNotFoundError(path)
+            self._check_size(path.stat().st_size)
+            return str(path)
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            data = bytes(source)
+        else:
+            data = source.read(-1 if self.max_bytes is None else self.max_bytes + 1)
+        self._check_size(len(data))
+        return data
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            # Recycle the whole pool every ``workers * max_tasks_per_child`` documents so
+            # pdfminer's caches cannot grow unbounded; the old pool finishes its queue
+            # and exits. (ProcessPoolExecutor's own max_tasks_per_child can deadlock
+            # on CPython 3.11 once tasks outnumber the remaining worker slots.)
+            if (
+                self._pool is not None
+                and self.max_tasks_per_child
+                and self._pool_tasks >= self.workers * self.max_tasks_per_child
+            ):
+                self._pool.shutdown(wait=False)
+                self._pool = None
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=_pool_context(),
+                    initializer=_init_worker,
+                    initargs=(self,),
+                )
+                self._pool_tasks = 0
+                logger.info("Started %d PDF extraction workers", self.workers)
+            self._pool_tasks += 1
+            return self._pool
+
+    def _reset_pool(self) -> None:
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def _check_size(self, size: Optional[int]) -> None:
+        if self.max_bytes is not None and size is not None and size > self.max_bytes:
+            raise PDFTooLargeError(f"PDF is {size} bytes; the limit is {self.max_bytes}")
+
+
+def _stop_early(pages: Iterable[str], max_pages: Optional[int], max_chars: Optional[int]) -> Iterator[str]:
+    # Closing the engine's generator right away releases its open document
+    pages = iter(pages)
+    chars = 0
+    try:
+        for count, text in enumerate(pages, start=1):
+            yield text
+            chars += len(text)
+            if (max_pages and count >= max_pages) or (max_chars and chars >= max_chars):
+                return
+    finally:
+        if hasattr(pages, "close"):
+            pages.close()
+
+
+def _join_pages(pages: Iterable[str]) -> str:
+    return "\n".join(chunk.strip() for chunk in pages if chunk)
+
+
+def _check_pages(page_count: int, max_pages: Optional[int]) -> None:
+    if max_pages is not None and page_count > max_pages:
+        raise PDFTooLargeError(f"PDF has {page_count} pages; the limit is {max_pages}")
+
+
+def _stream_size(stream: BinaryIO) -> Optional[int]:
+    """Remaining bytes in a seekable stream, without reading it; None if it cannot seek."""
+    try:
+        position = stream.tell()
+        size = stream.seek(0, os.SEEK_END) - position
+        stream.seek(position)
+    except (AttributeError, OSError):
+        return None
+    return size
+
+
+_worker_parser: Optional[PDFParser] = None
+
+
+def _pool_context() -> multiprocessing.context.BaseContext:
+    # The API process runs threads (embedding scheduler, torch): forking it can
+    # copy a held lock into the child, so workers start from a clean forkserver
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        # Imported once in the server, so recycled workers start without re-importing pdfminer
+        context.set_forkserver_preload([__name__])
+        return context
+    return multiprocessing.get_context()
+
+
+def _init_worker(parser: PDFParser) -> None:
+    global _worker_parser
+    _worker_parser = parser
+
+
+def _raise_timeout(signum, frame) -> None:
+    raise PDFTimeoutError("PDF parsing timed out")
+
 
+def _extract_in_worker(document: Union[str, bytes], timeout: Optional[float]) -> str:
+    # Workers run tasks on their main thread, so an interval timer can interrupt
+    # a runaway parse and leave the process reusable for the next document
+    if not timeout or not hasattr(signal, "setitimer"):
+        return _worker_parser.extract_text(document)
+    previous = signal.signal(signal.SIGALRM, _raise_timeout)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return _worker_parser.extract_text(document)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
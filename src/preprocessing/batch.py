@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import logging
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import AbstractSet, Callable, Iterable, Iterator, List, Sequence, Tuple, TypeVar
+
+from ..utils.logging_utils import setup_logging
+from .pipeline import ALL_FIELDS, PreprocessedText, TextPreprocessor
+
+logger = logging.getLogger(__name__)
+setup_logging()
+
+T = TypeVar("T")
+
+
+class BatchPreprocessor:
+    """Runs a :class:`TextPreprocessor` over many documents in worker processes.
+
+    Documents are dispatched ``chunk_size`` at a time so per-task pickling
+    overhead stays small, a bounded number of chunks is in flight so a huge
+    corpus is never held in memory, and results stream back in input order.
+    With ``workers <= 1`` everything runs in-process. The pool is created on
+    first use and reused until :meth:`close`.
+    """
+
+    def __init__(
+        self,
+        preprocessor: TextPreprocessor | None = None,
+        workers: int = 0,
+        chunk_size: int = 256,
+    ) -> None:
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        self.preprocessor = preprocessor or TextPreprocessor()
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self._pool: ProcessPoolExecutor | None = None
+
+    def __enter__(self) -> BatchPreprocessor:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def process(self, texts: Sequence[str], fields: AbstractSet[str] = ALL_FIELDS) -> List[PreprocessedText]:
+        """Preprocess a list of texts, splitting it evenly across the workers."""
+        # Small batches (API requests) get smaller chunks so every worker takes part
+        chunk_size = min(self.chunk_size, max(1, len(texts) // (max(self.workers, 1) * 4)))
+        return list(self.iter_process(texts, chunk_size=chunk_size, fields=fields))
+
+    def iter_process(
+        self, texts: Iterable[str], chunk_size: int | None = None, fields: AbstractSet[str] = ALL_FIELDS
+    ) -> Iterator[PreprocessedText]:
+        for _, result in self.iter_enriched(texts, _identity, chunk_size=chunk_size, fields=fields):
+            yield result
+
+    def iter_enriched(
+        self,
+        records: Iterable[T],
+        text_of: Callable[[T], str],
+        chunk_size: int | None = None,
+        fields: AbstractSet[str] = ALL_FIELDS,
+    ) -> Iterator[Tuple[T, PreprocessedText]]:
+        """Yield ``(record, PreprocessedText)`` for every record, in input order.
+
+        ``text_of`` runs in this process, so records (jobs, resumes) never
+        have to be picklable; only their texts are sent to the workers.
+        """
+        chunk_size = chunk_size or self.chunk_size
+        chunks = _chunked(iter(records), chunk_size)
+        if self.workers <= 1:
+            for chunk in chunks:
+                yield from zip(chunk, self.preprocessor.process_batch((text_of(record) for record in chunk), fields))
+            return
+
+        pool = self._get_pool()
+        pending: deque = deque()
+        for chunk in chunks:
+            pending.append((chunk, pool.submit(_process_chunk, [text_of(record) for record in chunk], fields)))
+            # Bounded read-ahead keeps every worker busy without buffering the corpus
+            if len(pending) > 2 * self.workers:
+                chunk, future = pending.popleft()
+                yield from zip(chunk, future.result())
+        while pending:
+            chunk, future = pending.popleft()
+            yield from zip(chunk, future.result())
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Each worker unpickles its own preprocessor copy once, not per chunk
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=_pool_context(),
+                initializer=_init_worker,
+                initargs=(self.preprocessor,),
+            )
+            logger.info("Started %d preprocessing workers", self.workers)
+        return self._pool
+
+
+def _pool_context() -> multiprocessing.context.BaseContext:
+    # The API process runs threads (embedding scheduler, torch, the request thread
+    # pool): forking it can copy a held lock into a worker, so start from a forkserver
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context()
+
+
+def _identity(text: str) -> str:
+    return text
+
+
+def _chunked(items: Iterator[T], size: int) -> Iterator[List[T]]:
+    while True:
+        chunk = list(islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+_worker_preprocessor: TextPreprocessor | None = None
+
+
+def _init_worker(preprocessor: TextPreprocessor) -> None:
+    global _worker_preprocessor
+    _worker_preprocessor = preprocessor
+
+
+def _process_chunk(texts: List[str], fields: AbstractSet[str]) -> List[PreprocessedText]:
+    return _worker_preprocessor.process_batch(texts, fields)
@@ -1,31 +1,126 @@
 import re
-from typing import List, Optional
+from datetime import date
+from typing import Iterable, List, Optional, Tuple
+
+# Month names and common abbreviations ("sep", "sept", "september") by first three letters
+_MONTHS = {name: index for index, name in enumerate(
+    ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec")
+)}
+_MONTH = (
+    r"(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?"
+    r"|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)(?![a-z])\.?"
+)
+
 
 class ExperienceExtractor:
-    """Extracts years of experience from text using regex patterns."""
+    """Extracts years of experience from text using regex patterns.
 
-    def __init__(self):
-        # Patterns to catch: "5 years experience", "5+ years", "2015-2020", "since 2018"
-        self.year_patterns = [
-            r"(\d+)\+?\s*years?",
-            r"(\d+)\s*yrs?",
-        ]
-        self.date_range_pattern = r"(\d{4})\s*-\s*(Present|Current|\d{4})"
-    
-    def extract_years(self, text: str) -> float:
+    Combines explicit statements ("6+ years of experience") with the
+    employment timeline: date ranges such as "2015 - Present" or
+    "Jan 2018 – Mar 2021" are merged so overlapping roles count once.
+    All patterns are compiled once, at class creation.
+    """
+
+    # Patterns open with a plain character class ([0-9], not \d+ or a lookbehind)
+    # so the regex engine can skip ahead to candidate positions instead of
+    # trying a match at every character.
+    # Resume phrasing: "5 years of experience", "5+ years of experience"
+    EXPERIENCE_PATTERN = re.compile(r"([0-9][0-9]*)\+?\s*years?\s*of\s*experience")
+    # Posting requirements: "5 years", "3+ years", "5-7 years" (takes 5), "minimum 3 yrs"
+    REQUIREMENT_PATTERN = re.compile(r"([0-9][0-9]*)(?:\s*[-–]\s*\d+)?\s*\+?\s*(?:year|yr)s?")
+    # Date ranges are found from "<start year> <separator>", which is cheap to scan
+    # for (it starts with a digit); the optional start month is then matched just
+    # before the year and the end date just after the separator
+    RANGE_PATTERN = re.compile(r"((?:19|20)\d{2})(?<![\w\-]\d{4})\s*(?:-|–|—|to|until|through)\s*")
+    START_MONTH_PATTERN = re.compile(
+        rf"(?<![\w/.\-])(?:(?P<month>{_MONTH}),?\s+|(?P<num>0?[1-9]|1[0-2])\s*[/.]\s*)$"
+    )
+    END_PATTERN = re.compile(
+        rf"(?:(?:(?P<month>{_MONTH}),?\s+|(?P<num>0?[1-9]|1[0-2])\s*[/.]\s*)?(?P<year>(?:19|20)\d{{2}})"
+        rf"|(?P<present>present|current|now|today|date)\b)(?![\d/])"
+    )
+    # Ranges starting before this are dates of birth or typos, not jobs
+    MIN_YEAR = 1950
+    MAX_EXPLICIT_YEARS = 50
+
+    def __init__(self, today: Optional[date] = None):
+        # Fixed "today" for reproducible results; defaults to the current date per call
+        self.today = today
+
+    def extract_years(self, text: str, lowered: bool = False) -> float:
         """
-        Estimate total years of experience. 
-        This is a heuristic approach. 
+        Estimate total years of experience.
+        This is a heuristic approach: the larger of the explicit claim and the
+        merged employment timeline, rounded to one decimal.
         """
-        # We take the maximum number mentioned near "experience" keywords
-        lower_text = text.lower()
-        max_years = 0.0
-        
+        lower_text = text if lowered else text.lower()
+
         # Look for explicit "X years of experience"
-        matches = re.findall(r"(\d+)\+?\s*years?\s*of\s*experience", lower_text)
-        if matches:
-             years = [float(m) for m in matches if float(m) < 50] # Sanity check < 50
-             if years:
-                 return max(years)
+        explicit = [
+            float(m) for m in self.EXPERIENCE_PATTERN.findall(lower_text) if float(m) < self.MAX_EXPLICIT_YEARS
+        ]
+        timeline = self.timeline_years(lower_text, lowered=True)
+        return round(max(explicit + [timeline]), 1)
+
+    def extract_years_batch(self, texts: Iterable[str], lowered: bool = False) -> List[float]:
+        return [self.extract_years(text, lowered=lowered) for text in texts]
+
+    def timeline_years(self, text: str, lowered: bool = False) -> float:
+        """Years covered by the employment date ranges in ``text``, overlaps counted once."""
+        return sum(end - start for start, end in self.employment_intervals(text, lowered=lowered)) / 12
+
+    def employment_intervals(self, text: str, lowered: bool = False) -> List[Tuple[int, int]]:
+        """Merged ``[start, end)`` month-index intervals (year * 12 + month) found in ``text``."""
+        today = self.today or date.today()
+        now = today.year * 12 + today.month  # exclusive end of the current month
+        text = text if lowered else text.lower()
+        intervals = []
+        for match in self.RANGE_PATTERN.finditer(text):
+            year_at = match.start(1)
+            # "mar 2019", "03/2019": at most "september, " precedes the year
+            prefix = self.START_MONTH_PATTERN.search(text, max(0, year_at - 16), year_at)
+            if prefix is None and year_at and text[year_at - 1] in "/.":
+                continue  # the tail of a full date such as 1.2.2019
+            end_match = self.END_PATTERN.match(text, match.end())
+            if end_match is None:
+                continue
+            start = _month_index(int(match.group(1)), prefix, is_end=False)
+            if end_match.group("present"):
+                end = now
+            else:
+                end = min(_month_index(int(end_match.group("year")), end_match, is_end=True), now)
+            if start // 12 >= self.MIN_YEAR and start < end:
+                intervals.append((start, end))
+        return _merge(intervals)
+
+    def min_required_years(self, text: str, lowered: bool = False) -> float:
+        """First years-of-experience requirement in a job posting (0 when none is stated)."""
+        match = self.REQUIREMENT_PATTERN.search(text if lowered else text.lower())
+        return float(match.group(1)) if match else 0.0
+
+
+
+def _month_index(year: int, month_match: Optional[re.Match], is_end: bool) -> int:
+    name = month_match.group("month") if month_match else None
+    number = month_match.group("num") if month_match else None
+    if name:
+        month = _MONTHS[name[:3]]
+    elif number:
+        month = int(number) - 1
+    else:
+        # Bare years count whole-year differences: "2015 - 2018" is three years
+        return year * 12
+    # Month-precise ends include that month: "jan 2020 - mar 2020" is 3 months
+    return year * 12 + month + (1 if is_end else 0)
+
 
-        return 0.0
+def _merge(intervals: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    # Sort, then a single sweep folds overlapping or touching ranges together
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
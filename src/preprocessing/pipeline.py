@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import AbstractSet, Iterable, List, Set
+
+from .experience_extractor import ExperienceExtractor
+from .skill_extractor import SkillExtractor
+from .text_cleaner import TextCleaner
+
+# Work-arrangement tags detected in the cleaned text
+ENVIRONMENT_TAGS = ("remote", "hybrid", "onsite", "flexible")
+
+# Optional PreprocessedText fields; each is its own scan, so callers ask only for
+# what they use (cleaned text and skills are always derived)
+RESUME_FIELDS = frozenset({"years_experience", "environment"})
+POSTING_FIELDS = frozenset({"min_years", "environment"})
+ALL_FIELDS = RESUME_FIELDS | POSTING_FIELDS
+
+
+@dataclass
+class PreprocessedText:
+    """Everything the matcher derives from one resume or job description.
+
+    Optional fields that were not requested keep their defaults.
+    """
+    cleaned: str
+    skill_ids: Set[int] = field(default_factory=set)
+    # Canonical names of ``skill_ids``, sorted
+    skills: List[str] = field(default_factory=list)
+    # Resume-style "N years of experience"
+    years_experience: float = 0.0
+    # Posting-style requirement ("3+ years", "5-7 years")
+    min_years: float = 0.0
+    environment: List[str] = field(default_factory=list)
+
+
+class TextPreprocessor:
+    """Derives cleaned text, skills, years and tags from one document.
+
+    The text is lowercased a single time and that copy is shared by the skill
+    matcher, the cleaner and the experience patterns, which otherwise each
+    lowercased it again. They still scan the text separately, so ``fields``
+    limits the optional scans to the ones the caller needs.
+    """
+
+    def __init__(
+        self,
+        text_cleaner: TextCleaner | None = None,
+        skill_extractor: SkillExtractor | None = None,
+        experience_extractor: ExperienceExtractor | None = None,
+    ) -> None:
+        self.text_cleaner = text_cleaner or TextCleaner()
+        self.skill_extractor = skill_extractor or SkillExtractor()
+        self.experience_extractor = experience_extractor or ExperienceExtractor()
+
+    def process(self, text: str, fields: AbstractSet[str] = ALL_FIELDS) -> PreprocessedText:
+        lowered = (text or "").lower()
+        taxonomy = self.skill_extractor.taxonomy
+        # Skills come from the uncleaned text: stopword removal would break phrases like "ruby on rails"
+        skill_ids = taxonomy.unique_ids(lowered, lowered=True)
+        cleaned = self.text_cleaner.clean(lowered, lowered=True)
+        result = PreprocessedText(cleaned=cleaned, skill_ids=skill_ids, skills=sorted(taxonomy.names_of(skill_ids)))
+        if "years_experience" in fields:
+            result.years_experience = self.experience_extractor.extract_years(lowered, lowered=True)
+        if "min_years" in fields:
+            result.min_years = self.experience_extractor.min_required_years(cleaned, lowered=True)
+        if "environment" in fields:
+            result.environment = [tag for tag in ENVIRONMENT_TAGS if tag in cleaned]
+        return result
+
+    def process_batch(self, texts: Iterable[str], fields: AbstractSet[str] = ALL_FIELDS) -> List[PreprocessedText]:
+        return [self.process(text, fields) for text in texts]
@@ -2,7 +2,8 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from typing import List, Sequence, Set
-import re
+
+from .skill_taxonomy import SkillTaxonomy, load_taxonomy
 
 @dataclass
 class SkillMatch:
@@ -11,95 +12,38 @@ class SkillMatch:
 
 
 class SkillExtractor:
-    """Improved skill extractor with fuzzy normalization and punctuation-tolerant matching."""
-
-    def __init__(self, skills: Sequence[str] | None = None) -> None:
-        base_skills = [s.strip().lower() for s in (skills or DEFAULT_SKILLS)]
-        base_skills = list(dict.fromkeys(base_skills))  # deduplicate
-        self._skills = {s.lower(): s for s in base_skills}
-        self._pattern = self._build_pattern(base_skills)
+    """Improved skill extractor with fuzzy normalization and punctuation-tolerant matching.
 
-    @staticmethod
-    def _build_pattern(skills: Sequence[str]) -> re.Pattern[str]:
-        """Build regex that tolerates punctuation, hyphens, and underscores."""
-        escaped = sorted(skills, key=len, reverse=True)
-        # Match multiword skills separated by optional punctuation/spaces
-        pattern = r"(?<!\w)(" + "|".join(
-            re.escape(skill).replace(r"\ ", r"[\s_\-/]+") for skill in escaped
-        ) + r")(?!\w)"
-        return re.compile(pattern, re.IGNORECASE)
+    Matches against the shared skill taxonomy by default, so aliases
+    ("golang", "retrieval augmented generation") count as their canonical
+    skill; pass ``skills`` for an alias-free custom list instead.
+    """
 
-    def _normalize_text(self, text: str) -> str:
-        """Lowercase, remove excessive punctuation, normalize spaces."""
-        text = text.lower()
-        text = re.sub(r"[^a-z0-9\s\+\#\-/]", " ", text)
-        text = re.sub(r"\s+", " ", text)
-        return text.strip()
+    def __init__(self, skills: Sequence[str] | None = None, taxonomy: SkillTaxonomy | None = None) -> None:
+        if skills and taxonomy is not None:
+            raise ValueError("Pass either skills or taxonomy, not both")
+        if taxonomy is None:
+            taxonomy = SkillTaxonomy.from_skills(skills) if skills else load_taxonomy()
+        # Token trie: linear in text length, tolerant of "-", "_" and "/" between words
+        self.taxonomy = taxonomy
 
     def extract(self, text: str) -> List[SkillMatch]:
         
         """Extract skills from text (case-insensitive, punctuation-tolerant)."""
-        normalized = self._normalize_text(text)
-        counts: dict[str, int] = {}
-        for match in self._pattern.findall(normalized):
-            key = match.lower().strip()
-            canonical = self._skills.get(key, key)
-            counts[canonical] = counts.get(canonical, 0) + 1
-        return [SkillMatch(skill=s, occurrences=c) for s, c in sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))]
-
-    def unique_skills(self, text: str) -> Set[str]:
-        return {m.skill for m in self.extract(text)}
-
-
-DEFAULT_SKILLS: List[str] = [
-    # --- Software Engineering: Languages ---
-    "python", "javascript", "typescript", "java", "c++", "c", "c#", "go", "golang", "rust",
-    "swift", "kotlin", "ruby", "php", "scala", "julia", "lua", "shell", "bash",
+        counts: dict[int, int] = {}
+        for skill_id in self.taxonomy.find_ids(text):
+            counts[skill_id] = counts.get(skill_id, 0) + 1
+        names = self.taxonomy.names
+        matches = [SkillMatch(skill=names[skill_id], occurrences=c) for skill_id, c in counts.items()]
+        return sorted(matches, key=lambda m: (-m.occurrences, m.skill))
 
-    # --- Software Engineering: Web & Backend ---
-    "react", "angular", "vue", "next.js", "node.js", "express", "nestjs",
-    "django", "flask", "fastapi", "spring boot", "asp.net", ".net", "ruby on rails",
-    "graphql", "rest api", "grpc", "microservices", "serverless", "event-driven",
+    def skill_ids(self, text: str) -> Set[int]:
+        """Taxonomy ids of the skills in ``text``."""
+        return self.taxonomy.unique_ids(text)
 
-    # --- Software Engineering: DevOps & Cloud ---
-    "aws", "azure", "gcp", "docker", "kubernetes", "terraform", "ansible",
-    "jenkins", "github actions", "gitlab ci", "circleci", "prometheus", "grafana",
-    "linux", "unix", "sre", "site reliability engineering",
-
-    # --- Data Engineering & Databases ---
-    "sql", "postgresql", "mysql", "mongodb", "redis", "elasticsearch", "cassandra",
-    "dynamodb", "snowflake", "databricks", "bigquery", "redshift",
-    "spark", "pyspark", "hadoop", "kafka", "flink", "airflow", "trino", "presto", "dbt",
-    "etl", "elt", "data pipeline", "data warehousing", "data governance",
-
-    # --- Data Science & MLE ---
-    "pandas", "numpy", "scikit-learn", "scipy", "statsmodels",
-    "tensorflow", "pytorch", "keras", "xgboost", "lightgbm", "catboost",
-    "mlflow", "kubeflow", "wandb", "dvc", "mlops", "model serving",
-    "a/b testing", "causal inference", "statistics", "mathematics",
-
-    # --- Generative AI: LLMs & Models ---
-    "llm", "large language model", "gpt-4", "gpt-3.5", "claude", "gemini",
-    "llama", "mistral", "mixtral", "falcon", "gemma", "stable diffusion",
-    "midjourney", "dalle", "clip", "whisper", "transformers", "bert",
-
-    # --- Generative AI: Techniques ---
-    "rag", "retrieval augmented generation", "prompt engineering", "chain of thought",
-    "fine-tuning", "peft", "lora", "qlora", "rlhf", "dpo", "quantization",
-    "vector database", "pinecone", "chroma", "weaviate", "milvus", "qdrant",
-    "langchain", "llamaindex", "semantic search", "embeddings",
-
-    # --- Agentic AI & Autonomous Systems ---
-    "autonomous agents", "agentic ai", "multi-agent systems", "autogen",
-    "crewai", "langgraph", "babyagi", "autogpt", "chatdev",
-    "react pattern", "planning", "tool use", "function calling",
+    def unique_skills(self, text: str) -> Set[str]:
+        return set(self.taxonomy.names_of(self.taxonomy.unique_ids(text)))
 
-    # --- Domain Specific: Finance/Web3 ---
-    "web3", "defi", "crypto", "blockchain", "smart contracts", "solidity",
-    "quantitative finance", "financial modeling", "algorithmic trading",
-    "risk management", "fraud detection",
 
-    # --- Soft Skills & Methodologies ---
-    "agile", "scrum", "kanban", "jira", "confluence",
-    "problem solving", "communication", "leadership", "mentoring",
-]
+# Canonical names from the bundled taxonomy, in id order; aliases live in skill_taxonomy.json
+DEFAULT_SKILLS: List[str] = list(load_taxonomy().names)
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import re
+from typing import Hashable, Iterable, Iterator, List, Tuple
+
+# Tokens keep the characters that carry meaning in skill names (c++, c#, next.js);
+# everything else, including "-", "_" and "/", separates tokens.
+_TOKEN_RE = re.compile(r"[a-z0-9+#.]+")
+# Key under which a trie node stores the value of the skill ending there
+_SKILL = ""
+
+
+def tokenize(text: str, lowered: bool = False) -> List[str]:
+    """Lowercase ``text`` (unless already ``lowered``) and split it into skill-matching tokens.
+
+    Trailing dots are dropped so sentence punctuation does not stick to a
+    word ("python." -> "python") while inner and leading ones survive
+    ("node.js", ".net").
+    """
+    tokens = []
+    for token in _TOKEN_RE.findall(text if lowered else text.lower()):
+        token = token.rstrip(".")
+        if token:
+            tokens.append(token)
+    return tokens
+
+
+class SkillMatcher:
+    """Token trie over skill phrases with leftmost-longest matching.
+
+    Each skill is stored as its token sequence, so "spring boot",
+    "spring-boot" and "spring_boot" all reach the same node. Matching walks
+    the trie from every token position and keeps the longest phrase found,
+    which costs O(text tokens x longest phrase) whatever the vocabulary size.
+    """
+
+    def __init__(self, skills: Iterable[str] = ()) -> None:
+        self._root: dict = {}
+        self._size = 0
+        # Vocabulary tokens that contain a dot ("node.js", ".net"); other dotted text
+        # tokens are split so "vue.js" still yields "vue"
+        self._dotted: set[str] = set()
+        for skill in skills:
+            self.add(skill)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, phrase: str, value: Hashable | None = None) -> None:
+        """Register ``phrase``; matches report ``value`` (default: the phrase itself).
+
+        Aliases pass their canonical skill's value so every spelling reports
+        the same skill (``SkillTaxonomy`` uses integer skill ids).
+        """
+        tokens = tokenize(phrase)
+        if not tokens:
+            return
+        node = self._root
+        for token in tokens:
+            node = node.setdefault(token, {})
+            if "." in token:
+                self._dotted.add(token)
+        if _SKILL not in node:
+            self._size += 1
+        node[_SKILL] = value if value is not None else " ".join(phrase.lower().split())
+
+    def iter_matches(self, tokens: List[str]) -> Iterator[Tuple[int, int, Hashable]]:
+        """Yield ``(start, end, skill)`` token spans, leftmost-longest and non-overlapping."""
+        root = self._root
+        position = 0
+        count = len(tokens)
+        while position < count:
+            node = root.get(tokens[position])
+            match_end = -1
+            skill = None
+            cursor = position
+            while node is not None:
+                cursor += 1
+                found = node.get(_SKILL)
+                if found is not None:
+                    match_end, skill = cursor, found
+                if cursor == count:
+                    break
+                node = node.get(tokens[cursor])
+            if skill is None:
+                position += 1
+                continue
+            yield position, match_end, skill
+            position = match_end
+
+    def find_all(self, text: str, lowered: bool = False) -> List[Hashable]:
+        """Value of every skill matched in ``text``, in order of appearance."""
+        tokens = self._split_dotted(tokenize(text, lowered=lowered))
+        return [skill for _, _, skill in self.iter_matches(tokens)]
+
+    def _split_dotted(self, tokens: List[str]) -> List[str]:
+        expanded = []
+        for token in tokens:
+            if "." in token and token not in self._dotted:
+                parts = [part for part in token.split(".") if part]
+                # Abbreviations such as "b.c" or "u.s" stay whole instead of yielding "c"
+                if len(parts) > 1 and all(len(part) > 1 for part in parts):
+                    expanded.extend(parts)
+                    continue
+            expanded.append(token)
+        return expanded
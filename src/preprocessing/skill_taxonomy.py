@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Set
+
+from .skill_matcher import SkillMatcher, tokenize
+
+TAXONOMY_PATH = Path(__file__).with_name("skill_taxonomy.json")
+
+
+class SkillTaxonomy:
+    """Canonical skills and their aliases, compiled into one id-reporting matcher.
+
+    A skill's id is its position in the taxonomy, so ids are small, dense and
+    stable for a given ``version``. Every alias ("golang", "large language
+    model") resolves to its canonical skill's id, both when matching text and
+    when looking up a listed skill with :meth:`id_of`.
+    """
+
+    def __init__(self, skills: Iterable[dict], version: int | str = 0, path: Path | None = None) -> None:
+        self.version = version
+        self.path = path
+        self.names: List[str] = []
+        self.categories: List[str | None] = []
+        # Token key (see ``key``) of every canonical name and alias -> skill id
+        self._ids: Dict[str, int] = {}
+        self._matcher = SkillMatcher()
+        for entry in skills:
+            name = " ".join(entry["name"].lower().split())
+            skill_id = len(self.names)
+            self.names.append(name)
+            self.categories.append(entry.get("category"))
+            for phrase in [name, *entry.get("aliases", ())]:
+                key = self.key(phrase)
+                if not key:
+                    raise ValueError(f"Skill phrase {phrase!r} has no matchable tokens")
+                owner = self._ids.get(key)
+                if owner == skill_id:
+                    continue
+                if owner is not None:
+                    raise ValueError(f"{phrase!r} is listed under both {self.names[owner]!r} and {name!r}")
+                self._ids[key] = skill_id
+                self._matcher.add(phrase, skill_id)
+
+    @classmethod
+    def load(cls, path: str | Path = TAXONOMY_PATH) -> SkillTaxonomy:
+        path = Path(path)
+        document = json.loads(path.read_text(encoding="utf-8"))
+        if "version" not in document or "skills" not in document:
+            raise ValueError(f"{path} is not a skill taxonomy (expected 'version' and 'skills')")
+        return cls(document["skills"], version=document["version"], path=path)
+
+    @classmethod
+    def from_skills(cls, skills: Iterable[str]) -> SkillTaxonomy:
+        """Alias-free taxonomy over a flat skill list; duplicates keep their first id."""
+        seen: Dict[str, None] = {}
+        for skill in skills:
+            seen.setdefault(" ".join(skill.strip().lower().split()), None)
+        return cls(({"name": name} for name in seen if cls.key(name)))
+
+    def __reduce__(self):
+        # Worker processes reload (and cache) the file instead of unpickling the trie
+        if self.path is not None:
+            return load_taxonomy, (self.path,)
+        return super().__reduce__()
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @staticmethod
+    def key(phrase: str) -> str:
+        """Lookup key for ``phrase``: its matcher tokens, so "Spring-Boot" finds "spring boot"."""
+        return " ".join(tokenize(phrase))
+
+    def id_of(self, skill: str) -> int | None:
+        return self._ids.get(self.key(skill))
+
+    def find_ids(self, text: str, lowered: bool = False) -> List[int]:
+        """Skill id of every match in ``text``, in order of appearance."""
+        return self._matcher.find_all(text, lowered=lowered)
+
+    def unique_ids(self, text: str, lowered: bool = False) -> Set[int]:
+        return set(self._matcher.find_all(text, lowered=lowered))
+
+    def names_of(self, skill_ids: Iterable[int]) -> List[str]:
+        return [self.names[skill_id] for skill_id in skill_ids]
+
+
+def load_taxonomy(path: str | Path = TAXONOMY_PATH) -> SkillTaxonomy:
+    """The taxonomy at ``path``, compiled once per process and shared by every caller."""
+    return _load_taxonomy(Path(path).resolve())
+
+
+@lru_cache(maxsize=None)
+def _load_taxonomy(path: Path) -> SkillTaxonomy:
+    return SkillTaxonomy.load(path)
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+from .skill_taxonomy import SkillTaxonomy, load_taxonomy
+
+
+class SkillVocabulary:
+    """Stable integer ids for skill names, plus packed uint64 bitsets over them.
+
+    The first ids are the taxonomy's own (shared skill taxonomy unless
+    ``taxonomy`` or a flat ``skills`` list is given), so aliases resolve to
+    their canonical skill and ids from ``SkillExtractor.skill_ids`` can be
+    packed directly. Any other skill gets the next id the first time it is
+    seen so job postings with custom skills still compare bitwise.
+    """
+
+    def __init__(self, skills: Iterable[str] | None = None, taxonomy: SkillTaxonomy | None = None) -> None:
+        if skills is not None and taxonomy is not None:
+            raise ValueError("Pass either skills or taxonomy, not both")
+        if taxonomy is None:
+            taxonomy = SkillTaxonomy.from_skills(skills) if skills is not None else load_taxonomy()
+        self.taxonomy = taxonomy
+        # Skills outside the taxonomy, keyed like taxonomy lookups
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = list(taxonomy.names)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    @property
+    def words(self) -> int:
+        """Number of uint64 words needed for a bitset over the vocabulary."""
+        return max(1, (len(self._names) + 63) // 64)
+
+    def id_of(self, skill: str, add: bool = True) -> int | None:
+        skill_id = self.taxonomy.id_of(skill)
+        if skill_id is not None:
+            return skill_id
+        key = SkillTaxonomy.key(skill)
+        skill_id = self._ids.get(key)
+        if skill_id is None and add and key:
+            skill_id = len(self._names)
+            self._ids[key] = skill_id
+            self._names.append(" ".join(skill.lower().split()))
+        return skill_id
+
+    def name(self, skill_id: int) -> str:
+        return self._names[skill_id]
+
+    def bitset(self, skills: Iterable[str], add: bool = True) -> np.ndarray:
+        """Pack ``skills`` into a ``(words,)`` uint64 array; unknown skills are dropped unless ``add``."""
+        ids = [skill_id for skill_id in (self.id_of(skill, add=add) for skill in skills) if skill_id is not None]
+        return self.bitset_of_ids(ids)
+
+    def bitset_of_ids(self, skill_ids: Iterable[int]) -> np.ndarray:
+        bits = np.zeros(self.words, dtype=np.uint64)
+        for skill_id in skill_ids:
+            bits[skill_id >> 6] |= np.uint64(1 << (skill_id & 63))
+        return bits
+
+    def names_in(self, bits: np.ndarray) -> List[str]:
+        """Skill names whose bits are set, in id order."""
+        flags = np.unpackbits(np.ascontiguousarray(bits, dtype="<u8").view(np.uint8), bitorder="little")
+        return [self._names[skill_id] for skill_id in np.flatnonzero(flags[: len(self._names)]).tolist()]
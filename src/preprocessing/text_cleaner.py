@@ -27,8 +27,10 @@ class TextCleaner:
     def __init__(self, stopwords: Optional[Iterable[str]] = None) -> None:
         self.stopwords = set(stopwords) if stopwords else set()
 
-    def clean(self, text: str) -> str:
-        text = text.lower()
+    def clean(self, text: str, lowered: bool = False) -> str:
+        # lowered=True: the caller already lowercased the text (see TextPreprocessor)
+        if not lowered:
+            text = text.lower()
         text = self.EMAIL_PATTERN.sub(" ", text)
         text = self.URL_PATTERN.sub(" ", text)
         text = self.NON_ALPHA_PATTERN.sub(" ", text)
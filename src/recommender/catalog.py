@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import sys
+from typing import Dict, Iterable, Iterator, List, Sequence
+
+import numpy as np
+
+from ..preprocessing.skill_vocabulary import SkillVocabulary
+from .filters import JobFilter, JobFilterIndex
+
+
+# Free-text columns are stored as-is; low-cardinality ones are interned so
+# thousands of postings in "Toronto, Ontario" share a single string object.
+_TEXT_FIELDS = ("title", "description", "url", "posted_date")
+_INTERNED_FIELDS = ("company", "location", "category", "job_type", "experience_level", "role_type")
+
+
+class JobCatalog:
+    """Column-oriented store of job postings, row-aligned with vector labels.
+
+    Row ``r`` holds the posting whose vector carries label ``r`` in the
+    :class:`VectorStore`, so a search hit resolves to its job without any
+    lookup. Replaced or removed rows are marked dead and never reused.
+    """
+
+    def __init__(self, vocabulary: SkillVocabulary | None = None) -> None:
+        self.vocabulary = vocabulary if vocabulary is not None else SkillVocabulary()
+        self._rows: Dict[str, int] = {}
+        self._job_ids: List[str | None] = []
+        self._columns: Dict[str, List[str | None]] = {name: [] for name in _TEXT_FIELDS + _INTERNED_FIELDS}
+        self._skills: List[tuple] = []
+        self._tags: List[tuple] = []
+        self._min_years = np.zeros(0, dtype=np.float32)
+        self._alive = np.zeros(0, dtype=bool)
+        # One packed skill bitset per row plus its popcount
+        self._skill_bits = np.zeros((0, self.vocabulary.words), dtype=np.uint64)
+        self._skill_counts = np.zeros(0, dtype=np.int32)
+        self._filters = JobFilterIndex()
+
+    def clear(self) -> None:
+        self.__init__(self.vocabulary)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, job_id: object) -> bool:
+        return job_id in self._rows
+
+    @property
+    def row_count(self) -> int:
+        return len(self._job_ids)
+
+    @property
+    def min_years(self) -> np.ndarray:
+        return self._min_years[: self.row_count]
+
+    @property
+    def alive(self) -> np.ndarray:
+        return self._alive[: self.row_count]
+
+    @property
+    def skill_bits(self) -> np.ndarray:
+        return self._skill_bits[: self.row_count]
+
+    @property
+    def skill_counts(self) -> np.ndarray:
+        return self._skill_counts[: self.row_count]
+
+    def row_of(self, job_id: str) -> int | None:
+        return self._rows.get(job_id)
+
+    def set_rows(
+        self,
+        rows: Sequence[int],
+        jobs: Sequence,
+        skill_sets: Sequence[Iterable[str]] | None = None,
+    ) -> None:
+        """Store ``jobs`` at ``rows``, retiring any previous row of the same job_id.
+
+        ``skill_sets`` overrides the skills used for matching (for example skills
+        extracted from the description when a posting lists none); by default
+        each job's own ``skills`` are used.
+        """
+        if len(rows) != len(jobs):
+            raise ValueError("Row and job count mismatch")
+        if not jobs:
+            return
+        if skill_sets is None:
+            skill_sets = [job.skills or () for job in jobs]
+        bitsets = [self.vocabulary.bitset(skills) for skills in skill_sets]
+        self._grow(max(rows) + 1)
+        self._widen(self.vocabulary.words)
+        for row, job, bits in zip(rows, jobs, bitsets):
+            old_row = self._rows.get(job.job_id)
+            if old_row is not None and old_row != row:
+                self._retire(old_row)
+            self._job_ids[row] = job.job_id
+            for name in _TEXT_FIELDS:
+                self._columns[name][row] = getattr(job, name)
+            for name in _INTERNED_FIELDS:
+                self._columns[name][row] = _intern(getattr(job, name))
+            self._skills[row] = tuple(_intern(skill) for skill in job.skills or ())
+            self._tags[row] = tuple(_intern(tag) for tag in job.tags or ())
+            self._min_years[row] = job.min_years_experience or 0.0
+            self._skill_bits[row] = 0
+            self._skill_bits[row, : bits.shape[0]] = bits
+            self._skill_counts[row] = int(np.bitwise_count(bits).sum())
+            self._alive[row] = True
+            self._rows[job.job_id] = row
+            self._filters.add(row, job)
+
+    def remove(self, job_ids: Sequence[str]) -> int:
+        removed = 0
+        for job_id in job_ids:
+            row = self._rows.get(job_id)
+            if row is not None:
+                self._retire(row)
+                removed += 1
+        return removed
+
+    def select(self, job_filter: JobFilter | None) -> np.ndarray | None:
+        """Boolean row mask for ``job_filter`` (None when nothing is filtered)."""
+        if job_filter is None:
+            return None
+        return self._filters.select(job_filter, self.row_count)
+
+    def skill_bitset(self, skill_ids: Iterable[int]) -> np.ndarray:
+        """Bitset for query-side taxonomy skill ids, as wide as the row bitsets."""
+        bits = np.zeros(self._skill_bits.shape[1], dtype=np.uint64)
+        query = self.vocabulary.bitset_of_ids(skill_ids)
+        bits[: query.shape[0]] = query
+        return bits
+
+    def matched_skills(self, row: int, query_bits: np.ndarray) -> List[str]:
+        return self.vocabulary.names_in(self._skill_bits[row] & query_bits)
+
+    def record(self, row: int) -> dict:
+        """Materialize one row as keyword arguments for ``JobPosting``."""
+        if row >= self.row_count or not self._alive[row]:
+            raise KeyError(f"Row {row} is not in the catalog")
+        record = {"job_id": self._job_ids[row]}
+        for name in _TEXT_FIELDS + _INTERNED_FIELDS:
+            record[name] = self._columns[name][row]
+        record["skills"] = list(self._skills[row])
+        record["tags"] = list(self._tags[row])
+        record["min_years_experience"] = float(self._min_years[row])
+        return record
+
+    def records(self) -> Iterator[dict]:
+        for row in np.flatnonzero(self.alive).tolist():
+            yield self.record(row)
+
+    def _retire(self, row: int) -> None:
+        job_id = self._job_ids[row]
+        if self._rows.get(job_id) == row:
+            del self._rows[job_id]
+        self._alive[row] = False
+        self._filters.remove(row)
+
+    def _grow(self, size: int) -> None:
+        extra = size - self.row_count
+        if extra <= 0:
+            return
+        self._job_ids.extend([None] * extra)
+        for column in self._columns.values():
+            column.extend([None] * extra)
+        self._skills.extend([()] * extra)
+        self._tags.extend([()] * extra)
+        if size > self._min_years.shape[0]:
+            # Geometric growth keeps incremental upserts amortized O(change)
+            capacity = max(size, 2 * self._min_years.shape[0])
+            self._min_years = np.resize(self._min_years, capacity)
+            self._alive = np.resize(self._alive, capacity)
+            self._skill_counts = np.resize(self._skill_counts, capacity)
+            self._min_years[self.row_count - extra:] = 0.0
+            self._alive[self.row_count - extra:] = False
+            self._skill_counts[self.row_count - extra:] = 0
+            bits = np.zeros((capacity, self._skill_bits.shape[1]), dtype=np.uint64)
+            bits[: self._skill_bits.shape[0]] = self._skill_bits
+            self._skill_bits = bits
+
+    def _widen(self, words: int) -> None:
+        # New skills beyond the current width add zero columns to every row
+        if words <= self._skill_bits.shape[1]:
+            return
+        bits = np.zeros((self._skill_bits.shape[0], words), dtype=np.uint64)
+        bits[:, : self._skill_bits.shape[1]] = self._skill_bits
+        self._skill_bits = bits
+
+
+def _intern(value: str | None) -> str | None:
+    return sys.intern(value) if value else value
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Set, Tuple
+
+import numpy as np
+
+
+FILTER_FIELDS = ("location", "job_type", "experience_level", "role_type", "tags")
+
+
+@dataclass
+class JobFilter:
+    """Metadata predicates applied inside the vector search.
+
+    Fields are ANDed together and compared case-insensitively. ``location``
+    matches the full location or any comma-separated part of it (so
+    ``"Toronto"`` matches ``"Toronto, Ontario"``); every entry in ``tags`` must
+    be present on the job.
+    """
+    location: str | None = None
+    job_type: str | None = None
+    experience_level: str | None = None
+    role_type: str | None = None
+    tags: List[str] = field(default_factory=list)
+
+    def terms(self) -> List[Tuple[str, str]]:
+        terms = [
+            (name, _normalize(value))
+            for name, value in (
+                ("location", self.location),
+                ("job_type", self.job_type),
+                ("experience_level", self.experience_level),
+                ("role_type", self.role_type),
+            )
+            if value and value.strip()
+        ]
+        terms.extend(("tags", _normalize(tag)) for tag in self.tags if tag and tag.strip())
+        return terms
+
+    def is_empty(self) -> bool:
+        return not self.terms()
+
+
+class JobFilterIndex:
+    """Inverted lists from (field, value) to vector labels.
+
+    Lists are kept as sets for cheap incremental updates, and materialized
+    lazily as sorted label arrays so a query only pays for a few vectorized
+    mask operations over the label space.
+    """
+
+    def __init__(self) -> None:
+        self._postings: Dict[Tuple[str, str], Set[int]] = {}
+        self._arrays: Dict[Tuple[str, str], np.ndarray] = {}
+        self._terms_by_label: Dict[int, List[Tuple[str, str]]] = {}
+
+    def clear(self) -> None:
+        self._postings.clear()
+        self._arrays.clear()
+        self._terms_by_label.clear()
+
+    def add(self, label: int, job) -> None:
+        terms = list(dict.fromkeys(_job_terms(job)))
+        self._terms_by_label[label] = terms
+        for term in terms:
+            self._postings.setdefault(term, set()).add(label)
+            self._arrays.pop(term, None)
+
+    def remove(self, label: int) -> None:
+        for term in self._terms_by_label.pop(label, []):
+            labels = self._postings.get(term)
+            if labels is None:
+                continue
+            labels.discard(label)
+            if not labels:
+                del self._postings[term]
+            self._arrays.pop(term, None)
+
+    def select(self, job_filter: JobFilter, n_labels: int) -> np.ndarray | None:
+        """Return a boolean mask over labels ``[0, n_labels)``, or None for no filter."""
+        terms = job_filter.terms()
+        if not terms:
+            return None
+        mask: np.ndarray | None = None
+        # Start from the rarest term so the mask is as sparse as possible early
+        for term in sorted(terms, key=lambda t: len(self._postings.get(t, ()))):
+            labels = self._labels_for(term)
+            term_mask = np.zeros(n_labels, dtype=bool)
+            term_mask[labels[labels < n_labels]] = True
+            mask = term_mask if mask is None else mask & term_mask
+            if not mask.any():
+                break
+        return mask
+
+    def _labels_for(self, term: Tuple[str, str]) -> np.ndarray:
+        labels = self._arrays.get(term)
+        if labels is None:
+            labels = np.fromiter(self._postings.get(term, ()), dtype=np.int64)
+            labels.sort()
+            self._arrays[term] = labels
+        return labels
+
+
+def _normalize(value: str) -> str:
+    return " ".join(value.lower().split())
+
+
+def _job_terms(job) -> Iterable[Tuple[str, str]]:
+    if job.location:
+        yield "location", _normalize(job.location)
+        for part in job.location.split(","):
+            if part.strip():
+                yield "location", _normalize(part)
+    for name in ("job_type", "experience_level", "role_type"):
+        value = getattr(job, name)
+        if value and value.strip():
+            yield name, _normalize(value)
+    for tag in job.tags or []:
+        if tag and tag.strip():
+            yield "tags", _normalize(tag)
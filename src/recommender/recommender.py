@@ -1,22 +1,38 @@
 ﻿from __future__ import annotations
 
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
 from pathlib import Path
-from typing import Iterable, List, Sequence, Set
+from typing import AbstractSet, Iterable, Iterator, List, Sequence, Set, Tuple
 
+import json
 import logging
+import os
 import numpy as np
 
 from ..embeddings.text_embedder import TextEmbedder
 from ..storage.vector_store import RetrievedItem, VectorStore
 from ..ocr.pdf_parser import PDFParser
+from .catalog import JobCatalog
+from .filters import JobFilter
+from ..preprocessing.batch import BatchPreprocessor
+from ..preprocessing.pipeline import ALL_FIELDS, RESUME_FIELDS, PreprocessedText, TextPreprocessor
 from ..preprocessing.skill_extractor import SkillExtractor
+from ..preprocessing.skill_vocabulary import SkillVocabulary
 from ..preprocessing.text_cleaner import TextCleaner
 from ..utils.logging_utils import setup_logging
+from ..utils.rwlock import ReadWriteLock
 
 logger = logging.getLogger(__name__)
 setup_logging()
 
+JOBS_FILENAME = "jobs.json"
+
+# Hybrid score weights
+SEMANTIC_WEIGHT = 0.6
+SKILL_WEIGHT = 0.2
+EXPERIENCE_WEIGHT = 0.2
+
 
 @dataclass
 class JobPosting:
@@ -52,96 +68,281 @@ class ResumeRecommender:
         text_cleaner: TextCleaner | None = None,
         skill_extractor: SkillExtractor | None = None,
         pdf_parser: PDFParser | None = None,
+        rerank_pool_factor: int = 10,
+        preprocess_workers: int = 0,
     ) -> None:
         self.embedding_generator = embedding_generator or TextEmbedder()
-        self.vector_store = vector_store or VectorStore()
+        # Sized containers: an empty store is falsy, so test for None explicitly
+        self.vector_store = vector_store if vector_store is not None else VectorStore()
         self.text_cleaner = text_cleaner or TextCleaner()
         self.skill_extractor = skill_extractor or SkillExtractor()
         self.pdf_parser = pdf_parser
-        self._job_postings: List[JobPosting] = []
+        # Shares one lowercased copy of each text between cleaning, skill and experience extraction
+        self.preprocessor = TextPreprocessor(self.text_cleaner, self.skill_extractor)
+        # Candidates fetched per requested result before hybrid re-ranking
+        self.rerank_pool_factor = max(1, rerank_pool_factor)
+        # Worker processes for batch preprocessing of resumes and postings (0 = in-process)
+        self.preprocess_workers = preprocess_workers
+        self.batch_preprocessor = BatchPreprocessor(self.preprocessor, workers=preprocess_workers)
+        # Vocabulary ids start with the extractor's taxonomy ids, so resume skills compare as ints
+        self._catalog = JobCatalog(SkillVocabulary(taxonomy=self.skill_extractor.taxonomy))
+        # Searches share the index; updates take it exclusively so a search never sees
+        # the vector store and the catalog out of step (e.g. labels past the catalog rows)
+        self._index_lock = ReadWriteLock()
 
-    def index_jobs(self, job_postings: Sequence[JobPosting]) -> None:
-        self._job_postings = list(job_postings)
-        cleaned = [self.text_cleaner.clean(job.description) for job in self._job_postings]
+    def index_jobs(self, job_postings: Sequence[JobPosting], workers: int = 1) -> None:
+        """Rebuild the index from ``job_postings``.
+
+        With ``workers > 1`` descriptions are embedded by that many model
+        processes and streamed into the vector store chunk by chunk, in order.
+        """
+        jobs = list({job.job_id: job for job in job_postings}.values())
+        # Only the cleaned text and skills are used; requirement years come with the posting
+        processed = self.preprocess([job.description for job in jobs], fields=frozenset())
+        cleaned = [doc.cleaned for doc in processed]
+        payloads = [job.job_id for job in jobs]
+        matching_skills = self._matching_skills(jobs, processed)
+        if workers > 1:
+            # Streaming embeds while adding, so searches wait for the whole rebuild
+            with self._index_lock.write():
+                self.vector_store.reset()
+                self._catalog.clear()
+                embedded = self.embedding_generator.iter_encode(cleaned, workers=workers)
+                labels = self.vector_store.add_stream(
+                    _with_payloads(embedded, payloads), expected_count=len(jobs)
+                )
+                self._catalog.set_rows(labels.tolist(), jobs, matching_skills)
+        else:
+            embeddings = self.embedding_generator.encode(cleaned)
+            with self._index_lock.write():
+                self.vector_store.reset()
+                self._catalog.clear()
+                labels = self.vector_store.add_items(embeddings, payloads)
+                self._catalog.set_rows(labels.tolist(), jobs, matching_skills)
+        logger.info("Indexed %d job postings", len(jobs))
+
+    def add_jobs(self, job_postings: Sequence[JobPosting]) -> int:
+        """Embed and upsert only the given postings, replacing any with the same job_id."""
+        new_jobs = list({job.job_id: job for job in job_postings}.values())
+        if not new_jobs:
+            return 0
+        processed = self.preprocess([job.description for job in new_jobs], fields=frozenset())
+        cleaned = [doc.cleaned for doc in processed]
         embeddings = self.embedding_generator.encode(cleaned)
-        payloads = [job.job_id for job in self._job_postings]
-        self.vector_store.reset()
-        self.vector_store.add_items(embeddings, payloads)
-        logger.info("Indexed %d job postings", len(self._job_postings))
+        matching_skills = self._matching_skills(new_jobs, processed)
+        with self._index_lock.write():
+            labels = self.vector_store.upsert([job.job_id for job in new_jobs], embeddings)
+            self._catalog.set_rows(labels.tolist(), new_jobs, matching_skills)
+        logger.info("Upserted %d job postings", len(new_jobs))
+        return len(new_jobs)
+
+    def remove_jobs(self, job_ids: Iterable[str]) -> int:
+        """Drop postings from the index; unknown ids are ignored."""
+        job_ids = list(dict.fromkeys(job_ids))
+        with self._index_lock.write():
+            removed = self.vector_store.remove(job_ids)
+            self._catalog.remove(job_ids)
+        logger.info("Removed %d job postings", removed)
+        return removed
+
+    def _matching_skills(
+        self, jobs: Sequence[JobPosting], processed: Sequence[PreprocessedText] | None = None
+    ) -> List[Iterable[str]]:
+        # Postings without listed skills are parsed once here, never on the query path
+        if processed is None:
+            return [job.skills or self.skill_extractor.unique_skills(job.description) for job in jobs]
+        return [job.skills or doc.skills for job, doc in zip(jobs, processed)]
+
+    @property
+    def job_count(self) -> int:
+        return len(self._catalog)
+
+    @property
+    def last_index_time(self) -> datetime | None:
+        return self.vector_store.built_at
+
+    def save_index(self, directory: str | Path) -> Path:
+        """Persist the vector index together with the job postings it serves."""
+        directory = Path(directory)
+        with self._index_lock.read():
+            self.vector_store.save(directory, model_name=self.embedding_generator.model_name)
+            records = list(self._catalog.records())
+        jobs_tmp = directory / (JOBS_FILENAME + ".tmp")
+        with open(jobs_tmp, "w", encoding="utf-8") as f:
+            json.dump(records, f, ensure_ascii=False)
+        os.replace(jobs_tmp, directory / JOBS_FILENAME)
+        return directory
+
+    def load_index(self, directory: str | Path, mmap: bool = True) -> None:
+        """Restore an index written by :meth:`save_index` without re-embedding."""
+        directory = Path(directory)
+        with open(directory / JOBS_FILENAME, encoding="utf-8") as f:
+            jobs = [JobPosting(**entry) for entry in json.load(f)]
+        with self._index_lock.write():
+            self.vector_store.load(directory, mmap=mmap, model_name=self.embedding_generator.model_name)
+            self._catalog.clear()
+            rows = [self.vector_store.get_label(job.job_id) for job in jobs]
+            indexed = [job for job, row in zip(jobs, rows) if row is not None]
+            self._catalog.set_rows([row for row in rows if row is not None], indexed, self._matching_skills(indexed))
+        logger.info("Loaded %d job postings from %s", len(self._catalog), directory)
 
     def recommend_for_resume_text(
         self, 
         resume_text: str, 
         top_k: int = 5,
-        resume_years_experience: float = 0.0
+        resume_years_experience: float = 0.0,
+        filters: JobFilter | None = None,
     ) -> List[Recommendation]:
-        if not self._job_postings:
+        if not len(self._catalog):
             raise RuntimeError("No job postings indexed")
         
-        cleaned_resume = self.text_cleaner.clean(resume_text)
-        
-        resume_embedding = self.embedding_generator.encode([cleaned_resume])
-        retrievals = self.vector_store.search(resume_embedding, k=top_k)[0]#perform similarity search
-        resume_skills = self.skill_extractor.unique_skills(resume_text)
-        
-        return [
-            self._build_recommendation(item, resume_skills, resume_years_experience) 
-            for item in retrievals
-        ]
+        resume = self.preprocessor.process(resume_text, RESUME_FIELDS)
+        return self.recommend_preprocessed(
+            [resume], top_k=top_k, resume_years_experience=[resume_years_experience], filters=filters
+        )[0]
+
+    def recommend_batch(
+        self,
+        resume_texts: Sequence[str],
+        top_k: int = 5,
+        resume_years_experience: Sequence[float] | None = None,
+        filters: JobFilter | None = None,
+    ) -> List[List[Recommendation]]:
+        """Recommend jobs for many resumes with one embedding call and one vector search."""
+        if not len(self._catalog):
+            raise RuntimeError("No job postings indexed")
+        if resume_years_experience is not None and len(resume_years_experience) != len(resume_texts):
+            raise ValueError("Years of experience length mismatch")
+        return self.recommend_preprocessed(
+            self.preprocess(resume_texts, fields=RESUME_FIELDS), top_k=top_k,
+            resume_years_experience=resume_years_experience, filters=filters,
+        )
+
+    def recommend_preprocessed(
+        self,
+        resumes: Sequence[PreprocessedText],
+        top_k: int = 5,
+        resume_years_experience: Sequence[float] | None = None,
+        filters: JobFilter | None = None,
+        embeddings: np.ndarray | None = None,
+    ) -> List[List[Recommendation]]:
+        """Recommend for resumes already run through :meth:`preprocess` (or ``self.preprocessor``).
+
+        Pass ``embeddings`` (from :meth:`embed`, e.g. cached) to skip encoding.
+        """
+        if not len(self._catalog):
+            raise RuntimeError("No job postings indexed")
+        if not resumes:
+            return []
+        if resume_years_experience is None:
+            resume_years_experience = [0.0] * len(resumes)
+        if len(resume_years_experience) != len(resumes):
+            raise ValueError("Years of experience length mismatch")
+
+        if embeddings is not None and len(embeddings) != len(resumes):
+            raise ValueError("Embeddings length mismatch")
+        resume_embeddings = self.embed(resumes) if embeddings is None else embeddings
+        pool_size = top_k * self.rerank_pool_factor
+        with self._index_lock.read():
+            if not len(self._catalog):
+                raise RuntimeError("No job postings indexed")
+            id_filter = self._id_filter(filters)
+            retrievals = self.vector_store.search(resume_embeddings, k=pool_size, id_filter=id_filter)
+            return [
+                self._rerank(hits, resume.skill_ids, years, top_k)
+                for hits, resume, years in zip(retrievals, resumes, resume_years_experience)
+            ]
+
+    def embed(self, resumes: Sequence[PreprocessedText]) -> np.ndarray:
+        # Resume/query vectors are one-offs: only job descriptions go through the embedding cache
+        return self.embedding_generator.encode([resume.cleaned for resume in resumes], use_cache=False)
+
+    def preprocess(self, texts: Sequence[str], fields: AbstractSet[str] = ALL_FIELDS) -> List[PreprocessedText]:
+        """Clean and extract skills/years from ``texts``, across worker processes when configured."""
+        if len(texts) < 2:
+            return self.preprocessor.process_batch(texts, fields)
+        return self.batch_preprocessor.process(texts, fields)
+
+    def close(self) -> None:
+        self.batch_preprocessor.close()
 
     def recommend_for_resume_file(
         self, 
         path: str | Path, 
         top_k: int = 5,
-        resume_years_experience: float = 0.0
+        resume_years_experience: float = 0.0,
+        filters: JobFilter | None = None,
     ) -> List[Recommendation]:
         parser = self.pdf_parser or PDFParser()
         text = parser.extract_text(path)
-        return self.recommend_for_resume_text(text, top_k=top_k, resume_years_experience=resume_years_experience)
+        return self.recommend_for_resume_text(
+            text, top_k=top_k, resume_years_experience=resume_years_experience, filters=filters
+        )
+
+    def _id_filter(self, filters: JobFilter | None) -> np.ndarray | None:
+        if filters is None:
+            return None
+        return self._catalog.select(filters)
+
+    def _rerank(
+        self,
+        retrievals: Sequence[RetrievedItem],
+        resume_skills: Set[int],
+        resume_years: float,
+        top_k: int,
+    ) -> List[Recommendation]:
+        """Score the whole candidate pool with the hybrid formula and keep the best ``top_k``."""
+        if not retrievals:
+            return []
+        rows = np.fromiter((item.idx for item in retrievals), dtype=np.int64, count=len(retrievals))
 
-    def _build_recommendation(
-        self, 
-        item: RetrievedItem, 
-        resume_skills: Iterable[str],
-        resume_years: float
-    ) -> Recommendation:
-        job = self._job_lookup(item.idx)
-        
         # 1. Semantic Score (Cosine Sim)
-        semantic_score = item.score
-        
-        # 2. Skill Overlap Score (Jaccard)
-        job_skills = set(job.skills) if job.skills else set(self.skill_extractor.unique_skills(job.description))
-        resume_skills_set = set(resume_skills)
-        matched_skills = sorted(job_skills.intersection(resume_skills_set))
-        
-        skill_score = 0.0
-        if job_skills:
-            skill_score = len(matched_skills) / len(job_skills)
-            
+        semantic_scores = np.fromiter((item.score for item in retrievals), dtype=np.float64, count=len(retrievals))
+
+        # 2. Skill Overlap Score (matched / required), as popcounts over packed bitsets
+        resume_bits = self._catalog.skill_bitset(resume_skills)
+        matched_bits = self._catalog.skill_bits[rows] & resume_bits
+        matched_counts = np.bitwise_count(matched_bits).sum(axis=1, dtype=np.int64).astype(np.float64)
+        required_counts = self._catalog.skill_counts[rows].astype(np.float64)
+        skill_scores = np.divide(
+            matched_counts, required_counts, out=np.zeros_like(matched_counts), where=required_counts > 0
+        )
+
         # 3. Experience Score
-        exp_score = self._calculate_experience_score(resume_years, job.min_years_experience)
-        
+        exp_scores = self._experience_scores(resume_years, self._catalog.min_years[rows])
+
         # Hybrid Weighted Score
-        # Weights: Semantic=0.6, Skills=0.2, Experience=0.2
-        final_score = (0.6 * semantic_score) + (0.2 * skill_score) + (0.2 * exp_score)
-        
-        return Recommendation(job=job, score=final_score, matched_skills=matched_skills)
+        final_scores = (
+            SEMANTIC_WEIGHT * semantic_scores + SKILL_WEIGHT * skill_scores + EXPERIENCE_WEIGHT * exp_scores
+        )
+        order = np.argsort(-final_scores, kind="stable")[:top_k]
 
-    def _calculate_experience_score(self, resume_years: float, job_min_years: float) -> float:
-        if job_min_years <= 0:
-            return 1.0 # No requirement
-        
-        if resume_years >= job_min_years:
-            return 1.0
-        elif resume_years >= (job_min_years * 0.5):
-            return 0.5
-        else:
-            return 0.0
-
-    def _job_lookup(self, vector_idx: int) -> JobPosting:
-        job_id = self.vector_store.get_payload(vector_idx)
-        for job in self._job_postings:
-            if job.job_id == job_id:
-                return job
-        raise KeyError(f"Job id {job_id} missing from index")
+        return [
+            Recommendation(
+                job=self._job_at(int(rows[i])),
+                score=float(final_scores[i]),
+                matched_skills=sorted(self._catalog.vocabulary.names_in(matched_bits[i])),
+            )
+            for i in order.tolist()
+        ]
+
+    @staticmethod
+    def _experience_scores(resume_years: float, job_min_years: np.ndarray) -> np.ndarray:
+        # No requirement -> 1.0; meets it -> 1.0; at least half -> 0.5; otherwise 0.0
+        return np.where(
+            (job_min_years <= 0) | (resume_years >= job_min_years),
+            1.0,
+            np.where(resume_years >= job_min_years * 0.5, 0.5, 0.0),
+        )
+
+    def _job_at(self, row: int) -> JobPosting:
+        return JobPosting(**self._catalog.record(row))
+
+
+def _with_payloads(
+    embedded: Iterable[np.ndarray], payloads: Sequence[str]
+) -> Iterator[Tuple[Sequence[str], np.ndarray]]:
+    start = 0
+    for embeddings in embedded:
+        yield payloads[start:start + len(embeddings)], embeddings
+        start += len(embeddings)
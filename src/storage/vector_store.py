@@ -1,9 +1,13 @@
 ﻿from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import List, Sequence
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, List, Sequence, Set, Tuple
 
+import json
 import logging
+import os
 import numpy as np
 import faiss 
 
@@ -16,6 +20,29 @@ logger = logging.getLogger(__name__)
 setup_logging()
 
 
+INDEX_FILENAME = "index.faiss"
+ITEMS_FILENAME = "items.json"
+MANIFEST_FILENAME = "manifest.json"
+RESCORE_FILENAME = "vectors.f16.npy"
+_FORMAT_VERSION = 1
+
+INDEX_MODES = ("auto", "flat", "hnsw", "ivf", "sq8", "ivfpq")
+# Modes backed by IndexIVF: they keep external ids natively and mmap inverted lists
+_IVF_MODES = ("ivf", "ivfpq")
+# Lossy modes whose scores benefit from exact re-scoring of the short list
+_COMPRESSED_MODES = ("sq8", "ivfpq")
+# Modes whose index must be trained on a sample before the first add
+_TRAINED_MODES = ("ivf", "ivfpq", "sq8")
+# Vectors buffered from a stream to train those indexes
+TRAIN_SAMPLE_SIZE = 100_000
+# "auto" picks exact search for small corpora and switches to approximate
+# indexes once a linear scan starts to dominate query latency.
+AUTO_HNSW_MIN_VECTORS = 50_000
+AUTO_IVF_MIN_VECTORS = 1_000_000
+# Order "auto" moves through as the corpus grows; it never moves back on removals
+_AUTO_MODES = ("flat", "hnsw", "ivf")
+
+
 @dataclass
 class RetrievedItem:
     idx: int
@@ -25,12 +52,53 @@ class RetrievedItem:
 class VectorStore:
 
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        index_mode: str = "auto",
+        nlist: int | None = None,
+        nprobe: int = 16,
+        hnsw_m: int = 32,
+        ef_construction: int = 200,
+        ef_search: int = 128,
+        pq_m: int = 48,
+        rescore: bool | None = None,
+        rescore_factor: int = 4,
+    ) -> None:
+        if index_mode not in INDEX_MODES:
+            raise ValueError(f"Unknown index mode {index_mode!r}; expected one of {INDEX_MODES}")
+        self._index_mode = index_mode
+        self._nlist = nlist
+        self._nprobe = nprobe
+        self._hnsw_m = hnsw_m
+        self._ef_construction = ef_construction
+        self._ef_search = ef_search
+        self._pq_m = pq_m
+        # Exact re-scoring defaults to on for the lossy modes
+        self._rescore = rescore if rescore is not None else index_mode in _COMPRESSED_MODES
+        self._rescore_factor = max(1, rescore_factor)
+        # float16 copy of every vector by label; memory-mapped after load()
+        self._rescore_vectors: np.ndarray | None = None
+        # Concrete mode of the built index
+        self._active_mode: str | None = None
+        self._active_nlist: int | None = None
+        # Final corpus size announced by add_stream(), so the first chunk builds the right index
+        self._expected_count: int | None = None
         self._index = None
-        self._items: List[str] = []
+        # Payloads are addressed by the int64 label stored in the ID map; a
+        # removed or replaced entry leaves ``None`` behind so labels stay stable.
+        self._items: List[str | None] = []
+        self._labels: Dict[str, int] = {}
+        # Labels still present in indexes that cannot delete (HNSW), hidden at search time
+        self._tombstones: Set[int] = set()
+        self._tombstone_selector = None
         self._dim: int | None = None
         self._use_faiss = faiss is not None
         self._sk_embeddings: np.ndarray | None = None
+        self._built_at: datetime | None = None
+        # Set when the index was opened memory-mapped (read-only) from disk; the
+        # open handle pins that file version even if save() later replaces the path
+        self._mmap_path: Path | None = None
+        self._mmap_file: BinaryIO | None = None
         
         logger.info("VectorStore using FAISS backend")
        
@@ -38,28 +106,263 @@ class VectorStore:
     def reset(self) -> None:
         self._index = None
         self._items = []
+        self._labels = {}
+        self._tombstones = set()
+        self._tombstone_selector = None
         self._dim = None
         self._sk_embeddings = None
+        self._built_at = None
+        self._release_mmap()
+        self._active_mode = None
+        self._active_nlist = None
+        self._rescore_vectors = None
+
+    def add_items(self, embeddings: np.ndarray, payloads: Sequence[str]) -> np.ndarray:
+        return self.upsert(payloads, embeddings)
+
+    def add_stream(
+        self,
+        chunks: Iterable[Tuple[Sequence[str], np.ndarray]],
+        expected_count: int,
+    ) -> np.ndarray:
+        """Upsert ``(job_ids, embeddings)`` chunks as they arrive and return all labels in order.
 
-    def add_items(self, embeddings: np.ndarray, payloads: Sequence[str]) -> None:
+        The index type is chosen for ``expected_count`` rather than the first
+        chunk, and indexes that need training buffer chunks until they hold
+        ``TRAIN_SAMPLE_SIZE`` vectors (or the whole stream, if smaller).
+        """
+        self._expected_count = expected_count
+        try:
+            labels: List[np.ndarray] = []
+            pending_ids: List[str] = []
+            pending: List[np.ndarray] = []
+            buffering = self._index is None and self._resolve_mode(expected_count) in _TRAINED_MODES
+            train_size = min(expected_count, TRAIN_SAMPLE_SIZE)
+            for job_ids, embeddings in chunks:
+                if buffering:
+                    pending_ids.extend(job_ids)
+                    pending.append(embeddings)
+                    if len(pending_ids) < train_size:
+                        continue
+                    job_ids, embeddings = pending_ids, np.vstack(pending)
+                    buffering = False
+                    pending_ids, pending = [], []
+                labels.append(self.upsert(job_ids, embeddings))
+            if pending:
+                labels.append(self.upsert(pending_ids, np.vstack(pending)))
+        finally:
+            self._expected_count = None
+        return np.concatenate(labels) if labels else np.empty(0, dtype=np.int64)
+
+    def upsert(self, job_ids: Sequence[str], embeddings: np.ndarray) -> np.ndarray:
+        """Insert or replace vectors by payload id and return their labels.
+
+        Only the given rows are touched, so the cost is proportional to the
+        change rather than to the size of the index.
+        """
         if embeddings.ndim != 2:
             raise ValueError("Embeddings must be 2D array")
-        if len(payloads) != embeddings.shape[0]:
+        if len(job_ids) != embeddings.shape[0]:
             raise ValueError("Payload length mismatch")
-        
+        if self._dim is not None and self._index is not None and embeddings.shape[1] != self._dim:
+            raise ValueError(f"Embedding dimension {embeddings.shape[1]} does not match index ({self._dim})")
+
+        # Last occurrence wins when an id is repeated within the batch
+        positions = {job_id: pos for pos, job_id in enumerate(job_ids)}
+        if len(positions) != len(job_ids):
+            keep = sorted(positions.values())
+            job_ids = [job_ids[pos] for pos in keep]
+            embeddings = embeddings[keep]
+        if not job_ids:
+            return np.empty(0, dtype=np.int64)
+
+        self._ensure_writable()
         self._dim = embeddings.shape[1]
-        self._items.extend(payloads)
-        
+        self._remove_labels([self._labels[job_id] for job_id in job_ids if job_id in self._labels])
+
+        start = len(self._items)
+        labels = np.arange(start, start + len(job_ids), dtype=np.int64)
+        self._items.extend(job_ids)
+        self._labels.update(zip(job_ids, labels.tolist()))
+
         if self._use_faiss:
-            self._add_with_faiss(embeddings)
-        
+            self._add_with_faiss(embeddings, labels)
+            self._promote_auto_mode()
+        self._built_at = datetime.now(timezone.utc)
+        return labels
+
+    def remove(self, job_ids: Sequence[str]) -> int:
+        """Delete vectors by payload id; unknown ids are ignored."""
+        labels = [self._labels[job_id] for job_id in dict.fromkeys(job_ids) if job_id in self._labels]
+        if not labels:
+            return 0
+        self._ensure_writable()
+        self._remove_labels(labels)
+        self._built_at = datetime.now(timezone.utc)
+        return len(labels)
 
-    def _add_with_faiss(self, embeddings: np.ndarray) -> None:
+    def _remove_labels(self, labels: Sequence[int]) -> None:
+        if not labels:
+            return
+        for label in labels:
+            del self._labels[self._items[label]]
+            self._items[label] = None
+        if self._active_mode == "hnsw":
+            # HNSW graphs do not support deletion; mask the labels instead
+            self._tombstones.update(labels)
+            self._tombstone_selector = None
+        elif self._index is not None:
+            self._index.remove_ids(np.asarray(labels, dtype=np.int64))
+        if self._rescore_vectors is not None:
+            self._rescore_vectors[np.asarray(labels, dtype=np.int64)] = 0
+
+    def _add_with_faiss(self, embeddings: np.ndarray, labels: np.ndarray) -> None:
         assert self._dim is not None
-        if self._index is None:
-            self._index = faiss.IndexFlatIP(self._dim)
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
         faiss.normalize_L2(embeddings)
-        self._index.add(embeddings.astype(np.float32))
+        if self._index is None:
+            index = self._build_index(embeddings)
+            # IVF stores external ids natively; IDMap2 over IVF would desync on
+            # remove_ids because IVF does not renumber its internal ids.
+            self._index = index if self._active_mode in _IVF_MODES else faiss.IndexIDMap2(index)
+        self._index.add_with_ids(embeddings, labels)
+        if self._rescore:
+            self._store_rescore_vectors(embeddings, labels)
+
+    def _store_rescore_vectors(self, embeddings: np.ndarray, labels: np.ndarray) -> None:
+        needed = int(labels.max()) + 1
+        current = self._rescore_vectors
+        if current is None or current.shape[0] < needed:
+            # Grow geometrically so repeated upserts stay amortized O(change)
+            capacity = max(needed, 2 * (current.shape[0] if current is not None else 0))
+            grown = np.zeros((capacity, self._dim), dtype=np.float16)
+            if current is not None:
+                grown[: current.shape[0]] = current
+            self._rescore_vectors = grown
+        self._rescore_vectors[labels] = embeddings.astype(np.float16)
+
+    def _promote_auto_mode(self) -> None:
+        """Rebuild an ``auto`` index whose corpus has outgrown the mode chosen at build time.
+
+        Upserts start from whatever the first batch selected, so a store grown
+        incrementally would otherwise stay flat. The live vectors are read back
+        from the old index chunk by chunk and re-added under their labels; this
+        happens at most once per threshold.
+        """
+        if self._index_mode != "auto" or self._active_mode not in _AUTO_MODES:
+            return
+        mode = self._resolve_mode(len(self._labels))
+        if _AUTO_MODES.index(mode) <= _AUTO_MODES.index(self._active_mode):
+            return
+        logger.info("Corpus grew to %d vectors; rebuilding %s index as %s", len(self._labels), self._active_mode, mode)
+        previous = (self._index, self._active_mode, self._active_nlist, self._tombstones)
+        old_index = self._index
+        labels = np.fromiter(sorted(self._labels.values()), dtype=np.int64, count=len(self._labels))
+        self._index = None
+        expected_count, self._expected_count = self._expected_count, len(labels)
+        try:
+            # The first chunk sizes and trains the new index, as in add_stream()
+            for start in range(0, len(labels), TRAIN_SAMPLE_SIZE):
+                chunk = labels[start:start + TRAIN_SAMPLE_SIZE]
+                self._add_with_faiss(old_index.reconstruct_batch(chunk), chunk)
+        except Exception as exc:
+            # The upsert itself succeeded: keep serving from the old index rather than a half-built one
+            logger.warning("Rebuilding the index as %s failed, keeping %s: %s", mode, previous[1], exc)
+            self._index, self._active_mode, self._active_nlist, self._tombstones = previous
+            return
+        finally:
+            self._expected_count = expected_count
+        self._tombstones = set()
+        self._tombstone_selector = None
+
+    def _resolve_mode(self, n_vectors: int) -> str:
+        if self._index_mode != "auto":
+            return self._index_mode
+        if n_vectors >= AUTO_IVF_MIN_VECTORS:
+            return "ivf"
+        if n_vectors >= AUTO_HNSW_MIN_VECTORS:
+            return "hnsw"
+        return "flat"
+
+    def _build_index(self, embeddings: np.ndarray):
+        """Create (and train, if needed) the index for the first batch of vectors."""
+        assert self._dim is not None
+        n_train = embeddings.shape[0]
+        n_vectors = max(n_train, self._expected_count or 0)
+        mode = self._resolve_mode(n_vectors)
+        if mode == "hnsw":
+            index = faiss.IndexHNSWFlat(self._dim, self._hnsw_m, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = self._ef_construction
+        elif mode in _IVF_MODES:
+            # ~4*sqrt(N) lists, but never more than the training set can support
+            nlist = self._nlist or max(1, min(int(4 * np.sqrt(n_vectors)), n_train // 39))
+            nlist = min(nlist, n_train)
+            quantizer = faiss.IndexFlatIP(self._dim)
+            if mode == "ivfpq":
+                # Sub-quantizer count must divide the dimension; 8 bits per code
+                # needs at least 256 training points, so shrink for tiny corpora.
+                pq_m = max(m for m in range(1, min(self._pq_m, self._dim) + 1) if self._dim % m == 0)
+                nbits = int(min(8, max(1, np.floor(np.log2(n_train)))))
+                index = faiss.IndexIVFPQ(
+                    quantizer, self._dim, nlist, pq_m, nbits, faiss.METRIC_INNER_PRODUCT
+                )
+            else:
+                index = faiss.IndexIVFFlat(quantizer, self._dim, nlist, faiss.METRIC_INNER_PRODUCT)
+            index.train(embeddings)
+            self._active_nlist = nlist
+        elif mode == "sq8":
+            index = faiss.IndexScalarQuantizer(
+                self._dim, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT
+            )
+            index.train(embeddings)
+        else:
+            index = faiss.IndexFlatIP(self._dim)
+        self._active_mode = mode
+        logger.info("Built %s index (%s mode) for %d vectors", type(index).__name__, mode, embeddings.shape[0])
+        return index
+
+    def set_search_params(self, nprobe: int | None = None, ef_search: int | None = None) -> None:
+        """Tune the recall/latency trade-off of approximate indexes at query time."""
+        if nprobe is not None:
+            self._nprobe = nprobe
+        if ef_search is not None:
+            self._ef_search = ef_search
+
+    def _search_params(self, k: int, selector=None, exhaustive: bool = False):
+        # Per-call parameters keep concurrent searches from racing on index state
+        if self._active_mode in _IVF_MODES:
+            nprobe = self._active_nlist if exhaustive and self._active_nlist else self._nprobe
+            return faiss.SearchParametersIVF(nprobe=nprobe, sel=selector)
+        if self._active_mode == "hnsw":
+            ef_search = max(self._ef_search * 8, k * 16) if exhaustive else max(self._ef_search, k)
+            return faiss.SearchParametersHNSW(efSearch=ef_search, sel=selector)
+        if selector is not None:
+            return faiss.SearchParameters(sel=selector)
+        return None
+
+    def _selector(self, id_filter: np.ndarray | None):
+        """Combine a caller's label mask with the tombstone mask into one IDSelector.
+
+        Returns the selector and the objects that must outlive the search call.
+        """
+        deleted = self._deleted_selector()
+        if id_filter is None:
+            return deleted, []
+        bitmap = np.packbits(np.asarray(id_filter, dtype=bool), bitorder="little")
+        allowed = faiss.IDSelectorBitmap(bitmap)
+        if deleted is None:
+            return allowed, [bitmap]
+        return faiss.IDSelectorAnd(allowed, deleted), [bitmap, allowed]
+
+    def _deleted_selector(self):
+        if not self._tombstones:
+            return None
+        if self._tombstone_selector is None:
+            deleted = faiss.IDSelectorBatch(np.fromiter(self._tombstones, dtype=np.int64))
+            self._tombstone_selector = faiss.IDSelectorNot(deleted)
+            # IDSelectorNot does not own its argument
+            self._tombstone_selector.referenced_objects = [deleted]
+        return self._tombstone_selector
 
     # def _add_with_sklearn(self, embeddings: np.ndarray) -> None:
     #     new_embeddings = embeddings.astype(np.float32)
@@ -71,33 +374,263 @@ class VectorStore:
     #         self._index = NearestNeighbors(metric="cosine")
     #     self._index.fit(self._sk_embeddings)
 
-    def search(self, query_embeddings: np.ndarray, k: int = 5) -> List[List[RetrievedItem]]:
+    def search(
+        self, query_embeddings: np.ndarray, k: int = 5, id_filter: np.ndarray | None = None
+    ) -> List[List[RetrievedItem]]:
+        """Return the ``k`` nearest items per query row.
+
+        ``id_filter`` is an optional boolean mask over labels; only labels set in
+        the mask are considered, inside the index scan rather than afterwards.
+        """
         if self._index is None:
             raise RuntimeError("Vector index is empty; call add_items first")
+        query_embeddings = query_embeddings.astype(np.float32)
+        if id_filter is not None and not id_filter.any():
+            return [[] for _ in range(query_embeddings.shape[0])]
+
         if self._use_faiss:
-            scores, indices = self._index.search(query_embeddings.astype(np.float32), k)
+            # Lossy indexes over-fetch a short list that is re-ranked exactly below
+            fetch_k = k * self._rescore_factor if self._rescore_vectors is not None else k
+            selector, _keepalive = self._selector(id_filter)
+            scores, indices = self._index.search(
+                query_embeddings, fetch_k, params=self._search_params(fetch_k, selector)
+            )
+            if id_filter is not None and self._active_mode != "flat":
+                # A selective filter can leave approximate probes short of k hits;
+                # widen the search once so filtered queries still fill top_k.
+                expected = min(k, int(np.count_nonzero(id_filter)))
+                if (indices != -1).sum(axis=1).min() < expected:
+                    scores, indices = self._index.search(
+                        query_embeddings, fetch_k, params=self._search_params(fetch_k, selector, exhaustive=True)
+                    )
+            if self._rescore_vectors is not None:
+                scores, indices = self._rescore_candidates(query_embeddings, indices, k)
      
         return [
             [RetrievedItem(idx=int(idx), score=float(score)) for idx, score in zip(idx_row, score_row) if idx != -1]
             for idx_row, score_row in zip(indices, scores)
         ]
 
+    def _rescore_candidates(self, queries: np.ndarray, indices: np.ndarray, k: int):
+        """Re-rank candidate labels with exact inner products from the float16 copy."""
+        valid = indices != -1
+        candidates = np.where(valid, indices, 0)
+        vectors = self._rescore_vectors[candidates.ravel()].astype(np.float32)
+        vectors = vectors.reshape(indices.shape[0], indices.shape[1], -1)
+        exact = np.einsum("qcd,qd->qc", vectors, queries)
+        exact[~valid] = -np.inf
+        order = np.argsort(-exact, axis=1, kind="stable")[:, :k]
+        top_indices = np.take_along_axis(indices, order, axis=1)
+        top_scores = np.take_along_axis(exact, order, axis=1)
+        return top_scores, np.where(np.isfinite(top_scores), top_indices, -1)
+
+    @property
+    def label_count(self) -> int:
+        """Size of the label space (live, replaced and removed labels)."""
+        return len(self._items)
+
     def get_payload(self, idx: int) -> str:
-        return self._items[idx]
+        payload = self._items[idx]
+        if payload is None:
+            raise KeyError(f"Vector {idx} has been removed")
+        return payload
+
+    def get_label(self, job_id: str) -> int | None:
+        return self._labels.get(job_id)
+
+    def __contains__(self, job_id: object) -> bool:
+        return job_id in self._labels
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    @property
+    def built_at(self) -> datetime | None:
+        return self._built_at
+
+    def save(self, directory: str | Path, model_name: str | None = None) -> Path:
+        """Write the index, payloads and a manifest into ``directory``.
+
+        Files are written to temporary names and swapped in with ``os.replace`` so
+        that processes which currently have the old index memory-mapped keep a
+        valid view until they reload.
+        """
+        if self._index is None:
+            raise RuntimeError("Vector index is empty; nothing to save")
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        manifest = {
+            "format_version": _FORMAT_VERSION,
+            "model_name": model_name,
+            "dimension": self._dim,
+            "vector_count": len(self._labels),
+            "index_type": self._index_type_name(),
+            "index_mode": self._active_mode,
+            "nlist": self._active_nlist,
+            "rescore": self._rescore_vectors is not None,
+            "built_at": _isoformat(self._built_at),
+            "saved_at": _isoformat(datetime.now(timezone.utc)),
+        }
+
+        index_tmp = directory / (INDEX_FILENAME + ".tmp")
+        faiss.write_index(self._index, str(index_tmp))
+        _write_json(directory / (ITEMS_FILENAME + ".tmp"), self._items)
+        names = [INDEX_FILENAME, ITEMS_FILENAME]
+        if self._rescore_vectors is not None:
+            with open(directory / (RESCORE_FILENAME + ".tmp"), "wb") as f:
+                np.save(f, self._rescore_vectors[: len(self._items)])
+            names.append(RESCORE_FILENAME)
+        _write_json(directory / (MANIFEST_FILENAME + ".tmp"), manifest)
+        names.append(MANIFEST_FILENAME)
+
+        # Manifest goes last: its presence marks a complete index on disk
+        for name in names:
+            os.replace(directory / (name + ".tmp"), directory / name)
+
+        logger.info("Saved %d vectors to %s", len(self._labels), directory)
+        return directory
+
+    def load(self, directory: str | Path, mmap: bool = True, model_name: str | None = None) -> dict:
+        """Load an index previously written by :meth:`save` and return its manifest.
+
+        With ``mmap=True`` the FAISS vectors are mapped read-only from disk, so
+        several worker processes share the same pages. The index is copied into
+        memory automatically before the first write.
+        """
+        directory = Path(directory)
+        manifest_path = directory / MANIFEST_FILENAME
+        if not manifest_path.exists():
+            raise FileNotFoundError(manifest_path)
+
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        if manifest.get("format_version") != _FORMAT_VERSION:
+            raise ValueError(f"Unsupported index format version: {manifest.get('format_version')}")
+        if model_name and manifest.get("model_name") and manifest["model_name"] != model_name:
+            raise ValueError(
+                f"Index at {directory} was built with {manifest['model_name']}, not {model_name}"
+            )
+
+        index_path = directory / INDEX_FILENAME
+        active_mode = manifest.get("index_mode") or "flat"
+        flags = 0
+        if mmap:
+            # IVF maps its inverted lists; flat and HNSW map their flat code arrays
+            flags = faiss.IO_FLAG_MMAP if active_mode in _IVF_MODES else faiss.IO_FLAG_MMAP_IFC
+        self._release_mmap()
+        mmap_file = open(index_path, "rb") if mmap else None
+        try:
+            self._index = faiss.read_index(str(index_path), flags)
+        except Exception:
+            if mmap_file is not None:
+                mmap_file.close()
+            raise
+        self._items = json.loads((directory / ITEMS_FILENAME).read_text(encoding="utf-8"))
+        self._dim = manifest["dimension"]
+        self._active_mode = active_mode
+        self._active_nlist = manifest.get("nlist")
+        self._rescore_vectors = None
+        if manifest.get("rescore"):
+            self._rescore = True
+            self._rescore_vectors = np.load(directory / RESCORE_FILENAME, mmap_mode="r" if mmap else None)
+        self._built_at = _parse_datetime(manifest.get("built_at"))
+        self._mmap_path = index_path if mmap else None
+        self._mmap_file = mmap_file
+        self._labels = {job_id: label for label, job_id in enumerate(self._items) if job_id is not None}
+        self._tombstones = set()
+        self._tombstone_selector = None
+        if active_mode == "hnsw":
+            self._tombstones = {label for label, job_id in enumerate(self._items) if job_id is None}
+
+        if self._index.ntotal != len(self._labels) + len(self._tombstones):
+            self.reset()
+            raise ValueError(f"Index at {directory} is inconsistent: vector and payload counts differ")
+
+        logger.info(
+            "Loaded %d vectors from %s (%s)", len(self._labels), directory, "mmap" if mmap else "in-memory"
+        )
+        return manifest
+
+    def _ensure_writable(self) -> None:
+        # FAISS aborts the process when a memory-mapped index is resized, so
+        # read a private in-memory copy before the first mutation. It is read
+        # through the handle opened at load time: the path may since have been
+        # replaced by another process's save(), which would not match _items.
+        # (clone_index keeps viewing the mapped arrays, so it cannot be used.)
+        if self._mmap_file is None:
+            return
+        self._mmap_file.seek(0)
+        self._index = faiss.read_index(faiss.PyCallbackIOReader(self._mmap_file.read))
+        self._release_mmap()
+        if self._rescore_vectors is not None:
+            self._rescore_vectors = np.array(self._rescore_vectors)
+
+    def _release_mmap(self) -> None:
+        if self._mmap_file is not None:
+            self._mmap_file.close()
+        self._mmap_file = None
+        self._mmap_path = None
+
+    def _index_type_name(self) -> str | None:
+        if self._index is None:
+            return None
+        index = self._index
+        if isinstance(index, faiss.IndexIDMap2):
+            index = faiss.downcast_index(index.index)
+        return type(index).__name__
+
+    def _bytes_per_vector(self) -> int | None:
+        if self._index is None:
+            return None
+        index = self._index
+        if isinstance(index, faiss.IndexIDMap2):
+            index = faiss.downcast_index(index.index)
+        try:
+            return int(index.sa_code_size())
+        except RuntimeError:
+            # HNSW has no standalone codec; report its flat storage instead
+            return self._dim * 4 if self._active_mode == "hnsw" else None
 
     def get_status(self) -> dict:
         """Get status information about the vector store"""
         index_type = None
         if self._index is not None:
             if self._use_faiss:
-                index_type = type(self._index).__name__
+                index_type = self._index_type_name()
             else:
                 index_type = "sklearn NearestNeighbors"
         
         return {
-            "vector_count": len(self._items),
+            "vector_count": len(self._labels),
+            "deleted_count": len(self._tombstones),
             "dimension": self._dim,
             "index_type": index_type,
+            "index_mode": self._active_mode,
+            "configured_mode": self._index_mode,
+            "nlist": self._active_nlist,
+            "nprobe": self._nprobe if self._active_mode in _IVF_MODES else None,
+            "ef_search": self._ef_search if self._active_mode == "hnsw" else None,
+            "bytes_per_vector": self._bytes_per_vector(),
+            "rescore": self._rescore_vectors is not None,
             "is_initialized": self._index is not None,
-            "backend": "FAISS" if self._use_faiss else "sklearn"
-        }
\ No newline at end of file
+            "backend": "FAISS" if self._use_faiss else "sklearn",
+            "memory_mapped": self._mmap_path is not None,
+            "built_at": _isoformat(self._built_at),
+        }
+
+
+def _write_json(path: Path, data: object) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def _isoformat(value: datetime | None) -> str | None:
+    if value is None:
+        return None
+    return value.isoformat().replace("+00:00", "Z")
+
+
+def _parse_datetime(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
\ No newline at end of file
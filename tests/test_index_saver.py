@@ -0,0 +1,42 @@
+import threading
+
+import pytest
+
+from src.backend.services.index_saver import IndexSaver
+
+
+def test_index_saver_batches_changes_into_one_save():
+    saved = threading.Event()
+    calls = []
+    saver = IndexSaver(lambda: calls.append(1) or saved.set(), delay_s=0.05)
+    for _ in range(5):
+        saver.mark_dirty()
+    assert not calls
+    assert saved.wait(5)
+    assert calls == [1]
+    assert saver.get_stats()["dirty"] is False
+    assert not saver.flush()
+
+
+def test_index_saver_flush_saves_pending_changes_now():
+    calls = []
+    saver = IndexSaver(lambda: calls.append(1), delay_s=60)
+    saver.mark_dirty()
+    assert saver.flush() and calls == [1]
+    # The timer was cancelled: nothing left to save
+    assert not saver.flush() and calls == [1]
+
+    immediate = IndexSaver(lambda: calls.append(2), delay_s=0)
+    immediate.mark_dirty()
+    assert calls == [1, 2]
+
+
+def test_index_saver_keeps_changes_after_a_failed_save():
+    def fail():
+        raise OSError("disk full")
+
+    saver = IndexSaver(fail, delay_s=60)
+    saver.mark_dirty()
+    with pytest.raises(OSError):
+        saver.flush()
+    assert saver.get_stats()["dirty"] is True
@@ -0,0 +1,121 @@
+import asyncio
+import io
+import time
+
+import pytest
+
+from src.ocr.pdf_parser import PDFEngine, PDFParser, PDFTimeoutError, PDFTooLargeError, PdfplumberEngine, looks_garbled
+
+
+def make_pdf(pages):
+    """Minimal born-digital PDF with one line of Helvetica text per page."""
+    count = len(pages)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % (4 + 2 * i) for i in range(count)) + b"] /Count %d >>" % count,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i, text in enumerate(pages):
+        stream = b"BT /F1 12 Tf 72 720 Td (" + text.encode("latin-1") + b") Tj ET"
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (5 + 2 * i)
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def test_pdf_parser_reads_bytes_streams_and_paths(tmp_path):
+    data = make_pdf(["Python developer", "Kubernetes and SQL"])
+    path = tmp_path / "resume.pdf"
+    path.write_bytes(data)
+    parser = PDFParser()
+    expected = "Python developer\nKubernetes and SQL"
+    assert parser.extract_text_from_bytes(data) == expected
+    assert parser.extract_text(io.BytesIO(data)) == expected
+    assert parser.extract_text(path) == expected
+
+
+def test_pdf_parser_rejects_oversized_documents():
+    data = make_pdf(["one", "two", "three"])
+    with pytest.raises(PDFTooLargeError):
+        PDFParser(max_bytes=len(data) - 1).extract_text(data)
+    with pytest.raises(PDFTooLargeError):
+        PDFParser(max_pages=2).extract_text(io.BytesIO(data))
+    assert PDFParser(max_bytes=len(data), max_pages=3).extract_text(data) == "one\ntwo\nthree"
+
+
+def test_pdf_parser_worker_pool_keeps_order_and_reports_failures():
+    documents = [make_pdf([f"resume {i}"]) for i in range(4)] + [make_pdf(["a", "b", "c"])]
+    parser = PDFParser(max_pages=2, workers=2, timeout=30, max_tasks_per_child=2)
+    try:
+        results = asyncio.run(parser.extract_many(documents))
+    finally:
+        parser.close()
+    assert results[:4] == [f"resume {i}" for i in range(4)]
+    assert isinstance(results[4], PDFTooLargeError)
+
+
+def test_pdf_parser_async_timeout(monkeypatch):
+    parser = PDFParser(timeout=0.05)
+    monkeypatch.setattr(parser, "extract_text", lambda source: time.sleep(0.5) or "late")
+    with pytest.raises(PDFTimeoutError):
+        asyncio.run(parser.extract_text_async(b"%PDF"))
+
+
+def test_pdf_parser_engines_agree_and_auto_falls_back(monkeypatch):
+    data = make_pdf(["Senior data engineer with Python, Spark and Kubernetes since 2015"])
+    expected = "Senior data engineer with Python, Spark and Kubernetes since 2015"
+    assert PDFParser(engine="pypdf").extract_text(data) == expected
+    assert PDFParser(engine="pdfplumber").extract_text(data) == expected
+
+    used = []
+    original = PdfplumberEngine.iter_pages
+    monkeypatch.setattr(
+        PdfplumberEngine, "iter_pages", lambda self, *args: used.append(1) or original(self, *args)
+    )
+    assert PDFParser().extract_text(data) == expected
+    assert not used
+    # Too little text per page (e.g. a scan) sends the document to pdfplumber
+    assert PDFParser().extract_text(make_pdf(["CV"])) == "CV"
+    assert used
+
+
+def test_looks_garbled():
+    assert looks_garbled("", 1)
+    assert looks_garbled("(cid:3)(cid:17)(cid:42) " * 20, 1)
+    assert looks_garbled("SeniordataengineerwithPythonSparkandKubernetessince2015", 1)
+    assert not looks_garbled("Senior data engineer with Python, Spark and Kubernetes since 2015", 1)
+
+
+@pytest.mark.parametrize("engine", ["pypdf", "pdfplumber"])
+def test_pdf_parser_iter_pages_stops_early(engine):
+    data = make_pdf([f"Page {i} lists Python, SQL and Airflow work" for i in range(5)])
+    parser = PDFParser(engine=engine)
+    assert len(list(parser.iter_pages(data))) == 5
+    assert list(parser.iter_pages(data, stop_after_pages=2)) == [
+        "Page 0 lists Python, SQL and Airflow work",
+        "Page 1 lists Python, SQL and Airflow work",
+    ]
+    # The page that crosses the character budget is kept whole
+    assert len(list(parser.iter_pages(data, stop_after_chars=50))) == 2
+    assert PDFParser(engine=engine, stop_after_pages=1).extract_text(data) == "Page 0 lists Python, SQL and Airflow work"
+
+
+def test_pdf_engine_without_iter_pages_cannot_be_instantiated():
+    class Incomplete(PDFEngine):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
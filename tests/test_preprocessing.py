@@ -1,5 +1,16 @@
-﻿from src.preprocessing.text_cleaner import TextCleaner
+﻿import multiprocessing
+import threading
+from datetime import date
+
+import pytest
+
+from src.preprocessing.text_cleaner import TextCleaner
+from src.preprocessing.batch import BatchPreprocessor
+from src.preprocessing.experience_extractor import ExperienceExtractor
+from src.preprocessing.pipeline import POSTING_FIELDS, RESUME_FIELDS, TextPreprocessor
 from src.preprocessing.skill_extractor import SkillExtractor
+from src.preprocessing.skill_taxonomy import SkillTaxonomy
+from src.preprocessing.skill_vocabulary import SkillVocabulary
 
 def test_text_cleaner_removes_noise():
     cleaner = TextCleaner(stopwords={"and"})
@@ -15,3 +26,107 @@ def test_skill_extractor_matches_multiple_occurrences():
     skills = {m.skill.lower(): m.occurrences for m in matches}
     assert skills["python"] == 2
     assert skills["docker"] == 1
+
+def test_skill_extractor_tolerates_punctuation_and_prefers_longest_match():
+    extractor = SkillExtractor(skills=["c++", "c#", "c", "next.js", "vue", "spring boot", "react", "react pattern", "a/b testing"])
+    text = "C++/C# engineer: Next.js, Vue.js, spring-boot and spring_boot; the ReAct pattern; A/B testing in B.C."
+    skills = {m.skill: m.occurrences for m in extractor.extract(text)}
+    assert skills == {
+        "c++": 1, "c#": 1, "next.js": 1, "vue": 1, "spring boot": 2, "react pattern": 1, "a/b testing": 1,
+    }
+
+
+def test_skill_vocabulary_bitsets_roundtrip():
+    vocabulary = SkillVocabulary(["python", "docker", "sql"])
+    job_bits = vocabulary.bitset(["Python", "SQL", "dbt"])  # "dbt" gets a new id
+    resume_bits = vocabulary.bitset(["python", "dbt", "rust"], add=False)
+    assert len(vocabulary) == 4
+    assert vocabulary.names_in(job_bits & resume_bits) == ["python", "dbt"]
+
+
+def test_skill_taxonomy_maps_aliases_to_canonical_ids():
+    extractor = SkillExtractor()
+    taxonomy = extractor.taxonomy
+    text = "Golang services, large language models with retrieval augmented generation, site reliability engineering"
+    assert extractor.skill_ids(text) == {taxonomy.id_of(skill) for skill in ("go", "llm", "rag", "sre")}
+    assert extractor.unique_skills("Go and golang") == {"go"}
+
+    vocabulary = SkillVocabulary()
+    assert vocabulary.id_of("GoLang") == taxonomy.id_of("go")
+    job_bits = vocabulary.bitset(["golang", "LLM"])
+    assert vocabulary.names_in(job_bits & vocabulary.bitset_of_ids(extractor.skill_ids(text))) == ["go", "llm"]
+
+
+def test_skill_taxonomy_rejects_alias_shared_by_two_skills():
+    with pytest.raises(ValueError):
+        SkillTaxonomy([{"name": "go", "aliases": ["golang"]}, {"name": "golang"}])
+
+
+def test_text_preprocessor_matches_separate_components():
+    cleaner = TextCleaner(stopwords={"on", "with"})
+    extractor = SkillExtractor()
+    preprocessor = TextPreprocessor(cleaner, extractor)
+    text = "Remote Ruby on Rails role with Golang; 3+ years required. I have 6 years of experience. Mail a@b.com"
+    result = preprocessor.process(text)
+    assert result.cleaned == cleaner.clean(text)
+    assert result.skill_ids == extractor.skill_ids(text)
+    assert result.skills == ["go", "ruby on rails"]
+    assert result.years_experience == 6.0
+    assert result.min_years == 3.0
+    assert result.environment == ["remote"]
+    assert preprocessor.process_batch([text, ""])[1].cleaned == ""
+
+    # Unrequested fields are skipped and keep their defaults
+    resume = preprocessor.process(text, RESUME_FIELDS)
+    assert (resume.years_experience, resume.min_years, resume.environment) == (6.0, 0.0, ["remote"])
+    bare = preprocessor.process(text, frozenset())
+    assert (bare.cleaned, bare.skills) == (result.cleaned, result.skills)
+    assert (bare.years_experience, bare.min_years, bare.environment) == (0.0, 0.0, [])
+
+
+def test_batch_preprocessor_streams_in_order_across_workers():
+    texts = [f"Job {i}: {'Python' if i % 2 else 'Golang'} engineer, {i % 7} years of experience" for i in range(50)]
+    expected = TextPreprocessor().process_batch(texts)
+    with BatchPreprocessor(workers=2, chunk_size=4) as batch:
+        assert batch.process(texts) == expected
+        assert batch.process(texts, POSTING_FIELDS) == TextPreprocessor().process_batch(texts, POSTING_FIELDS)
+        records = [{"id": i, "text": text} for i, text in enumerate(texts)]
+        enriched = list(batch.iter_enriched(iter(records), lambda record: record["text"]))
+    assert [record["id"] for record, _ in enriched] == list(range(50))
+    assert [result for _, result in enriched] == expected
+
+
+def test_batch_preprocessor_workers_start_safely_from_a_threaded_process():
+    # A live thread holding a lock is what makes forking a threaded server unsafe
+    held, locked, stop = threading.Lock(), threading.Event(), threading.Event()
+
+    def hold():
+        with held:
+            locked.set()
+            stop.wait(30)
+
+    background = threading.Thread(target=hold, daemon=True)
+    background.start()
+    assert locked.wait(5)
+    texts = [f"Senior Python engineer, {i} years of experience" for i in range(8)]
+    try:
+        with BatchPreprocessor(workers=2, chunk_size=2) as batch:
+            assert batch.process(texts) == TextPreprocessor().process_batch(texts)
+            if "forkserver" in multiprocessing.get_all_start_methods():
+                assert batch._pool._mp_context.get_start_method() == "forkserver"
+    finally:
+        stop.set()
+        background.join()
+
+
+def test_experience_extractor_merges_employment_date_ranges():
+    extractor = ExperienceExtractor(today=date(2026, 10, 18))
+    resume = (
+        "Senior Engineer, Acme (Jan 2018 – Present)\n"
+        "Consultant, Beta: 03/2016 - Mar 2019\n"  # overlaps the Acme role by 15 months
+        "Intern 2014 to 2015; phone 555-2012-2013"
+    )
+    assert extractor.employment_intervals(resume) == [(2014 * 12, 2015 * 12), (2016 * 12 + 2, 2026 * 12 + 10)]
+    assert extractor.extract_years(resume) == round(1 + 128 / 12, 1)
+    assert extractor.extract_years_batch(["12+ years of experience, 2020 - 2021", "No dates here"]) == [12.0, 0.0]
+    assert extractor.min_required_years("Requires 5-7 years with Python") == 5.0
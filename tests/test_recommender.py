@@ -1,5 +1,13 @@
-﻿from src.embeddings.text_embedder import TextEmbedder
+﻿import threading
+import time
+
+import numpy as np
+
+from src.embeddings.text_embedder import TextEmbedder
+from src.recommender.catalog import JobCatalog
+from src.recommender.filters import JobFilter, JobFilterIndex
 from src.recommender.recommender import JobPosting, ResumeRecommender
+from src.storage.vector_store import VectorStore
 
 def test_recommender_returns_ranked_jobs():
     jobs = [
@@ -11,3 +19,138 @@ def test_recommender_returns_ranked_jobs():
     recs = recommender.recommend_for_resume_text("Experienced with Python, AWS, and ML pipelines", top_k=1)
     assert recs[0].job.job_id == "1"
     assert "python" in recs[0].matched_skills or "aws" in recs[0].matched_skills
+
+
+def test_recommend_batch_matches_single_queries():
+    jobs = [
+        JobPosting(job_id="1", title="ML Engineer", description="python sklearn aws"),
+        JobPosting(job_id="2", title="Frontend Developer", description="react javascript css"),
+    ]
+    recommender = ResumeRecommender(embedding_generator=TextEmbedder())
+    recommender.index_jobs(jobs)
+    resumes = ["Experienced with Python, AWS, and ML pipelines", "React and CSS frontend work"]
+    batch = recommender.recommend_batch(resumes, top_k=1, resume_years_experience=[3.0, 0.0])
+    assert [recs[0].job.job_id for recs in batch] == ["1", "2"]
+    single = recommender.recommend_for_resume_text(resumes[0], top_k=1, resume_years_experience=3.0)
+    assert batch[0][0].score == single[0].score
+    assert recommender.recommend_batch([], top_k=1) == []
+
+
+def test_job_filter_index_selects_matching_labels():
+    jobs = [
+        JobPosting(job_id="1", title="Data Engineer", description="", location="Toronto, Ontario", tags=["remote"]),
+        JobPosting(job_id="2", title="Data Engineer", description="", location="Toronto, Ontario", tags=["hybrid"]),
+        JobPosting(job_id="3", title="Data Engineer", description="", location="Vancouver, BC", tags=["Remote"]),
+    ]
+    index = JobFilterIndex()
+    for label, job in enumerate(jobs):
+        index.add(label, job)
+
+    mask = index.select(JobFilter(location="toronto", tags=["remote"]), n_labels=3)
+    assert mask.tolist() == [True, False, False]
+
+    index.remove(0)
+    assert not index.select(JobFilter(location="Toronto", tags=["remote"]), n_labels=3).any()
+    assert index.select(JobFilter(), n_labels=3) is None
+
+
+def test_job_catalog_rows_follow_vector_labels():
+    catalog = JobCatalog()
+    catalog.set_rows([0, 1], [
+        JobPosting(job_id="a", title="Data Engineer", description="", location="Toronto", min_years_experience=3),
+        JobPosting(job_id="b", title="Analyst", description="", location="Toronto"),
+    ])
+    # An upsert moves job "a" to a new label; its old row is retired
+    catalog.set_rows([2], [JobPosting(job_id="a", title="Senior Data Engineer", description="", location="Toronto")])
+
+    assert len(catalog) == 2
+    assert catalog.row_of("a") == 2
+    assert catalog.record(2)["title"] == "Senior Data Engineer"
+    assert catalog.alive.tolist() == [False, True, True]
+    assert catalog.select(JobFilter(location="toronto")).tolist() == [False, True, True]
+    assert catalog.record(0 + 1)["location"] is catalog.record(2)["location"]
+
+
+def test_experience_scores_are_vectorized():
+    job_min_years = np.array([0.0, 2.0, 6.0, 10.0])
+    scores = ResumeRecommender._experience_scores(4.0, job_min_years)
+    assert scores.tolist() == [1.0, 1.0, 0.5, 0.0]
+
+
+def test_recommender_keeps_configured_empty_vector_store():
+    store = VectorStore(index_mode="hnsw")
+    recommender = ResumeRecommender(embedding_generator=TextEmbedder(), vector_store=store)
+    assert recommender.vector_store is store
+
+
+class _KeywordEmbedder:
+    """Fixed unit vectors by keyword, so cosine ranks are known exactly."""
+
+    model_name = "keyword-test"
+    VECTORS = {
+        "resume": [1.0, 0.0, 0.0],
+        "gardening": [1.0, 0.0, 0.0],
+        "python": [0.8, 0.6, 0.0],
+        "filler": [0.5, 0.0, 0.75 ** 0.5],
+    }
+
+    def encode(self, texts, use_cache=True):
+        return np.array(
+            [next(v for key, v in self.VECTORS.items() if key in text) for text in texts], dtype=np.float32
+        )
+
+
+def test_rerank_promotes_pool_candidates_before_truncating():
+    jobs = [
+        JobPosting(job_id="cosine-best", title="Gardener", description="gardening"),
+        JobPosting(job_id="skills-match", title="Data Engineer", description="python sql spark"),
+    ] + [JobPosting(job_id=f"filler-{i}", title="Clerk", description=f"filler {i}") for i in range(5)]
+    resume = "resume python sql spark"
+
+    # Cosine alone puts "cosine-best" first; the hybrid score (skills) prefers "skills-match"
+    recommender = ResumeRecommender(embedding_generator=_KeywordEmbedder(), rerank_pool_factor=1)
+    recommender.index_jobs(jobs)
+    assert [rec.job.job_id for rec in recommender.recommend_for_resume_text(resume, top_k=1)] == ["cosine-best"]
+
+    # With an over-fetched pool the second cosine hit is re-ranked into the top-1
+    recommender = ResumeRecommender(embedding_generator=_KeywordEmbedder(), rerank_pool_factor=10)
+    recommender.index_jobs(jobs)
+    top1 = recommender.recommend_for_resume_text(resume, top_k=1)
+    assert [rec.job.job_id for rec in top1] == ["skills-match"]
+    assert top1[0].matched_skills == ["python", "spark", "sql"]
+
+    # top_k truncates the re-ranked pool, not the cosine order
+    top3 = recommender.recommend_for_resume_text(resume, top_k=3)
+    assert [rec.job.job_id for rec in top3[:2]] == ["skills-match", "cosine-best"]
+    assert len(top3) == 3 and top3[2].job.job_id.startswith("filler-")
+    assert [rec.score for rec in top3] == sorted((rec.score for rec in top3), reverse=True)
+
+
+class _SlowUpsertStore(VectorStore):
+    """Pauses after the vectors are added, before the recommender updates its catalog."""
+
+    def __init__(self):
+        super().__init__(index_mode="flat")
+        self.upserted = threading.Event()
+
+    def upsert(self, job_ids, embeddings):
+        labels = super().upsert(job_ids, embeddings)
+        self.upserted.set()
+        time.sleep(0.2)
+        return labels
+
+
+def test_search_waits_for_concurrent_upsert():
+    store = _SlowUpsertStore()
+    recommender = ResumeRecommender(embedding_generator=_KeywordEmbedder(), vector_store=store)
+    recommender.index_jobs([JobPosting(job_id="gardener", title="Gardener", description="gardening")])
+    writer = threading.Thread(
+        target=recommender.add_jobs,
+        args=([JobPosting(job_id="engineer", title="Data Engineer", description="python sql")],),
+    )
+    writer.start()
+    assert store.upserted.wait(5)
+    # The new label is in the vector store but not yet in the catalog; the search must not see that
+    recs = recommender.recommend_for_resume_text("resume python", top_k=2)
+    writer.join()
+    assert {rec.job.job_id for rec in recs} == {"gardener", "engineer"}
@@ -0,0 +1,107 @@
+import numpy as np
+from pymongo.errors import BulkWriteError
+
+from src.backend.services.resume_cache import DIGEST_FIELD, ParsedResume, ParsedResumeCache
+from src.preprocessing.pipeline import PreprocessedText
+
+
+class FakeCandidates:
+    """Just enough of a pymongo collection for the cache's lookups."""
+
+    def __init__(self):
+        self.documents = []
+        self.indexes = {}
+        # Set to make the next bulk_write lose an insert race to another request
+        self.racing_insert = None
+
+    def create_index(self, field, **options):
+        self.indexes[field] = options
+
+    def bulk_write(self, requests, ordered=True):
+        if self.racing_insert is not None:
+            self.insert(self.racing_insert)
+            self.racing_insert = None
+            raise BulkWriteError({"writeErrors": [{"code": 11000}]})
+        for request in requests:
+            if not any(doc.get(DIGEST_FIELD) == request._filter[DIGEST_FIELD] for doc in self.documents):
+                self.insert({**request._filter, **request._doc["$setOnInsert"]})
+
+    def insert(self, document):
+        self.documents.append(dict(document, _id=f"id{len(self.documents)}"))
+
+    def update_many(self, query, update):
+        for doc in self.documents:
+            if doc.get(DIGEST_FIELD) == query[DIGEST_FIELD]:
+                doc.update(update["$set"])
+
+    def find(self, query, projection=None):
+        digests = set(query[DIGEST_FIELD]["$in"])
+        return [doc for doc in self.documents if doc.get(DIGEST_FIELD) in digests]
+
+
+def make_entry(data: bytes, candidate_id: str = "") -> ParsedResume:
+    return ParsedResume(
+        digest=ParsedResumeCache.key(data),
+        candidate_id=candidate_id,
+        text="Python and SQL",
+        resume=PreprocessedText(cleaned="python sql", skill_ids={1, 2}, skills=["python", "sql"], years_experience=3.0),
+        embedding=np.arange(4, dtype=np.float32),
+    )
+
+
+def test_resume_cache_evicts_least_recently_used():
+    cache = ParsedResumeCache(max_entries=2)
+    a, b, c = (make_entry(data) for data in (b"a", b"b", b"c"))
+    cache.put(a)
+    cache.put(b)
+    assert cache.get(a.digest) is a  # a is now the most recent
+    cache.put(c)
+    assert cache.get(b.digest) is None
+    assert cache.get(a.digest) is a and cache.get(c.digest) is c
+    assert cache.stats() == {"entries": 2, "hits": 3, "misses": 1}
+
+
+def test_resume_cache_round_trips_through_candidate_documents():
+    candidates = FakeCandidates()
+    writer = ParsedResumeCache(collection=lambda: candidates, embedding_model="m1", taxonomy_version=1)
+    entry = make_entry(b"%PDF resume")
+    candidates.insert({"raw_text": entry.text, **writer.document_fields(entry)})
+
+    # A fresh process finds it in Mongo and reuses the candidate id
+    loaded = ParsedResumeCache(collection=lambda: candidates, embedding_model="m1", taxonomy_version=1).get(entry.digest)
+    assert loaded.candidate_id == "id0"
+    assert loaded.resume.skill_ids == {1, 2} and loaded.resume.years_experience == 3.0
+    np.testing.assert_array_equal(loaded.embedding, entry.embedding)
+
+    # Another embedding model or taxonomy invalidates only that part
+    upgraded = ParsedResumeCache(collection=lambda: candidates, embedding_model="m2", taxonomy_version=2)
+    stale = upgraded.get(entry.digest)
+    assert stale.candidate_id == "id0" and stale.text == entry.text
+    assert stale.resume is None and stale.embedding is None
+
+    # Once recomputed and persisted, the stored document is current again
+    stale.resume, stale.embedding = entry.resume, entry.embedding * 2
+    upgraded.persist([stale])
+    reloaded = ParsedResumeCache(collection=lambda: candidates, embedding_model="m2", taxonomy_version=2).get(entry.digest)
+    assert reloaded.candidate_id == "id0" and reloaded.resume.skills == ["python", "sql"]
+    np.testing.assert_array_equal(reloaded.embedding, entry.embedding * 2)
+    assert len(candidates.documents) == 1
+
+
+def test_resume_cache_store_keeps_one_candidate_per_digest():
+    candidates = FakeCandidates()
+    first = ParsedResumeCache(collection=lambda: candidates)
+    second = ParsedResumeCache(collection=lambda: candidates)
+    # Two requests for the same file both missed the cache before either stored it
+    a, b = make_entry(b"%PDF same"), make_entry(b"%PDF same")
+    first.store([a], [{"name": "a.pdf"}], candidates)
+    second.store([b], [{"name": "copy.pdf"}], candidates)
+    assert a.candidate_id == b.candidate_id == "id0"
+    assert len(candidates.documents) == 1 and candidates.documents[0]["name"] == "a.pdf"
+    assert candidates.indexes[DIGEST_FIELD]["unique"]
+
+    # Losing the insert race on the unique index adopts the winner's candidate
+    c = make_entry(b"%PDF other")
+    candidates.racing_insert = {DIGEST_FIELD: c.digest, "name": "winner.pdf"}
+    second.store([c], [{"name": "c.pdf"}], candidates)
+    assert c.candidate_id == "id1" and len(candidates.documents) == 2
@@ -1,7 +1,16 @@
-﻿import numpy as np
+﻿from concurrent.futures import ThreadPoolExecutor
+
+import json
+import multiprocessing
+import os
+
+import numpy as np
 import pytest
 
-from src.embeddings.text_embedder import TextEmbedder
+from src.embeddings.batch_scheduler import EmbeddingScheduler
+from src.embeddings.embedding_cache import META_FILENAME, EmbeddingCache
+from src.embeddings.model_registry import model_registry
+from src.embeddings.text_embedder import DEFAULT_MODEL_NAME, MAX_CHARS_PER_TOKEN, TextEmbedder
 
 
 def test_embedding_generator_shape():
@@ -54,3 +63,181 @@ def test_embedding_generator_custom_model():
     # Test it can encode
     embeddings = generator.encode(["test text"])
     assert embeddings.shape[0] == 1
+
+
+def test_length_bucketing_preserves_input_order():
+    """Test that length-sorted batching returns rows in the caller's order."""
+    generator = TextEmbedder(batch_size=2)
+    texts = ["sql", "python pandas numpy scikit-learn airflow", "java", "react and typescript frontend"]
+    batched = generator.encode(texts)
+    one_by_one = np.vstack([generator.encode([text]) for text in texts])
+    assert np.allclose(batched, one_by_one, atol=1e-6)
+
+
+def test_long_texts_are_pre_truncated():
+    """Test that text beyond max_seq_length tokens' worth of characters is ignored."""
+    generator = TextEmbedder()
+    max_chars = generator.model.max_seq_length * MAX_CHARS_PER_TOKEN
+    head = "python " * (max_chars // 7 + 1)
+    assert np.allclose(generator.encode([head + "java " * 1000]), generator.encode([head]), atol=1e-6)
+
+
+def test_embedding_cache_serves_repeated_texts(tmp_path):
+    """Test that cached embeddings match fresh ones and survive a reopen."""
+    cache = EmbeddingCache(tmp_path, DEFAULT_MODEL_NAME, max_entries=3)
+    generator = TextEmbedder(cache=cache)
+    texts = ["python pandas", "java spring", "python pandas"]
+    first = generator.encode(texts)
+    assert len(cache) == 2
+    assert cache.misses == 3
+
+    second = generator.encode(texts)
+    assert np.allclose(first, second)
+    assert cache.hits == 3
+
+    reopened = EmbeddingCache(tmp_path, DEFAULT_MODEL_NAME, max_entries=3)
+    vectors, hits = reopened.get_many([EmbeddingCache.key("java spring")])
+    assert hits.all() and np.allclose(vectors[0], first[1])
+
+    # Going over max_entries compacts down to the most recently used entries
+    TextEmbedder(cache=reopened).encode(["sql", "airflow"])
+    assert len(reopened) <= 3 and reopened.evictions > 0
+    assert reopened.get_many([EmbeddingCache.key("airflow")])[1].all()
+
+
+def _fill_cache(directory, worker):
+    cache = EmbeddingCache(directory, "test-model", max_entries=1000)
+    for i in range(40):
+        text = f"worker {worker} text {i}"
+        cache.put_many([EmbeddingCache.key(text)], np.full((1, 4), worker * 100 + i, dtype=np.float32))
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_embedding_cache_shared_between_processes(tmp_path):
+    """Test that processes appending to one cache directory never mix up rows."""
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_fill_cache, args=(tmp_path, worker)) for worker in (1, 2)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+        assert process.exitcode == 0
+
+    cache = EmbeddingCache(tmp_path, "test-model", max_entries=1000)
+    keys = [EmbeddingCache.key(f"worker {worker} text {i}") for worker in (1, 2) for i in range(40)]
+    vectors, hits = cache.get_many(keys)
+    assert hits.all()
+    assert np.array_equal(vectors[:, 0], [worker * 100 + i for worker in (1, 2) for i in range(40)])
+
+
+def test_embedding_cache_follows_other_instances_and_survives_torn_compaction(tmp_path):
+    """Test that an open cache sees another writer's appends and compactions."""
+    first = EmbeddingCache(tmp_path, "test-model", max_entries=4, compact_ratio=0.5)
+    second = EmbeddingCache(tmp_path, "test-model", max_entries=4, compact_ratio=0.5)
+    keys = [EmbeddingCache.key(f"text {i}") for i in range(5)]
+    first.put_many(keys[:2], np.array([[0.0, 0.0], [1.0, 1.0]], dtype=np.float32))
+    second.put_many(keys[1:3], np.array([[9.0, 9.0], [2.0, 2.0]], dtype=np.float32))
+    vectors, hits = first.get_many(keys[:3])
+    assert hits.all() and np.array_equal(vectors[:, 0], [0.0, 1.0, 2.0])
+
+    # second compacts (5 > max_entries) and first switches to the new generation
+    second.put_many(keys[3:], np.array([[3.0, 3.0], [4.0, 4.0]], dtype=np.float32))
+    vectors, hits = first.get_many(keys)
+    assert hits.tolist() == [False, False, False, True, True]
+    assert np.array_equal(vectors[3:, 0], [3.0, 4.0])
+
+    # A compaction that crashed before switching leaves a half-written next generation behind
+    generation = json.loads((first.directory / META_FILENAME).read_text())["generation"]
+    orphan = first.directory / f"gen-{generation + 1}"
+    orphan.mkdir()
+    (orphan / "keys.bin").write_bytes(b"x" * 7)
+    reopened = EmbeddingCache(tmp_path, "test-model", max_entries=4, compact_ratio=0.5)
+    assert not orphan.exists() and len(reopened) == 2
+    assert reopened.get_many(keys[3:])[1].all()
+
+
+def test_onnx_encoder_matches_torch(tmp_path):
+    """Test that the exported ONNX model (fp32 and int8) tracks the PyTorch embeddings."""
+    pytest.importorskip("onnxruntime")
+    transformers = pytest.importorskip("transformers")
+    from sentence_transformers import SentenceTransformer
+    from src.embeddings.onnx_encoder import OnnxEncoder, export_onnx
+
+    # A tiny randomly initialized BERT keeps the test offline and fast
+    words = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + "python java sql data engineer react aws with".split()
+    vocab = tmp_path / "vocab.txt"
+    vocab.write_text("\n".join(words), encoding="utf-8")
+    model_dir = tmp_path / "model"
+    transformers.BertTokenizerFast(str(vocab)).save_pretrained(model_dir)
+    config = transformers.BertConfig(
+        vocab_size=len(words), hidden_size=32, num_hidden_layers=2, num_attention_heads=2, intermediate_size=64
+    )
+    transformers.BertModel(config).save_pretrained(model_dir)
+
+    export_onnx(str(model_dir), tmp_path / "onnx")
+    texts = ["python data engineer", "react with aws and sql", "java"]
+    expected = SentenceTransformer(str(model_dir), device="cpu").encode(texts, normalize_embeddings=True)
+    for quantized in (False, True):
+        embeddings = OnnxEncoder(tmp_path / "onnx", quantized=quantized).encode(texts, normalize_embeddings=True)
+        assert embeddings.dtype == np.float32
+        assert embeddings.shape == expected.shape
+        assert np.all((embeddings * expected).sum(axis=1) > 0.99)
+
+    # Length-sorted batches come back in the caller's order
+    encoder = OnnxEncoder(tmp_path / "onnx")
+    batched = encoder.encode(texts, batch_size=2)
+    assert np.allclose(batched, np.vstack([encoder.encode([text]) for text in texts]), atol=1e-5)
+
+
+def test_embedding_scheduler_coalesces_concurrent_requests():
+    """Test that concurrent encode calls share batches and each caller gets its own rows."""
+    generator = TextEmbedder()
+    scheduler = EmbeddingScheduler(generator, max_batch_size=8, max_wait_ms=50)
+    texts = [[f"python job {i}"] if i % 2 else [f"java job {i}", f"sql job {i}"] for i in range(12)]
+    with ThreadPoolExecutor(max_workers=12) as pool:
+        results = list(pool.map(scheduler.encode, texts))
+    scheduler.close()
+
+    for request, result in zip(texts, results):
+        assert np.allclose(result, generator.encode(request), atol=1e-6)
+    stats = scheduler.get_stats()
+    assert stats["requests"] == 12 and stats["texts"] == 18
+    assert stats["batches"] < 12
+
+
+def test_query_encodes_do_not_grow_the_cache(tmp_path):
+    """Test that resume/query embeddings bypass the cache that job indexing fills."""
+    from src.recommender.recommender import JobPosting, ResumeRecommender
+
+    cache = EmbeddingCache(tmp_path, DEFAULT_MODEL_NAME)
+    generator = TextEmbedder(cache=cache)
+    scheduler = EmbeddingScheduler(generator, max_wait_ms=50)
+    recommender = ResumeRecommender(embedding_generator=scheduler)
+    recommender.index_jobs([
+        JobPosting(job_id="1", title="ML Engineer", description="python sklearn aws"),
+        JobPosting(job_id="2", title="Frontend Developer", description="react javascript css"),
+    ])
+    assert len(cache) == 2
+    lookups = cache.hits + cache.misses
+
+    # Concurrent queries share a scheduler batch with an (upserted) job
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        queries = [pool.submit(recommender.recommend_for_resume_text, f"python resume {i}", 1) for i in range(3)]
+        pool.submit(recommender.add_jobs, [JobPosting(job_id="3", title="DBA", description="sql postgres")]).result()
+        assert all(query.result()[0].job.job_id for query in queries)
+    scheduler.close()
+    assert len(cache) == 3
+    assert cache.hits + cache.misses == lookups + 1
+
+
+def test_model_registry_shares_one_lazily_loaded_model():
+    """Test that embedders load the model on first use and share it."""
+    model_registry.clear()
+    first, second = TextEmbedder(), TextEmbedder()
+    assert not first.is_loaded
+
+    first.encode(["python pandas"])
+    assert second.is_loaded
+    assert first.model is second.model
+    status = model_registry.get_status()
+    assert len(status) == 1 and status[0]["load_seconds"] >= 0
@@ -0,0 +1,185 @@
+﻿import numpy as np
+import pytest
+
+from src.storage import vector_store
+from src.storage.vector_store import VectorStore
+
+
+def _random_embeddings(n: int, dim: int = 16, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal((n, dim)).astype(np.float32)
+
+
+def test_vector_store_save_and_load_roundtrip(tmp_path):
+    """Test that a saved index returns the same neighbours after loading."""
+    embeddings = _random_embeddings(50)
+    store = VectorStore()
+    store.add_items(embeddings.copy(), [f"job-{i}" for i in range(50)])
+    store.save(tmp_path, model_name="test-model")
+
+    loaded = VectorStore()
+    manifest = loaded.load(tmp_path, mmap=True, model_name="test-model")
+    assert manifest["vector_count"] == 50
+    assert manifest["dimension"] == 16
+    assert loaded.get_status()["memory_mapped"]
+
+    query = embeddings[:3].copy()
+    expected = [[hit.idx for hit in row] for row in store.search(query, k=5)]
+    actual = [[hit.idx for hit in row] for row in loaded.search(query, k=5)]
+    assert actual == expected
+    assert loaded.get_payload(expected[0][0]) == store.get_payload(expected[0][0])
+
+
+def test_vector_store_mmap_index_accepts_new_items(tmp_path):
+    """Test that adding to a memory-mapped index copies it into memory first."""
+    store = VectorStore()
+    store.add_items(_random_embeddings(10), [str(i) for i in range(10)])
+    store.save(tmp_path)
+
+    loaded = VectorStore()
+    loaded.load(tmp_path, mmap=True)
+    loaded.add_items(_random_embeddings(5, seed=1), [str(i) for i in range(10, 15)])
+    assert loaded.get_status()["vector_count"] == 15
+    assert not loaded.get_status()["memory_mapped"]
+
+
+def test_vector_store_mmap_copy_ignores_later_saves(tmp_path):
+    """Test that the writable copy comes from the loaded file, not whatever is at the path now."""
+    store = VectorStore()
+    store.add_items(_random_embeddings(10), [str(i) for i in range(10)])
+    store.save(tmp_path)
+    loaded = VectorStore()
+    loaded.load(tmp_path, mmap=True)
+
+    # Another process rewrites the index in place of the one we mapped
+    other = VectorStore()
+    other.add_items(_random_embeddings(3, seed=2), ["a", "b", "c"])
+    other.save(tmp_path)
+
+    loaded.add_items(_random_embeddings(5, seed=1), [str(i) for i in range(10, 15)])
+    assert loaded.get_status()["vector_count"] == 15
+    hit = loaded.search(_random_embeddings(10)[4:5].copy(), k=1)[0][0]
+    assert loaded.get_payload(hit.idx) == "4"
+
+
+def test_vector_store_load_rejects_other_model(tmp_path):
+    """Test that an index built with a different model is not served."""
+    store = VectorStore()
+    store.add_items(_random_embeddings(5), [str(i) for i in range(5)])
+    store.save(tmp_path, model_name="model-a")
+    with pytest.raises(ValueError):
+        VectorStore().load(tmp_path, model_name="model-b")
+
+
+@pytest.mark.parametrize("mode", ["hnsw", "ivf", "sq8", "ivfpq"])
+def test_vector_store_approximate_modes(mode):
+    """Test that approximate indexes find an exact duplicate of the query."""
+    embeddings = _random_embeddings(500)
+    store = VectorStore(index_mode=mode, nlist=8, nprobe=8, pq_m=4)
+    store.add_items(embeddings.copy(), [str(i) for i in range(500)])
+    hits = store.search(embeddings[42:43].copy(), k=3)[0]
+    assert hits[0].idx == 42
+    assert store.get_status()["index_mode"] == mode
+
+
+def test_vector_store_add_stream_buffers_training_sample(monkeypatch):
+    """Test that streamed chunks train IVF on a pooled sample and keep their order."""
+    monkeypatch.setattr(vector_store, "TRAIN_SAMPLE_SIZE", 500)
+    embeddings = _random_embeddings(1200)
+    ids = [f"job-{i}" for i in range(1200)]
+    chunks = ((ids[start:start + 100], embeddings[start:start + 100].copy()) for start in range(0, 1200, 100))
+
+    store = VectorStore(index_mode="ivf", nprobe=64)
+    labels = store.add_stream(chunks, expected_count=1200)
+    assert labels.tolist() == list(range(1200))
+    status = store.get_status()
+    assert status["vector_count"] == 1200
+    # nlist follows the announced corpus size, capped by what 500 training points support
+    assert status["nlist"] == 500 // 39
+    assert store.search(embeddings[7:8].copy(), k=1)[0][0].idx == 7
+
+
+def test_vector_store_auto_mode_uses_flat_for_small_corpus():
+    store = VectorStore()
+    store.add_items(_random_embeddings(20), [str(i) for i in range(20)])
+    assert store.get_status()["index_mode"] == "flat"
+
+
+def test_vector_store_auto_mode_rebuilds_as_the_corpus_grows(monkeypatch):
+    """Test that upserts past the auto thresholds switch to HNSW and then IVF."""
+    monkeypatch.setattr(vector_store, "AUTO_HNSW_MIN_VECTORS", 50)
+    monkeypatch.setattr(vector_store, "AUTO_IVF_MIN_VECTORS", 200)
+    embeddings = _random_embeddings(250)
+    store = VectorStore(nprobe=64)
+    store.upsert([str(i) for i in range(40)], embeddings[:40].copy())
+    assert store.get_status()["index_mode"] == "flat"
+
+    store.upsert([str(i) for i in range(40, 60)], embeddings[40:60].copy())
+    assert store.get_status()["index_mode"] == "hnsw"
+    assert store.remove(["3"]) == 1
+    store.upsert([str(i) for i in range(60, 250)], embeddings[60:].copy())
+    status = store.get_status()
+    assert status["index_mode"] == "ivf"
+    assert status["vector_count"] == 249 and status["deleted_count"] == 0
+
+    # Labels survive the rebuilds, and the removed job stays gone
+    hit = store.search(embeddings[7:8].copy(), k=1)[0][0]
+    assert (hit.idx, store.get_payload(hit.idx)) == (7, "7")
+    assert "3" not in {store.get_payload(h.idx) for h in store.search(embeddings[3:4].copy(), k=5)[0]}
+
+    # Removals never move the store back to a smaller mode
+    store.remove([str(i) for i in range(100, 250)])
+    store.upsert(["new"], embeddings[:1].copy())
+    assert store.get_status()["index_mode"] == "ivf"
+
+
+@pytest.mark.parametrize("mode", ["flat", "hnsw", "ivf"])
+def test_vector_store_upsert_and_remove(mode):
+    """Test that upserts replace vectors in place and removed ids are never returned."""
+    embeddings = _random_embeddings(200)
+    store = VectorStore(index_mode=mode, nlist=4, nprobe=4)
+    store.upsert([str(i) for i in range(200)], embeddings.copy())
+
+    # Re-point job "7" at the vector of job "150"
+    store.upsert(["7"], embeddings[150:151].copy())
+    assert len(store) == 200
+    payloads = [store.get_payload(hit.idx) for hit in store.search(embeddings[150:151].copy(), k=2)[0]]
+    assert set(payloads) == {"7", "150"}
+
+    assert store.remove(["150", "7", "missing"]) == 2
+    assert len(store) == 198
+    hits = store.search(embeddings[150:151].copy(), k=10)[0]
+    assert len(hits) == 10
+    assert not {"7", "150"} & {store.get_payload(hit.idx) for hit in hits}
+
+
+@pytest.mark.parametrize("mode", ["flat", "hnsw", "ivf"])
+def test_vector_store_filtered_search_fills_top_k(mode):
+    """Test that an id filter is applied inside the search and still returns k hits."""
+    embeddings = _random_embeddings(1000)
+    store = VectorStore(index_mode=mode, nlist=16, nprobe=1, ef_search=16)
+    labels = store.upsert([str(i) for i in range(1000)], embeddings.copy())
+
+    id_filter = np.zeros(store.label_count, dtype=bool)
+    id_filter[labels[::50]] = True  # 20 allowed vectors
+    hits = store.search(embeddings[:1].copy(), k=10, id_filter=id_filter)[0]
+    assert len(hits) == 10
+    assert all(id_filter[hit.idx] for hit in hits)
+
+    assert store.search(embeddings[:1].copy(), k=10, id_filter=np.zeros_like(id_filter)) == [[]]
+
+
+def test_vector_store_compressed_index_rescoring_survives_reload(tmp_path):
+    """Test that the float16 re-scoring copy is saved and memory-mapped on load."""
+    embeddings = _random_embeddings(300)
+    store = VectorStore(index_mode="sq8")
+    store.add_items(embeddings.copy(), [str(i) for i in range(300)])
+    assert store.get_status()["bytes_per_vector"] == 16
+    store.save(tmp_path)
+
+    loaded = VectorStore()
+    loaded.load(tmp_path, mmap=True)
+    assert loaded.get_status()["rescore"]
+    hits = loaded.search(embeddings[7:8].copy(), k=5)[0]
+    assert hits[0].idx == 7
+    assert [hit.score for hit in hits] == sorted((hit.score for hit in hits), reverse=True)